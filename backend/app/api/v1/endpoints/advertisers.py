@@ -1,6 +1,6 @@
 import secrets
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
@@ -11,7 +11,11 @@ from app.models.advertiser import Advertiser, APIKey
 from app.models.user import User, UserRole
 from app.models.campaign import Campaign
 from app.models.customer_event import CustomerEvent
-from app.core.deps import get_current_active_user
+from app.core.deps import get_current_active_user, invalidate_api_key_cache, invalidate_user_cache
+from app.core.exceptions import AppError
+from app.services.advertiser_deletion import AdvertiserDeletionService
+from app.services.jobs import JobService, JOB_ADVERTISER_DELETE
+from app.api.v1.endpoints.jobs import job_accepted
 from app.schemas.advertiser import AdvertiserCreate, AdvertiserResponse, AdvertiserUpdate, APIKeyResponse, APIKeyCreate
 
 router = APIRouter()
@@ -121,6 +125,7 @@ async def update_advertiser(
 
     db.add(advertiser)
     await db.commit()
+    invalidate_api_key_cache(advertiser_id)  # Cached snapshots carry is_active / currency
     await db.refresh(advertiser)
     
     return advertiser
@@ -191,12 +196,14 @@ async def delete_api_key(
 
     await db.delete(api_key)
     await db.commit()
+    invalidate_api_key_cache(advertiser_id)
     
     return None
 
 @router.delete("/{advertiser_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_advertiser(
     advertiser_id: int,
+    background: bool = Query(False, description="Delete in a background job and return 202 with the job (poll /jobs/{id})."),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -207,47 +214,22 @@ async def delete_advertiser(
     if current_user.role != UserRole.SUPERROOT:
         raise HTTPException(status_code=403, detail="Not authorized to delete advertisers")
 
-    # Fetch advertiser
-    result = await db.execute(select(Advertiser).where(Advertiser.id == advertiser_id))
-    advertiser = result.scalars().first()
-    
-    if not advertiser:
-        raise HTTPException(status_code=404, detail="Advertiser not found")
-
-    # 1. Unlink Users 
-    result_users = await db.execute(select(User).where(User.advertiser_id == advertiser_id))
-    users = result_users.scalars().all()
-    for u in users:
-        u.advertiser_id = None
-        db.add(u)
-    await db.commit() # Commit user changes immediately
-    
-    # 2. Delete Dependent API Keys
-    result_keys = await db.execute(select(APIKey).where(APIKey.advertiser_id == advertiser_id))
-    keys = result_keys.scalars().all()
-    for k in keys:
-        await db.delete(k)
-    await db.commit()
-
-    # 3. Delete Dependent Events
-    result_events = await db.execute(select(CustomerEvent).where(CustomerEvent.advertiser_id == advertiser_id))
-    events = result_events.scalars().all()
-    for e in events:
-        await db.delete(e)
-    await db.commit()
+    if background:
+        result = await db.execute(select(Advertiser.id).where(Advertiser.id == advertiser_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Advertiser not found")
+        # Stop serving the advertiser's API keys and linked users from this process right away
+        invalidate_api_key_cache(advertiser_id)
+        invalidate_user_cache(advertiser_id=advertiser_id)
+        job = await JobService.enqueue(db, JOB_ADVERTISER_DELETE, {"advertiser_id": advertiser_id}, user=current_user, advertiser_id=advertiser_id)
+        return job_accepted(job)
 
-    # 4. Delete Dependent Campaigns
-    # (Campaigns should cascade delete their coupons/links/influencer-assoc, but let's load them to be sure)
-    result_campaigns = await db.execute(select(Campaign).where(Campaign.advertiser_id == advertiser_id))
-    campaigns = result_campaigns.scalars().all()
-    for c in campaigns:
-        await db.delete(c)
-    await db.commit()
-
-    # 5. Finally Delete Advertiser
     try:
-        await db.delete(advertiser)
-        await db.commit()
+        await AdvertiserDeletionService.delete_advertiser(db, advertiser_id)
+        invalidate_api_key_cache(advertiser_id)
+        invalidate_user_cache(advertiser_id=advertiser_id)  # Their users were unlinked
+    except AppError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except IntegrityError as e:
         await db.rollback()
         print(f"Delete Advertiser Integrity Error: {e}")
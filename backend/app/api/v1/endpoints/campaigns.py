@@ -3,8 +3,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Security
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import IntegrityError
 
 from app.core.database import get_db
+from app.core.db_errors import is_foreign_key_violation
 from app.models.campaign import Campaign
 from app.models.influencer import Influencer, CampaignInfluencer
 from app.models.advertiser import Advertiser
@@ -32,13 +34,8 @@ async def create_campaign(
         # Enforce their own ID
         target_advertiser_id = current_user.advertiser_id
     
-    # If SuperRoot, we trust the ID passed in the body (or require it)
-
-    # Validate Advertiser exists
-    result = await db.execute(select(Advertiser).where(Advertiser.id == target_advertiser_id))
-    advertiser = result.scalars().first()
-    if not advertiser:
-        raise HTTPException(status_code=404, detail="Advertiser not found")
+    # If SuperRoot, we trust the ID passed in the body (or require it).
+    # Advertiser existence is enforced by the FK on INSERT rather than a separate SELECT.
 
     new_campaign = Campaign(
         name=campaign.name,
@@ -49,8 +46,16 @@ async def create_campaign(
         advertiser_id=target_advertiser_id
     )
     db.add(new_campaign)
-    await db.commit()
-    await db.refresh(new_campaign)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_foreign_key_violation(e):
+            raise
+        raise HTTPException(status_code=404, detail="Advertiser not found")
+
+    # id comes back with the INSERT and created_at is a client-side default,
+    # so the object is complete without a refresh round trip.
     return new_campaign
 
 from sqlalchemy import func, case, case
@@ -1,96 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
-import random
-import string
-
 from app.core.database import get_db
+from app.core.db_errors import is_duplicate_key
 from app.models.coupon import Coupon
 from app.models.campaign import Campaign
 from app.models.influencer import Influencer
 from app.models.user import User, UserRole
 from app.core.deps import get_current_active_user
-from app.schemas.coupon import CouponCreate, CouponUpdate, CouponResponse, CouponManualCreate, CouponAutoGenerate, CouponEmailRequest
-from app.services.email import email_service
+from app.schemas.coupon import CouponCreate, CouponUpdate, CouponResponse, CouponManualCreate, CouponAutoGenerate, CouponBulkGenerate, CouponEmailRequest
+from app.services.coupon_codes import CouponCodeService, generate_random_code, COUPON_CODE_INDEX
+from app.services.jobs import JobService, JOB_COUPON_NOTIFY
+from app.services.notifications import NotificationService
+from app.api.v1.endpoints.jobs import job_accepted
 
 router = APIRouter()
 
 @router.post("/notify", response_model=Dict[str, Any])
 async def notify_influencers(
     item: CouponEmailRequest,
+    background: bool = Query(False, description="Send as a background job and return 202 with the job (poll /jobs/{id})."),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Send emails to influencers with their assigned coupons.
     """
-    stmt = select(Coupon).join(Campaign).join(Influencer).options(
-        selectinload(Coupon.campaign),
-        selectinload(Coupon.influencer)
-    ).where(Influencer.email.isnot(None))
-
-    # Scoping
-    if current_user.role == UserRole.ADVERTISER:
-        stmt = stmt.where(Campaign.advertiser_id == current_user.advertiser_id)
-
-    # Filter Logic
-    if item.send_all:
-        if item.campaign_id_filter:
-            stmt = stmt.where(Coupon.campaign_id == item.campaign_id_filter)
-    else:
-        if not item.ids:
-            return {"message": "No coupons selected", "sent_count": 0}
-        stmt = stmt.where(Coupon.id.in_(item.ids))
+    if background:
+        job = await JobService.enqueue(db, JOB_COUPON_NOTIFY, {
+            "request": item.model_dump(mode="json"),
+            "role": current_user.role.value,
+            "advertiser_id": current_user.advertiser_id
+        }, user=current_user)
+        return job_accepted(job)
 
-    result = await db.execute(stmt)
-    coupons = result.scalars().all()
+    return await NotificationService.notify_coupons(
+        db, item, role=current_user.role, advertiser_id=current_user.advertiser_id
+    )
 
-    # Group by Influencer and Campaign
-    # Key: (influencer_id, campaign_id) -> list of coupons
-    grouped: Dict[tuple, List[Coupon]] = {}
-    
-    for coupon in coupons:
-        key = (coupon.influencer_id, coupon.campaign_id)
-        if key not in grouped:
-            grouped[key] = []
-        grouped[key].append(coupon)
-
-    sent_count = 0
-    failed_count = 0
-    
-    for (inf_id, camp_id), coupon_list in grouped.items():
-        # All coupons in this list belong to same influencer and campaign
-        # So we can pick the first one's relations
-        influencer = coupon_list[0].influencer
-        campaign = coupon_list[0].campaign
-        
-        if influencer and influencer.email:
-            success = email_service.send_coupons(
-                influencer_name=influencer.name,
-                influencer_email=influencer.email,
-                campaign_name=campaign.name,
-                coupons=coupon_list
-            )
-            if success:
-                sent_count += 1
-            else:
-                failed_count += 1
 
+def build_coupon_response(coupon: Coupon, campaign_summary: Dict[str, Any], influencer_summary: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds the CouponResponse payload from values already in hand after the INSERT
+    (generated id + client-side defaults), avoiding a refresh and eager re-select.
+    """
     return {
-        "message": f"Processed {len(coupons)} coupons.",
-        "emails_sent": sent_count,
-        "emails_failed": failed_count,
-        "influencers_targeted": len(grouped)
+        "id": coupon.id,
+        "code": coupon.code,
+        "campaign_id": coupon.campaign_id,
+        "influencer_id": coupon.influencer_id,
+        "is_active": coupon.is_active,
+        "settings": coupon.settings,
+        "created_at": coupon.created_at,
+        "updated_at": coupon.updated_at,
+        "campaign": campaign_summary,
+        "influencer": influencer_summary
     }
 
-
-def generate_random_code(length: int = 8, prefix: str = "") -> str:
-    """Generates a random alphanumeric code with keys."""
-    chars = string.ascii_uppercase + string.digits
-    random_part = ''.join(random.choices(chars, k=length))
-    return f"{prefix}{random_part}"
-
 @router.post("/generate", response_model=CouponResponse)
 async def generate_coupon(
     item: CouponAutoGenerate,
@@ -114,12 +83,17 @@ async def generate_coupon(
              raise HTTPException(status_code=403, detail="Not authorized")
 
     # Validate Influencer if provided
+    influencer = None
     if item.influencer_id:
         result = await db.execute(select(Influencer).where(Influencer.id == item.influencer_id))
         influencer = result.scalar_one_or_none()
         if not influencer:
             raise HTTPException(status_code=404, detail="Influencer not found")
 
+    # Captured before writing: a collision rollback would expire the ORM objects
+    campaign_summary = {"id": campaign.id, "name": campaign.name}
+    influencer_summary = {"id": influencer.id, "name": influencer.name} if influencer else None
+
     # Generation Logic
     params = item.generation_params or {}
     prefix = params.get("prefix", "").upper()
@@ -128,35 +102,93 @@ async def generate_coupon(
     except (ValueError, TypeError):
         length = 8
     
-    # Simple retry logic for uniqueness
+    # Optimistic insert: the unique index on `code` detects collisions,
+    # so the happy path is a single INSERT + COMMIT with no uniqueness probe.
     max_retries = 5
     for _ in range(max_retries):
         code = generate_random_code(length=length, prefix=prefix)
-        # Check uniqueness
-        result = await db.execute(select(Coupon).where(Coupon.code == code))
-        existing = result.scalar_one_or_none()
-        
-        if not existing:
-            new_coupon = Coupon(
-                code=code,
-                campaign_id=item.campaign_id,
-                influencer_id=item.influencer_id,
-                settings=params,
-                is_active=item.is_active
-            )
-            db.add(new_coupon)
+        new_coupon = Coupon(
+            code=code,
+            campaign_id=item.campaign_id,
+            influencer_id=item.influencer_id,
+            settings=params,
+            is_active=item.is_active
+        )
+        db.add(new_coupon)
+        try:
             await db.commit()
-            await db.refresh(new_coupon)
-            # Re-fetch with eager loading to avoid MissingGreenlet
-            stmt = select(Coupon).options(
-                selectinload(Coupon.campaign),
-                selectinload(Coupon.influencer)
-            ).where(Coupon.id == new_coupon.id)
-            result = await db.execute(stmt)
-            return result.scalar_one()
+        except IntegrityError as e:
+            await db.rollback()
+            if not is_duplicate_key(e, COUPON_CODE_INDEX):
+                raise
+            continue
+        return build_coupon_response(new_coupon, campaign_summary, influencer_summary)
             
     raise HTTPException(status_code=409, detail="Could not generate a unique code after multiple retries. Please try again.")
 
+@router.post("/generate/bulk")
+async def generate_coupons_bulk(
+    item: CouponBulkGenerate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Generate many unique coupon codes for a campaign in one call.
+    Collisions are checked in batches and only the collided codes are regenerated.
+    Returns the created codes as a streamed CSV (one code per line).
+    """
+    # Validate Campaign
+    result = await db.execute(select(Campaign).where(Campaign.id == item.campaign_id))
+    campaign = result.scalar_one_or_none()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    # Scoping
+    if current_user.role == UserRole.ADVERTISER:
+        if campaign.advertiser_id != current_user.advertiser_id:
+             raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Validate Influencer if provided
+    if item.influencer_id:
+        result = await db.execute(select(Influencer.id).where(Influencer.id == item.influencer_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Influencer not found")
+
+    prefix = item.prefix.strip().upper()
+    if len(prefix) + item.length > Coupon.__table__.c.code.type.length:
+        raise HTTPException(status_code=400, detail="Prefix + length exceeds the maximum coupon code length.")
+    # Keep the space sparse so collision retries stay rare
+    if item.count * 10 > CouponCodeService.keyspace(item.length):
+        raise HTTPException(status_code=400, detail="Length is too short for this many codes.")
+
+    try:
+        codes = await CouponCodeService.generate_bulk(
+            db,
+            campaign_id=item.campaign_id,
+            count=item.count,
+            prefix=prefix,
+            length=item.length,
+            influencer_id=item.influencer_id,
+            is_active=item.is_active
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    def iter_codes():
+        yield "code\n"
+        for i in range(0, len(codes), 1000):
+            yield "\n".join(codes[i:i + 1000]) + "\n"
+
+    return StreamingResponse(
+        iter_codes(),
+        media_type="text/csv",
+        status_code=status.HTTP_201_CREATED,
+        headers={
+            "Content-Disposition": f"attachment; filename=coupons_campaign_{item.campaign_id}.csv",
+            "X-Coupon-Count": str(len(codes))
+        }
+    )
+
 @router.post("/", response_model=CouponResponse)
 async def create_manual_coupon(
     item: CouponManualCreate,
@@ -183,18 +215,15 @@ async def create_manual_coupon(
              raise HTTPException(status_code=403, detail="Not authorized")
 
     # Validate Influencer if provided
+    influencer = None
     if item.influencer_id:
         result = await db.execute(select(Influencer).where(Influencer.id == item.influencer_id))
         influencer = result.scalar_one_or_none()
         if not influencer:
             raise HTTPException(status_code=404, detail="Influencer not found")
-            
-    # Check Uniqueness
-    result = await db.execute(select(Coupon).where(Coupon.code == code))
-    existing = result.scalar_one_or_none()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail=f"Coupon code '{code}' already exists.")
+
+    campaign_summary = {"id": campaign.id, "name": campaign.name}
+    influencer_summary = {"id": influencer.id, "name": influencer.name} if influencer else None
 
     new_coupon = Coupon(
         code=code,
@@ -204,16 +233,16 @@ async def create_manual_coupon(
         is_active=item.is_active
     )
     db.add(new_coupon)
-    await db.commit()
-    await db.refresh(new_coupon)
-    
-    # Re-fetch with eager loading
-    stmt = select(Coupon).options(
-        selectinload(Coupon.campaign),
-        selectinload(Coupon.influencer)
-    ).where(Coupon.id == new_coupon.id)
-    result = await db.execute(stmt)
-    return result.scalar_one()
+    # Uniqueness is enforced by the unique index on `code` (no separate probe)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_duplicate_key(e, COUPON_CODE_INDEX):
+            raise
+        raise HTTPException(status_code=400, detail=f"Coupon code '{code}' already exists.")
+
+    return build_coupon_response(new_coupon, campaign_summary, influencer_summary)
 
 from sqlalchemy.orm import selectinload
 
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
+from sqlalchemy.future import select
+from typing import Any, Optional
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.deps import get_current_advertiser
-from app.schemas.event import EventCreate, EventResponse
+from app.schemas.event import EventCreate, EventResponse, EventRawResponse
 from app.models.advertiser import Advertiser
 from app.models.customer_event import CustomerEvent
-from app.services.attribution import AttributionService
+from app.services.event_payloads import EventPayloadService
+from app.services.event_spool import event_spool, build_spool_record
+from app.services.ingestion import EventIngestionService
+from app.services.idempotency import recent_event_keys
 
 router = APIRouter()
 
@@ -33,53 +38,95 @@ PAYLOAD NOTES:
 - action: Required. One of 'purchase', 'add_to_cart', 'signup', 'custom', 'drop_off'.
 - value: Revenue amount (optional).
 - properties: Flexible JSON for extra data (SKU, items, etc.).
+
+INGEST MODES:
+- sync (default): attribution and INSERT happen inside the request; returns 201 with the event id.
+- spool: the event is appended to a durable local spool and persisted asynchronously;
+  returns 202 with status 'accepted' and no id yet.
+
+IDEMPOTENCY:
+Send a unique 'event_id' in the payload (or an 'Idempotency-Key' header) to make retries safe.
+A repeated key returns the original result with an 'Idempotent-Replayed: true' header
+instead of creating a second event.
     """
 )
 async def ingest_event(
     event_in: EventCreate,
+    response: Response,
+    idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key", max_length=64),
     advertiser: Advertiser = Depends(get_current_advertiser),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Process a new conversion event.
     """
-    
-    # 1. Run Attribution
-    attr_service = AttributionService(db)
-    influencer_id, campaign_id, tracking_link_id = await attr_service.resolve(
-        coupon_code=event_in.coupon_code,
-        ref_code=event_in.ref_code,
-        landing_url=event_in.landing_url,
-        advertiser_id=advertiser.id
-    )
-    
-    # 2. Create Event Record
-    new_event = CustomerEvent(
-        advertiser_id=advertiser.id,
-        event_type=event_in.action,  # mapping 'action' -> 'event_type'
-        # Financials
-        revenue=event_in.value,
-        currency=event_in.currency,
-        # Inputs
-        coupon_code=event_in.coupon_code,
-        ref_code=event_in.ref_code,
-        landing_url=event_in.landing_url,
-        referrer=event_in.referrer,
-        # Resolved Attribution
-        influencer_id=influencer_id,
-        campaign_id=campaign_id,
-        tracking_link_id=tracking_link_id,
-        # Audit
-        properties=event_in.properties,
-        raw_data=event_in.dict()
+    # Read once: a duplicate-key rollback expires ORM objects held by this session
+    advertiser_id = advertiser.id
+    idempotency_key = idempotency_key_header or event_in.event_id
+
+    # Most retries arrive shortly after the original: answer them from memory
+    if idempotency_key:
+        cached = recent_event_keys.get((advertiser_id, idempotency_key))
+        if cached:
+            response.status_code = cached["status_code"]
+            response.headers["Idempotent-Replayed"] = "true"
+            return cached["body"]
+
+    # Accept-then-persist: durable on local disk, attributed + inserted by the spool consumer
+    if settings.EVENT_INGEST_MODE == "spool":
+        await event_spool.append(build_spool_record(advertiser_id, event_in.dict(), idempotency_key))
+        status_code = status.HTTP_202_ACCEPTED
+        body = {
+            "id": None,
+            "status": "accepted",
+            "attributed_influencer": None
+        }
+    else:
+        new_event, replayed = await EventIngestionService.ingest(db, advertiser_id, event_in, idempotency_key)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        status_code = status.HTTP_201_CREATED
+        body = {
+            "id": new_event.id,
+            "status": "processed",
+            "attributed_influencer": str(new_event.influencer_id) if new_event.influencer_id else None
+        }
+
+    if idempotency_key:
+        recent_event_keys.put((advertiser_id, idempotency_key), {"status_code": status_code, "body": body})
+
+    response.status_code = status_code
+    return body
+
+
+@router.get(
+    "/{event_id}/raw",
+    response_model=EventRawResponse,
+    summary="Event Audit View",
+    description="Returns the full original payload submitted for an event. Requires 'X-API-KEY' of the owning advertiser."
+)
+async def get_event_raw_payload(
+    event_id: int,
+    advertiser: Advertiser = Depends(get_current_advertiser),
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Audit view. The raw payload is loaded lazily, only on this path.
+    """
+    result = await db.execute(
+        select(CustomerEvent.id, CustomerEvent.event_type, CustomerEvent.timestamp)
+        .where(CustomerEvent.id == event_id)
+        .where(CustomerEvent.advertiser_id == advertiser.id)
     )
-    
-    db.add(new_event)
-    await db.commit()
-    await db.refresh(new_event)
-    
+    event = result.first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    raw_data = await EventPayloadService.get_raw_payload(db, event_id)
+
     return {
-        "id": new_event.id,
-        "status": "processed",
-        "attributed_influencer": str(influencer_id) if influencer_id else None
+        "id": event.id,
+        "event_type": event.event_type,
+        "timestamp": event.timestamp,
+        "raw_data": raw_data
     }
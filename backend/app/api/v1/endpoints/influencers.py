@@ -1,5 +1,5 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload, attributes
@@ -13,6 +13,9 @@ from app.models.tracking_link import TrackingLink
 from app.models.user import User, UserRole
 from app.core.deps import get_current_active_user
 from app.schemas.influencer import InfluencerCreate, InfluencerResponse, InfluencerUpdate
+from app.services.influencer_import import InfluencerImportService
+from app.services.jobs import JobService, JOB_INFLUENCER_IMPORT
+from app.api.v1.endpoints.jobs import job_accepted
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -77,70 +80,29 @@ async def create_influencer(
 @router.post("/bulk", status_code=status.HTTP_201_CREATED)
 async def create_influencers_bulk(
     influencers: List[InfluencerCreate],
+    background: bool = Query(False, description="Run as a background job and return 202 with the job (poll /jobs/{id})."),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
     Bulk Create Influencers. Skips duplicates (by email).
-    Returns summary of results.
+    Returns summary of results with a per-row error report.
     """
-    created_count = 0
-    errors = []
-    
-    # Optional: Optimize by fetching all existing emails upfront
-    # emails = [i.email for i in influencers]
-    # existing_emails = ...
-    
-    # Process Loop (Transactional per item or full batch? Let's do partial success)
-    for index, inf_data in enumerate(influencers):
-        try:
-            # Check existence
-            result = await db.execute(select(Influencer).where(Influencer.email == inf_data.email))
-            existing = result.scalars().first()
-            
-            if existing:
-                # If campaign_id provided, link it even if existing
-                if inf_data.campaign_id:
-                     # Check if already linked logic...
-                     # For now, let's treat existing as "Skipped creation, but maybe linked?"
-                     # Let's keep it simple: Bulk Create only creates new. 
-                     # Linking existing needs logic.
-                     errors.append({"index": index, "email": inf_data.email, "error": "Already exists"})
-                else:
-                     errors.append({"index": index, "email": inf_data.email, "error": "Already exists"})
-                continue
-
-            new_inf = Influencer(
-                name=inf_data.name,
-                email=inf_data.email,
-                social_handle=inf_data.social_handle
-            )
-            
-            if inf_data.campaign_id:
-                # Resolve Campaign
-                camp_res = await db.execute(select(Campaign).where(Campaign.id == inf_data.campaign_id))
-                campaign = camp_res.scalars().first()
-                if campaign:
-                     if current_user.role == UserRole.ADVERTISER and campaign.advertiser_id != current_user.advertiser_id:
-                         pass # Skip linking if unauthorized
-                     else:
-                         # new_inf.campaigns.append(campaign)
-                         link = CampaignInfluencer(campaign=campaign)
-                         new_inf.campaign_links.append(link)
-
-            db.add(new_inf)
-            await db.commit() # Commit per item to allow partial success
-            created_count += 1
-            
-        except Exception as e:
-            await db.rollback()
-            errors.append({"index": index, "email": inf_data.email, "error": str(e)})
-
-    return {
-        "total_received": len(influencers),
-        "created": created_count,
-        "errors": errors
-    }
+    if background:
+        job = await JobService.enqueue(db, JOB_INFLUENCER_IMPORT, {
+            "rows": [row.model_dump(mode="json") for row in influencers],
+            "role": current_user.role.value,
+            "advertiser_id": current_user.advertiser_id
+        }, user=current_user)
+        return job_accepted(job)
+
+    # Set-based: a few queries per chunk of rows instead of several per row
+    return await InfluencerImportService.import_influencers(
+        db,
+        influencers,
+        role=current_user.role,
+        advertiser_id=current_user.advertiser_id
+    )
 
 @router.get("/", response_model=List[InfluencerResponse])
 async def list_influencers(
@@ -0,0 +1,67 @@
+import os
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.config import settings
+from app.core.database import pool_status, replica_router
+from app.core.query_profiler import QueryProfiler, query_profiler
+from app.core.deps import get_current_active_user
+from app.models.user import User, UserRole
+
+router = APIRouter()
+
+
+def require_superroot(current_user: User = Depends(get_current_active_user)) -> User:
+    if current_user.role != UserRole.SUPERROOT:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return current_user
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats(
+    current_user: User = Depends(require_superroot)
+) -> Any:
+    """
+    Connection pool and read replica state for the process that served the
+    request (each gunicorn worker has its own pools). Restricted to SUPERROOT.
+    """
+    return {
+        "pid": os.getpid(),
+        "pools": pool_status(),
+        "read_replica": replica_router.status()
+    }
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    sort: str = Query("total", description=f"One of: {', '.join(QueryProfiler.SORT_KEYS)}"),
+    limit: int = Query(20, ge=1, le=500),
+    current_user: User = Depends(require_superroot)
+) -> Any:
+    """
+    Top statement fingerprints for this process, with the slowest sample and its
+    EXPLAIN for those above QUERY_PROFILER_SLOW_MS. Restricted to SUPERROOT.
+    """
+    if not settings.QUERY_PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Query profiler is disabled (QUERY_PROFILER_ENABLED)")
+    if sort not in QueryProfiler.SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Valid: {', '.join(QueryProfiler.SORT_KEYS)}")
+    return {
+        "pid": os.getpid(),
+        "since": query_profiler.started_at,
+        "slow_threshold_ms": settings.QUERY_PROFILER_SLOW_MS,
+        "fingerprints": len(query_profiler.stats),
+        "queries": query_profiler.top(sort, limit)
+    }
+
+
+@router.delete("/slow-queries")
+async def reset_slow_queries(
+    current_user: User = Depends(require_superroot)
+) -> Any:
+    """Clears this process's profile, e.g. before reproducing a slow page."""
+    if not settings.QUERY_PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Query profiler is disabled (QUERY_PROFILER_ENABLED)")
+    query_profiler.reset()
+    return {"pid": os.getpid(), "status": "reset"}
@@ -0,0 +1,80 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deps import get_current_active_user
+from app.models.job import Job, JobStatus
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.services.jobs import JobService
+
+router = APIRouter()
+
+
+def job_accepted(job: Job) -> JSONResponse:
+    """202 response for endpoints that hand their work to the background worker."""
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(JobResponse.model_validate(job)),
+        headers={"Location": f"{settings.API_V1_STR}/jobs/{job.id}"}
+    )
+
+
+async def get_scoped_job(db: AsyncSession, job_id: int, current_user: User) -> Job:
+    result = await db.execute(JobService.scoped_query(current_user).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/", response_model=List[JobResponse])
+async def list_jobs(
+    job_status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """List background jobs, newest first. Scoped to the caller unless SUPERROOT."""
+    stmt = JobService.scoped_query(current_user)
+    if job_status:
+        stmt = stmt.where(Job.status == job_status)
+    if job_type:
+        stmt = stmt.where(Job.type == job_type)
+    result = await db.execute(stmt.order_by(Job.id.desc()).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Poll a job for status, progress and result."""
+    return await get_scoped_job(db, job_id, current_user)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Cancel a job. Queued jobs are cancelled immediately; running jobs stop at
+    their next progress report (work already committed is kept).
+    """
+    job = await get_scoped_job(db, job_id, current_user)
+    if job.status not in (JobStatus.QUEUED.value, JobStatus.RUNNING.value):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    if not await JobService.request_cancel(db, job):
+        # Finished between the lookup and the UPDATE
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return job
@@ -3,6 +3,7 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 from app.core.database import get_db, SessionLocal
 from app.models.tracking_link import TrackingLink
@@ -23,6 +24,20 @@ async def log_click_background(link_id: int, ip: str, user_agent: str, referer:
         session.add(click)
         await session.commit()
 
+def build_redirect_url(destination_url: str, short_code: str) -> str:
+    """Destination URL with ref_code={short_code} injected (replacing any existing ref_code)."""
+    parsed_url = urlparse(destination_url)
+    query_params = parse_qs(parsed_url.query)
+    query_params['ref_code'] = [short_code]
+    return urlunparse((
+        parsed_url.scheme,
+        parsed_url.netloc,
+        parsed_url.path,
+        parsed_url.params,
+        urlencode(query_params, doseq=True),
+        parsed_url.fragment
+    ))
+
 @router.get("/{short_code}")
 async def redirect_to_target(
     short_code: str,
@@ -58,22 +73,4 @@ async def redirect_to_target(
     # Deterministic Tracking (Phase 4 Update)
     # Append ?ref_code={short_code} to the destination URL
     # ---------------------------------------------------------
-    from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-
-    parsed_url = urlparse(link.destination_url)
-    query_params = parse_qs(parsed_url.query)
-    
-    # Inject ref_code
-    query_params['ref_code'] = [short_code]
-    
-    new_query_string = urlencode(query_params, doseq=True)
-    new_url = urlunparse((
-        parsed_url.scheme,
-        parsed_url.netloc,
-        parsed_url.path,
-        parsed_url.params,
-        new_query_string,
-        parsed_url.fragment
-    ))
-    
-    return RedirectResponse(url=new_url)
+    return RedirectResponse(url=build_redirect_url(link.destination_url, short_code))
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, Query
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from datetime import datetime
 
 from app.core import deps
+from app.core.config import settings
+from app.core.database import replica_router
 from app.services.stats import StatsService
-from app.models.advertiser import Advertiser
-from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -14,222 +18,91 @@ router = APIRouter()
 async def get_overview(
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    advertiser_id: Optional[int] = Query(None, description="SuperRoot Override"),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get high-level dashboard metrics (Clicks, Conversions, GMV).
     If advertiser_id is None and user is SUPERROOT, returns Global Stats.
     """
-    target_id = None
-    
-    # 1. API Key Auth (Advertiser Context)
-    if current_advertiser:
-        target_id = current_advertiser.id
-        # Safety: API Key user can't override advertiser_id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    
-    # 2. JWT Auth (Dashboard Context)
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required (API Key or Admin)")
-         
     return await StatsService.get_overview(db, target_id, from_date, to_date, campaign_id, influencer_id)
 
 @router.get("/chart")
 async def get_chart_data(
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get daily time-series data for Clicks vs Conversions.
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     return await StatsService.get_chart_data(db, target_id, from_date, to_date, campaign_id, influencer_id)
 
 @router.get("/breakdown")
 async def get_event_breakdown(
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get aggregated counts by Event Type (Sankey/Funnel data).
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     return await StatsService.get_event_breakdown(db, target_id, from_date, to_date, campaign_id, influencer_id)
 
 @router.get("/campaigns")
 async def get_top_campaigns(
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get performance breakdown by Campaign (Top 10 by Revenue).
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     return await StatsService.get_top_campaigns(db, target_id, limit=10, campaign_id=campaign_id, influencer_id=influencer_id)
 
 @router.get("/influencers")
 async def get_top_influencers(
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get performance breakdown by Influencer (Top 10 by Revenue).
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     return await StatsService.get_top_influencers(db, target_id, limit=10, campaign_id=campaign_id, influencer_id=influencer_id)
 
 @router.get("/coupons")
 async def get_top_coupons(
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get performance breakdown by Coupon Code (Top 10 by Revenue).
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     return await StatsService.get_top_coupons(db, target_id, limit=10, campaign_id=campaign_id, influencer_id=influencer_id)
 
 @router.get("/tracking-links")
 async def get_top_links(
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get performance breakdown by Tracking Link (Top 10 by Revenue).
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     return await StatsService.get_top_links(db, target_id, limit=10, campaign_id=campaign_id, influencer_id=influencer_id)
 
 from fastapi.responses import StreamingResponse
@@ -238,32 +111,14 @@ from fastapi.responses import StreamingResponse
 async def export_events(
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Download raw event data as CSV.
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     csv_generator = StatsService.export_events_csv(db, target_id, from_date, to_date, campaign_id, influencer_id)
     return StreamingResponse(
         csv_generator, 
@@ -275,42 +130,22 @@ async def export_events(
 async def get_journey_stats(
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    advertiser_id: Optional[int] = Query(None),
     campaign_id: Optional[int] = Query(None),
     influencer_id: Optional[int] = Query(None),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get Source -> Attribution -> Outcome flow data.
     """
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-             from fastapi import HTTPException
-             raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
-            
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-         from fastapi import HTTPException
-         raise HTTPException(status_code=401, detail="Authentication required")
-
     return await StatsService.get_journey_stats(db, target_id, from_date, to_date, campaign_id, influencer_id)
 
 
 @router.get("/forecast")
 async def get_forecast(
-    advertiser_id: Optional[int] = Query(None),
     days_ahead: int = Query(30, ge=7, le=90),
-    current_advertiser: Optional[Advertiser] = Depends(deps.superroot_get_current_advertiser),
-    current_user: Optional[User] = Depends(deps.get_current_active_user),
-    db: AsyncSession = Depends(deps.get_db)
+    target_id: Optional[int] = Depends(deps.get_stats_target),
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """
     Get traffic (clicks) and sales (purchases) forecast using Holt-Winters.
@@ -319,20 +154,70 @@ async def get_forecast(
     """
     from app.services.forecast import ForecastService
 
-    target_id = None
-    if current_advertiser:
-        target_id = current_advertiser.id
-        if advertiser_id and advertiser_id != target_id:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
-    elif current_user:
-        if current_user.role == UserRole.ADVERTISER:
-            target_id = current_user.advertiser_id
-        elif current_user.role == UserRole.SUPERROOT:
-            target_id = advertiser_id
 
-    if target_id is None and (not current_user or current_user.role != UserRole.SUPERROOT):
-        from fastapi import HTTPException
-        raise HTTPException(status_code=401, detail="Authentication required")
+    return await ForecastService.get_forecast(db, target_id, days_ahead)
+
 
+async def _forecast_widget(db: AsyncSession, target_id: Optional[int], days_ahead: int):
+    from app.services.forecast import ForecastService
     return await ForecastService.get_forecast(db, target_id, days_ahead)
+
+# Composite dashboard: name -> widget query (same arguments as the individual endpoint)
+DASHBOARD_WIDGETS = {
+    "overview": lambda db, target_id, f: StatsService.get_overview(db, target_id, f["from"], f["to"], f["campaign_id"], f["influencer_id"]),
+    "chart": lambda db, target_id, f: StatsService.get_chart_data(db, target_id, f["from"], f["to"], f["campaign_id"], f["influencer_id"]),
+    "breakdown": lambda db, target_id, f: StatsService.get_event_breakdown(db, target_id, f["from"], f["to"], f["campaign_id"], f["influencer_id"]),
+    "campaigns": lambda db, target_id, f: StatsService.get_top_campaigns(db, target_id, limit=10, campaign_id=f["campaign_id"], influencer_id=f["influencer_id"]),
+    "influencers": lambda db, target_id, f: StatsService.get_top_influencers(db, target_id, limit=10, campaign_id=f["campaign_id"], influencer_id=f["influencer_id"]),
+    "coupons": lambda db, target_id, f: StatsService.get_top_coupons(db, target_id, limit=10, campaign_id=f["campaign_id"], influencer_id=f["influencer_id"]),
+    "tracking-links": lambda db, target_id, f: StatsService.get_top_links(db, target_id, limit=10, campaign_id=f["campaign_id"], influencer_id=f["influencer_id"]),
+    "journey": lambda db, target_id, f: StatsService.get_journey_stats(db, target_id, f["from"], f["to"], f["campaign_id"], f["influencer_id"]),
+    "forecast": lambda db, target_id, f: _forecast_widget(db, target_id, f["days_ahead"]),
+}
+
+@router.get("/dashboard")
+async def get_dashboard(
+    widgets: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(DASHBOARD_WIDGETS)} (default: all)"),
+    from_date: Optional[datetime] = Query(None, alias="from"),
+    to_date: Optional[datetime] = Query(None, alias="to"),
+    campaign_id: Optional[int] = Query(None),
+    influencer_id: Optional[int] = Query(None),
+    days_ahead: int = Query(30, ge=7, le=90),
+    target_id: Optional[int] = Depends(deps.get_stats_target)
+):
+    """
+    All dashboard widgets in one request: authenticates once, then runs the widget
+    queries concurrently, each on its own pooled (read) session.
+    Returns {"widgets": {name: data}, "errors": {name: {"status_code", "detail"}}};
+    a widget that fails reports the status the individual endpoint would have
+    returned while the others are still delivered.
+    """
+    names = [w.strip() for w in widgets.split(",") if w.strip()] if widgets else list(DASHBOARD_WIDGETS)
+    unknown = [w for w in names if w not in DASHBOARD_WIDGETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown widgets: {', '.join(unknown)}. Valid: {', '.join(DASHBOARD_WIDGETS)}")
+    names = list(dict.fromkeys(names))
+
+    filters = {"from": from_date, "to": to_date, "campaign_id": campaign_id, "influencer_id": influencer_id, "days_ahead": days_ahead}
+    # Bounded so one page load cannot take the whole pool
+    semaphore = asyncio.Semaphore(settings.DASHBOARD_WIDGET_CONCURRENCY)
+    results = {}
+    errors = {}
+
+    async def run(name: str):
+        async with semaphore:
+            session_factory = await replica_router.sessionmaker()
+            async with session_factory() as db:
+                try:
+                    results[name] = await DASHBOARD_WIDGETS[name](db, target_id, filters)
+                except HTTPException as e:
+                    errors[name] = {"status_code": e.status_code, "detail": e.detail}
+                except Exception:
+                    logger.exception(f"Dashboard widget '{name}' failed")
+                    errors[name] = {"status_code": 500, "detail": "Internal Server Error"}
+
+    await asyncio.gather(*(run(name) for name in names))
+    return {
+        "widgets": {name: results[name] for name in names if name in results},
+        "errors": errors
+    }
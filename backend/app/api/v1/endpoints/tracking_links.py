@@ -2,23 +2,29 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
 from typing import List, Any, Dict
-import string
-import random
+from datetime import datetime
 
 from app.core.database import get_db
+from app.core.db_errors import is_duplicate_key
 from app.core.deps import get_current_active_user
 from app.models.user import User, UserRole
 from app.models.tracking_link import TrackingLink
 from app.models.click_event import ClickEvent
 from app.models.campaign import Campaign
 from app.models.influencer import Influencer
-from app.schemas.tracking import TrackingLinkCreate, TrackingLinkResponse, TrackingLinkEmailRequest
-from app.services.email import email_service
+from app.schemas.tracking import TrackingLinkCreate, TrackingLinkResponse, TrackingLinkEmailRequest, TrackingLinkBulkCreate, TrackingLinkBulkResponse
+from app.services.notifications import NotificationService
+from app.services.short_codes import short_code_allocator
 
 router = APIRouter()
 
+BULK_INSERT_CHUNK_SIZE = 1000
+SHORT_CODE_MAX_RETRIES = 5
+SHORT_CODE_INDEX = "ix_tracking_links_short_code"
+
 
 # ... existing code ...
 
@@ -32,67 +38,10 @@ async def notify_influencers(
     """
     Send emails to influencers with their assigned tracking links.
     """
-    stmt = select(TrackingLink).join(Campaign).join(Influencer).options(
-        selectinload(TrackingLink.campaign),
-        selectinload(TrackingLink.influencer)
-    ).where(Influencer.email.isnot(None))
-
-    # Scoping
-    if current_user.role == UserRole.ADVERTISER:
-        stmt = stmt.where(Campaign.advertiser_id == current_user.advertiser_id)
+    return await NotificationService.notify_links(
+        db, item, role=current_user.role, advertiser_id=current_user.advertiser_id
+    )
 
-    # Filter Logic
-    if item.send_all:
-        if item.campaign_id_filter:
-            stmt = stmt.where(TrackingLink.campaign_id == item.campaign_id_filter)
-    else:
-        if not item.ids:
-            return {"message": "No links selected", "sent_count": 0}
-        stmt = stmt.where(TrackingLink.id.in_(item.ids))
-
-    result = await db.execute(stmt)
-    links = result.scalars().all()
-
-    # Group by Influencer and Campaign
-    grouped: Dict[tuple, List[TrackingLink]] = {}
-    
-    for link in links:
-        key = (link.influencer_id, link.campaign_id)
-        if key not in grouped:
-            grouped[key] = []
-        grouped[key].append(link)
-
-    sent_count = 0
-    failed_count = 0
-    
-    for (inf_id, camp_id), link_list in grouped.items():
-        influencer = link_list[0].influencer
-        campaign = link_list[0].campaign
-        
-        if influencer and influencer.email:
-            success = email_service.send_links(
-                influencer_name=influencer.name,
-                influencer_email=influencer.email,
-                campaign_name=campaign.name,
-                links=link_list
-            )
-            if success:
-                sent_count += 1
-            else:
-                failed_count += 1
-
-    return {
-        "message": f"Processed {len(links)} links.",
-        "emails_sent": sent_count,
-        "emails_failed": failed_count,
-        "influencers_targeted": len(grouped)
-    }
-
-
-def generate_short_code(length: int = 6) -> str:
-    """Generates a random short code."""
-    chars = string.ascii_letters + string.digits
-    return ''.join(random.choices(chars, k=length))
 
 @router.post("/", response_model=TrackingLinkResponse, status_code=status.HTTP_201_CREATED)
 async def create_tracking_link(
@@ -115,45 +64,127 @@ async def create_tracking_link(
              raise HTTPException(status_code=403, detail="Not authorized to access this campaign")
 
     # Validate Influencer if provided
+    influencer = None
     if item.influencer_id:
         result = await db.execute(select(Influencer).where(Influencer.id == item.influencer_id))
         influencer = result.scalar_one_or_none()
         if not influencer:
             raise HTTPException(status_code=404, detail="Influencer not found")
 
-    # Generate Unique Short Code
-    max_retries = 5
-    for _ in range(max_retries):
-        short_code = generate_short_code()
-        # Check uniqueness
-        result = await db.execute(select(TrackingLink).where(TrackingLink.short_code == short_code))
-        existing = result.scalar_one_or_none()
-        
-        if not existing:
-            new_link = TrackingLink(
-                short_code=short_code,
-                destination_url=str(item.destination_url),
-                campaign_id=item.campaign_id,
-                influencer_id=item.influencer_id,
-                cpc_rate=item.cpc_rate
-            )
-            db.add(new_link)
+    campaign_summary = {"id": campaign.id, "name": campaign.name}
+    influencer_summary = {"id": influencer.id, "name": influencer.name} if influencer else None
+
+    # Short codes are unique by construction (block-reserved counter), so no probe is needed.
+    # A duplicate can still come from a reset sequence row or a hand-inserted link: take the next code.
+    for _ in range(SHORT_CODE_MAX_RETRIES):
+        new_link = TrackingLink(
+            short_code=await short_code_allocator.allocate(),
+            destination_url=str(item.destination_url),
+            campaign_id=item.campaign_id,
+            influencer_id=item.influencer_id,
+            cpc_rate=item.cpc_rate
+        )
+        db.add(new_link)
+        try:
             await db.commit()
-            await db.refresh(new_link)
-            
-            # Re-fetch with eager loading
-            stmt = select(TrackingLink).options(
-                selectinload(TrackingLink.campaign),
-                selectinload(TrackingLink.influencer)
-            ).where(TrackingLink.id == new_link.id)
-            result = await db.execute(stmt)
-            final_link = result.scalar_one()
-            
-            # Manually attach click_count=0 for the response model
-            final_link.click_count = 0
-            return final_link
-
-    raise HTTPException(status_code=409, detail="Could not generate unique short code.")
+            break
+        except IntegrityError as e:
+            await db.rollback()
+            if not is_duplicate_key(e, SHORT_CODE_INDEX):
+                raise
+    else:
+        raise HTTPException(status_code=409, detail="Could not generate unique short code.")
+
+    # Response is built from what we hold: generated id + client-side defaults.
+    # A brand-new link has no clicks, so click_count is 0 without a query.
+    return {
+        "id": new_link.id,
+        "short_code": new_link.short_code,
+        "destination_url": new_link.destination_url,
+        "cpc_rate": new_link.cpc_rate,
+        "campaign_id": new_link.campaign_id,
+        "influencer_id": new_link.influencer_id,
+        "created_at": new_link.created_at,
+        "campaign": campaign_summary,
+        "influencer": influencer_summary,
+        "click_count": 0
+    }
+
+@router.post("/bulk", response_model=TrackingLinkBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_tracking_links_bulk(
+    item: TrackingLinkBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Create tracking links for many influencers of one campaign in a single call.
+    All referenced IDs are validated up front; either every link is created or none.
+    """
+    # Validate Campaign
+    result = await db.execute(select(Campaign.id, Campaign.advertiser_id).where(Campaign.id == item.campaign_id))
+    campaign = result.first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    # Scoping
+    if current_user.role == UserRole.ADVERTISER:
+        if campaign.advertiser_id != current_user.advertiser_id:
+             raise HTTPException(status_code=403, detail="Not authorized to access this campaign")
+
+    # Validate all Influencers in one query
+    influencer_ids = {link.influencer_id for link in item.links if link.influencer_id}
+    if influencer_ids:
+        result = await db.execute(select(Influencer.id).where(Influencer.id.in_(influencer_ids)))
+        missing = influencer_ids - set(result.scalars().all())
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Influencers not found: {sorted(missing)}")
+
+    short_codes = await short_code_allocator.allocate_many(len(item.links))
+    now = datetime.utcnow()
+    rows = [
+        {
+            "short_code": short_code,
+            "destination_url": str(link.destination_url),
+            "campaign_id": item.campaign_id,
+            "influencer_id": link.influencer_id,
+            "cpc_rate": link.cpc_rate,
+            "created_at": now
+        }
+        for link, short_code in zip(item.links, short_codes)
+    ]
+
+    # One transaction, multi-row INSERTs. Each chunk runs in a savepoint, so a duplicate code
+    # (reset sequence row, hand-inserted link) only costs new codes for the rows that collided.
+    for i in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        chunk = rows[i:i + BULK_INSERT_CHUNK_SIZE]
+        for _ in range(SHORT_CODE_MAX_RETRIES):
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(TrackingLink), chunk)
+                break
+            except IntegrityError as e:
+                if not is_duplicate_key(e, SHORT_CODE_INDEX):
+                    raise
+                result = await db.execute(
+                    select(TrackingLink.short_code).where(TrackingLink.short_code.in_([row["short_code"] for row in chunk]))
+                )
+                taken = {code.lower() for code in result.scalars().all()}  # The column compares case-insensitively
+                colliding = [row for row in chunk if row["short_code"] in taken]
+                for row, short_code in zip(colliding, await short_code_allocator.allocate_many(len(colliding))):
+                    row["short_code"] = short_code
+        else:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Could not generate unique short codes.")
+    await db.commit()
+
+    return {
+        "campaign_id": item.campaign_id,
+        "created": len(rows),
+        "links": [
+            {"influencer_id": row["influencer_id"], "destination_url": row["destination_url"], "short_code": row["short_code"]}
+            for row in rows
+        ]
+    }
 
 from sqlalchemy.orm import selectinload
 
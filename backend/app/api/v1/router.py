@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import advertisers, campaigns, influencers, coupons, tracking_links, redirect, events, stats, auth
+from app.api.v1.endpoints import advertisers, campaigns, influencers, coupons, tracking_links, redirect, events, stats, auth, jobs, internal
 
 api_router = APIRouter()
 
@@ -12,6 +12,8 @@ api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
 api_router.include_router(redirect.router, prefix="/r", tags=["redirect"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(internal.router, prefix="/internal", tags=["internal"])
 
 @api_router.get("/status")
 def status():
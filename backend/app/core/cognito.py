@@ -1,39 +1,149 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
 import httpx
 from jose import jwt, jwk
+from jose.backends.base import Key
 from jose.utils import base64url_decode
 import time
 from fastapi import HTTPException, status
 from app.core.config import settings
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of sha256(token) -> verified claims. An entry is only served
+    until the token's `exp`, so a hit is exactly as valid as re-verifying.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, digest: str) -> Optional[dict]:
+        claims = self._entries.get(digest)
+        if claims is None:
+            self.misses += 1
+            return None
+        if claims.get("exp", 0) <= time.time():
+            del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return claims
+
+    def put(self, digest: str, claims: dict) -> None:
+        if self.max_size <= 0 or "exp" not in claims:
+            return
+        self._entries[digest] = claims
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
 class CognitoVerifier:
     def __init__(self):
         self.region = settings.COGNITO_REGION
         self.user_pool_id = settings.COGNITO_USER_POOL_ID
         self.app_client_id = settings.COGNITO_APP_CLIENT_ID
         self.jwks = None
+        self.keys: Dict[str, Key] = {}  # kid -> constructed RS256 public key
         self.last_fetch = 0
-        self.jwks_url = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
+        self.last_attempt = 0
+        self.token_cache = VerifiedTokenCache(settings.COGNITO_TOKEN_CACHE_SIZE)
+        self.jwks_url = settings.COGNITO_JWKS_URL or f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived pooled client; opened by the app lifespan (or lazily outside it)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=settings.COGNITO_HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=2)
+            )
+        return self._client
+
+    async def startup(self):
+        """Opens the HTTP client and warms the JWKS so the first request does not pay for it."""
+        self.client
+        if self.user_pool_id and self.region:
+            try:
+                await self.get_jwks()
+            except HTTPException:
+                pass  # Logged in _fetch_jwks; requests will retry
+
+    async def shutdown(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch_jwks(self):
+        self.last_attempt = time.time()
+        try:
+            response = await self.client.get(self.jwks_url)
+            response.raise_for_status()
+            jwks = response.json().get("keys", [])
+            # Parse each key once here instead of on every verification
+            keys = {key["kid"]: jwk.construct(key, algorithm="RS256") for key in jwks}
+        except Exception as e:
+            print(f"Error fetching JWKS: {e}")
+            if not self.jwks:
+                raise HTTPException(status_code=500, detail="Internal Auth Error")
+            return  # Keep serving the keys we have
+        self.jwks, self.keys = jwks, keys
+        self.last_fetch = time.time()
+        # Claims verified against the previous key set are re-verified
+        self.token_cache.clear()
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Single flight: concurrent callers share one in-progress fetch."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._fetch_jwks())
+        return self._refresh_task
+
+    async def _refresh(self):
+        # Shielded so a cancelled request does not cancel the fetch other requests wait on
+        await asyncio.shield(self._start_refresh())
 
     async def get_jwks(self):
-        # Refresh JWKS every 24 hours
-        if not self.jwks or time.time() - self.last_fetch > 86400:
-            if not self.user_pool_id or not self.region:
-                 # If config is missing (e.g. initial setup), we can't verify.
-                 # Returning None/Empty to fail validation gracefully or raise Error.
-                 print("WARNING: Cognito Config missing. Verification will fail.")
-                 return []
-            
-            async with httpx.AsyncClient() as client:
-                try:
-                    response = await client.get(self.jwks_url)
-                    response.raise_for_status()
-                    self.jwks = response.json().get("keys", [])
-                    self.last_fetch = time.time()
-                except Exception as e:
-                    print(f"Error fetching JWKS: {e}")
-                    raise HTTPException(status_code=500, detail="Internal Auth Error")
+        if not self.user_pool_id or not self.region:
+            # If config is missing (e.g. initial setup), we can't verify.
+            # Returning None/Empty to fail validation gracefully or raise Error.
+            print("WARNING: Cognito Config missing. Verification will fail.")
+            return []
+
+        if not self.jwks:
+            # Nothing to serve yet: wait for the (shared) fetch
+            await self._refresh()
+        elif time.time() - self.last_fetch > settings.COGNITO_JWKS_TTL_SECONDS:
+            # Stale-while-revalidate: keep verifying with the current keys, refresh in the background
+            self._start_refresh()
         return self.jwks
 
+    async def get_key(self, kid: str) -> Optional[Key]:
+        await self.get_jwks()
+        key = self.keys.get(kid)
+        if key is None and time.time() - self.last_attempt >= settings.COGNITO_JWKS_MIN_REFRESH_SECONDS:
+            # Unknown kid: the pool may have rotated its keys. Rate limited, so tokens
+            # with made-up kids cannot turn into a flood of JWKS requests.
+            await self._refresh()
+            key = self.keys.get(kid)
+        return key
+
     async def verify_token(self, token: str) -> dict:
         """
         Verifies the JWT signature, Claims, and Expiration.
@@ -46,8 +156,12 @@ class CognitoVerifier:
                 detail="Cognito Configuration Missing"
             )
 
-        keys = await self.get_jwks()
-        
+        # Same bearer token seen before (e.g. the dashboard's parallel calls): no crypto needed
+        digest = self.token_cache.digest(token)
+        cached = self.token_cache.get(digest)
+        if cached is not None:
+            return cached
+
         # Get Header to find Key ID (kid)
         try:
             headers = jwt.get_unverified_header(token)
@@ -59,16 +173,9 @@ class CognitoVerifier:
             raise HTTPException(status_code=401, detail="Token missing 'kid' header")
 
         # Find the Public Key
-        key_index = -1
-        for i in range(len(keys)):
-            if kid == keys[i]["kid"]:
-                key_index = i
-                break
-        
-        if key_index == -1:
+        public_key = await self.get_key(kid)
+        if public_key is None:
             raise HTTPException(status_code=401, detail="Public key not found in JWKS")
-
-        public_key = keys[key_index]
         
         # Verify
         try:
@@ -90,6 +197,7 @@ class CognitoVerifier:
             # If token_use is 'access', check client_id.
             # If token_use is 'id', check aud.
             
+            self.token_cache.put(digest, claims)
             return claims
             
         except jwt.ExpiredSignatureError:
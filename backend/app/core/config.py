@@ -11,6 +11,41 @@ class Settings(BaseSettings):
     MYSQL_SERVER: str
     MYSQL_PORT: int
     MYSQL_DB: str
+
+    # Engine / connection pool, per process. Gunicorn runs 4 workers, so the server
+    # needs max_connections >= 4 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) plus the worker.
+    DB_ECHO: bool = False                 # Logs every statement; development only
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30             # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_PRE_PING: bool = True
+
+    # Optional read replica for stats / reporting; unset = reads go to the primary.
+    # The lag check runs SHOW REPLICA STATUS, so MYSQL_USER needs the REPLICATION CLIENT
+    # privilege on the replica; without it reads stay on the primary (logged at startup).
+    MYSQL_READ_SERVER: Optional[str] = None
+    MYSQL_READ_PORT: Optional[int] = None
+    DB_READ_POOL_SIZE: int = 10
+    DB_READ_MAX_OVERFLOW: int = 10
+    DB_READ_MAX_LAG_SECONDS: float = 5.0            # Beyond this, reads fall back to the primary
+    DB_READ_LAG_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    # GET /metrics (Prometheus text format, per worker process). When a token is set,
+    # scrapers must send `Authorization: Bearer <token>`.
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None
+
+    # Slow-query profiler (GET /internal/slow-queries). Off = no hooks registered at all.
+    QUERY_PROFILER_ENABLED: bool = False
+    QUERY_PROFILER_MAX_FINGERPRINTS: int = 500   # Distinct statement shapes tracked per process
+    QUERY_PROFILER_SAMPLES: int = 1000           # Recent durations kept per fingerprint for percentiles
+    QUERY_PROFILER_SLOW_MS: float = 200.0
+    QUERY_PROFILER_EXPLAIN: bool = True          # EXPLAIN slow SELECTs on a separate connection
+    QUERY_PROFILER_EXPLAIN_INTERVAL_SECONDS: int = 300  # Per fingerprint
+
+    # GET /stats/dashboard: widget queries run concurrently, each on its own connection
+    DASHBOARD_WIDGET_CONCURRENCY: int = 4
     
     # Secret Key for JWT
     SECRET_KEY: str
@@ -26,6 +61,11 @@ class Settings(BaseSettings):
     COGNITO_APP_CLIENT_ID: Optional[str] = None
     COGNITO_AWS_ACCESS_KEY_ID: Optional[str] = None
     COGNITO_AWS_SECRET_ACCESS_KEY: Optional[str] = None
+    COGNITO_TOKEN_CACHE_SIZE: int = 2048      # Verified tokens kept per process (until their exp)
+    COGNITO_JWKS_URL: Optional[str] = None    # Override, e.g. scripts/jwks_stub_server.py; default derives from region + pool
+    COGNITO_JWKS_TTL_SECONDS: int = 86400     # Older keys are still served while a refresh runs in the background
+    COGNITO_JWKS_MIN_REFRESH_SECONDS: int = 60  # Floor between refreshes triggered by an unknown kid
+    COGNITO_HTTP_TIMEOUT_SECONDS: float = 5.0
     
     # AWS SES (Email)
     AWS_ACCESS_KEY_ID: Optional[str] = None
@@ -33,6 +73,71 @@ class Settings(BaseSettings):
     AWS_REGION: Optional[str] = "us-east-1"
     SENDER_EMAIL: Optional[str] = "noreply@superher.in"
 
+    # Email transport: 'ses' (falls back to 'log' without AWS credentials), 'smtp' or 'log'
+    EMAIL_TRANSPORT: str = "ses"
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 1025                     # scripts/email_sink.py listens here by default
+    SMTP_USE_TLS: bool = False
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    EMAIL_MIME_SKELETON: bool = True          # Reuse a prebuilt MIME layout instead of building a MIMEMultipart per email
+
+    # Bulk email dispatch (/notify endpoints)
+    EMAIL_SEND_RATE_PER_SECOND: float = 14.0  # Match the account's SES max send rate
+    # The rate is enforced per process, so each process that can send gets an equal
+    # share of it. Default: 4 gunicorn workers + the job worker (Dockerfile.prod).
+    # Keep it in line with the deployment, or the processes together exceed the quota.
+    EMAIL_DISPATCH_PROCESSES: int = 5
+    EMAIL_DISPATCH_CONCURRENCY: int = 8       # Sending threads
+    EMAIL_SEND_MAX_RETRIES: int = 3           # Retries for throttling / transient errors
+    EMAIL_RETRY_BASE_DELAY_SECONDS: float = 1.0
+
+    # Event Ingestion
+    # Where the full raw payload of each event is kept:
+    # 'side_table' (customer_event_payloads, keeps hot rows narrow) or 'inline' (legacy raw_data column)
+    EVENT_RAW_PAYLOAD_STORAGE: str = "side_table"
+    EVENT_RAW_PAYLOAD_COMPRESS: bool = True  # zlib-compress side table payloads
+
+    # 'sync' (attribute + INSERT inside the request) or 'spool' (durable local spool, 202 Accepted)
+    EVENT_INGEST_MODE: str = "sync"
+    EVENT_SPOOL_DIR: str = "var/event_spool"
+    EVENT_SPOOL_FSYNC_INTERVAL_MS: int = 10       # Group-commit window for spool appends
+    EVENT_SPOOL_ROTATE_INTERVAL_MS: int = 1000    # Seal the active segment at least this often
+    EVENT_SPOOL_SEGMENT_MAX_BYTES: int = 8 * 1024 * 1024
+    EVENT_SPOOL_POLL_INTERVAL_MS: int = 500
+    EVENT_SPOOL_BATCH_SIZE: int = 500             # Events per consumer transaction
+
+    # Recent idempotency keys answered from memory before hitting the unique index
+    IDEMPOTENCY_CACHE_SIZE: int = 100_000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: int = 24 * 3600
+
+    # API key -> Advertiser lookups can be cached per process so spooled ingestion
+    # keeps accepting events while the database is briefly unavailable. Off by
+    # default: revoking a key or deactivating an advertiser only clears the cache
+    # of the process that served the request, so with a TTL > 0 the other workers
+    # keep accepting the key for up to that many seconds.
+    API_KEY_CACHE_TTL_SECONDS: int = 0
+
+    # Active users can be cached per process by cognito_sub (see get_current_user).
+    # Off by default: deactivating or unlinking a user only clears the cache of the
+    # process that made the change (not the other gunicorn workers, and the job
+    # worker never reaches them), so with a TTL > 0 the other processes keep
+    # accepting the old user for up to that many seconds.
+    USER_CACHE_TTL_SECONDS: int = 0
+
+    # Tracking link short codes: counter values reserved per process per DB round trip
+    SHORT_CODE_BLOCK_SIZE: int = 1000
+
+    # Background jobs (`python -m app.worker`)
+    JOB_WORKER_CONCURRENCY: int = 2          # Jobs run concurrently per worker process
+    JOB_POLL_INTERVAL_MS: int = 1000
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: int = 30      # Doubles per attempt
+    JOB_STALE_AFTER_SECONDS: int = 300       # Running jobs without a heartbeat this long are requeued
+
+    # Advertiser deletion: rows per DELETE ... LIMIT statement; each batch commits on its own
+    ADVERTISER_DELETE_BATCH_SIZE: int = 5000
+
     model_config = SettingsConfigDict(
         case_sensitive=True, 
         env_file="../.env", 
@@ -44,4 +149,11 @@ class Settings(BaseSettings):
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return f"mysql+aiomysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}:{self.MYSQL_PORT}/{self.MYSQL_DB}"
 
+    @property
+    def SQLALCHEMY_READ_DATABASE_URI(self) -> Optional[str]:
+        if not self.MYSQL_READ_SERVER:
+            return None
+        port = self.MYSQL_READ_PORT or self.MYSQL_PORT
+        return f"mysql+aiomysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_READ_SERVER}:{port}/{self.MYSQL_DB}"
+
 settings = Settings()
@@ -1,16 +1,236 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.db_errors import MYSQL_SPECIFIC_ACCESS_DENIED, mysql_error_code
+from app.core.metrics import instrument_engine, record_pool_wait
+from app.core.query_profiler import query_profiler
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Checkout counters for one pool (per process)."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+# Keyed by pool name; survives pool.recreate(), which keeps the logging name
+POOL_STATS: Dict[str, PoolStats] = {}
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        stats = POOL_STATS.setdefault(self._orig_logging_name or "default", PoolStats())
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        wait = time.perf_counter() - start
+        stats.record(wait)
+        record_pool_wait(wait)
+        return connection
+
+
+def make_engine(url: str, name: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,  # Check connection liveness before use
+        pool_logging_name=name
+    )
+
+
+engine = make_engine(settings.SQLALCHEMY_DATABASE_URI, "primary", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+
+# Read-only traffic (stats, exports). Same engine as writes unless a replica is configured.
+if settings.SQLALCHEMY_READ_DATABASE_URI:
+    read_engine = make_engine(settings.SQLALCHEMY_READ_DATABASE_URI, "read", settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW)
+else:
+    read_engine = engine
+
+for _engine in {engine, read_engine}:
+    instrument_engine(_engine)
+    if settings.QUERY_PROFILER_ENABLED:
+        query_profiler.install(_engine)
+
+
+class ReadOnlySession(Session):
+    """Session class behind read sessions: flushing changes or running INSERT/UPDATE/DELETE raises."""
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _refuse_flush(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise exc.InvalidRequestError("Read-only session: writes must go through get_db / SessionLocal")
+
+
+@event.listens_for(ReadOnlySession, "do_orm_execute")
+def _refuse_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        raise exc.InvalidRequestError("Read-only session: writes must go through get_db / SessionLocal")
 
-engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=True, # Set to False in production
-    future=True,
-    pool_pre_ping=True,  # Check connection liveness before use
-    pool_recycle=3600    # Recycle connections every hour
-)
 
-# asd
+def read_sessionmaker(bind: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        sync_session_class=ReadOnlySession,
+        expire_on_commit=False,
+        autoflush=False
+    )
+
+
+LagProbe = Callable[[AsyncConnection], Awaitable[Optional[float]]]
+
+
+class ReplicaPrivilegeError(Exception):
+    """The replica connection's user may not read replication status."""
+
+
+async def mysql_replica_lag(conn: AsyncConnection) -> Optional[float]:
+    """
+    Seconds the replica is behind its source; None if replication is stopped.
+    A server that is not a replica (or not MySQL) reports 0. Raises
+    ReplicaPrivilegeError if the user lacks REPLICATION CLIENT.
+    """
+    if conn.dialect.name != "mysql":
+        return 0.0
+    for statement, column in (
+        ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),   # MySQL 8.0.22+
+        ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+    ):
+        try:
+            result = await conn.execute(text(statement))
+        except exc.DBAPIError as e:
+            # Error 1227 arrives as OperationalError, so it must be checked before the fallthrough
+            if mysql_error_code(e) == MYSQL_SPECIFIC_ACCESS_DENIED:
+                raise ReplicaPrivilegeError(
+                    f"{statement} was denied ({e.orig}); the replica lag check needs "
+                    f"GRANT REPLICATION CLIENT ON *.* TO '{settings.MYSQL_USER}'@'%'"
+                ) from e
+            if isinstance(e, exc.ProgrammingError):
+                continue  # Statement not supported by this server version
+            raise
+        row = result.mappings().first()
+        if row is None:
+            return 0.0
+        lag = row.get(column)
+        return None if lag is None else float(lag)
+    return 0.0
+
+
+class ReplicaRouter:
+    """
+    Hands out read-only sessions on the replica while it is reachable and at most
+    `max_lag` seconds behind, otherwise on the primary. Replica health is probed
+    at most every `check_interval` seconds; requests arriving during a probe use
+    the last known state instead of waiting for it.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica: Optional[async_sessionmaker],
+        replica_engine: Optional[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+        lag_probe: LagProbe = mysql_replica_lag
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.replica_engine = replica_engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.replica_sessions = 0
+        self.primary_fallbacks = 0
+        self._checked_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._privilege_error_logged = False
+
+    async def _refresh(self) -> None:
+        self._checked_at = time.monotonic()
+        try:
+            async with self.replica_engine.connect() as conn:
+                self.lag = await self.lag_probe(conn)
+            if self.lag is None:
+                self.healthy, self.last_error = False, "Replication is not running"
+            else:
+                self.healthy = self.lag <= self.max_lag
+                self.last_error = None if self.healthy else f"Replica lag {self.lag:.0f}s exceeds {self.max_lag:.0f}s"
+        except ReplicaPrivilegeError as e:
+            # A configuration error, not an outage: say so once instead of warning every interval.
+            # Still probed each interval, so granting the privilege brings the replica back.
+            self.healthy, self.lag, self.last_error = False, None, str(e)
+            if not self._privilege_error_logged:
+                logger.error(f"Read replica not used, all reads go to the primary: {e}")
+                self._privilege_error_logged = True
+            return
+        except Exception as e:
+            self.healthy, self.lag, self.last_error = False, None, str(e)
+        if not self.healthy:
+            logger.warning(f"Read replica unavailable, reading from primary: {self.last_error}")
+        self._privilege_error_logged = False
+
+    async def sessionmaker(self) -> async_sessionmaker:
+        if self.replica is None:
+            return self.primary
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        stale = self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval
+        # The first probe is awaited; later ones never hold up requests that can use the last result
+        if stale and (self._checked_at is None or not self._lock.locked()):
+            async with self._lock:
+                if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval:
+                    await self._refresh()
+        if self.healthy:
+            self.replica_sessions += 1
+            return self.replica
+        self.primary_fallbacks += 1
+        return self.primary
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "replica_configured": self.replica is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "last_error": self.last_error,
+            "replica_sessions": self.replica_sessions,
+            "primary_fallbacks": self.primary_fallbacks
+        }
+
 
 SessionLocal = async_sessionmaker(
     bind=engine,
@@ -19,6 +239,16 @@ SessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+ReadSessionLocal = read_sessionmaker(read_engine)
+
+replica_router = ReplicaRouter(
+    primary=read_sessionmaker(engine),
+    replica=ReadSessionLocal if read_engine is not engine else None,
+    replica_engine=read_engine if read_engine is not engine else None,
+    max_lag=settings.DB_READ_MAX_LAG_SECONDS,
+    check_interval=settings.DB_READ_LAG_CHECK_INTERVAL_SECONDS
+)
+
 Base = declarative_base()
 
 async def get_db():
@@ -27,3 +257,37 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+async def get_read_db():
+    """Read-only session for stats / reporting: the replica when healthy, else the primary."""
+    session_factory = await replica_router.sessionmaker()
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def pool_status() -> List[Dict[str, Any]]:
+    """Live pool state plus checkout/wait counters for each distinct engine in this process."""
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+    status = []
+    for eng in engines:
+        pool = eng.pool
+        name = pool._orig_logging_name or "default"
+        stats = POOL_STATS.get(name, PoolStats())
+        attempts = stats.checkouts + stats.timeouts
+        status.append({
+            "name": name,
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_ms_total": round(stats.wait_total * 1000, 2),
+            "wait_ms_avg": round(stats.wait_total * 1000 / attempts, 3) if attempts else 0.0,
+            "wait_ms_max": round(stats.wait_max * 1000, 2)
+        })
+    return status
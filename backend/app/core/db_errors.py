@@ -0,0 +1,65 @@
+"""
+Classification of database errors by driver error code.
+
+SQLAlchemy wraps every driver error in the same few exception classes, so an
+IntegrityError can be a duplicate key, a missing foreign key row or a NOT NULL
+violation. Callers that handle one of these cases specifically must check the
+MySQL error code (first arg of the driver exception) and let the rest
+propagate. The SQLite fallbacks keep the scripts that run on aiosqlite
+working.
+"""
+
+import asyncio
+from typing import Optional
+
+from sqlalchemy import exc
+
+MYSQL_DUPLICATE_ENTRY = 1062
+MYSQL_NO_REFERENCED_ROW = 1452
+MYSQL_SPECIFIC_ACCESS_DENIED = 1227  # Statement needs a privilege the user lacks (e.g. REPLICATION CLIENT)
+
+# Too many connections, lock wait timeout, deadlock, can't connect, server gone away, lost connection
+TRANSIENT_MYSQL_ERRORS = {1040, 1205, 1213, 2003, 2006, 2013}
+
+
+def mysql_error_code(error: exc.DBAPIError) -> Optional[int]:
+    args = getattr(error.orig, "args", ())
+    return args[0] if args and isinstance(args[0], int) else None
+
+
+def is_duplicate_key(error: exc.DBAPIError, key: Optional[str] = None) -> bool:
+    """
+    True for a unique-constraint violation. With `key`, only when that index
+    is the one violated (MySQL names it in the message; SQLite lists columns,
+    so there `key` is not checked).
+    """
+    code = mysql_error_code(error)
+    if code is None:
+        return "UNIQUE constraint failed" in str(error.orig)
+    return code == MYSQL_DUPLICATE_ENTRY and (key is None or key in str(error.orig))
+
+
+def is_foreign_key_violation(error: exc.DBAPIError) -> bool:
+    """True when an INSERT / UPDATE references a parent row that does not exist."""
+    code = mysql_error_code(error)
+    if code is None:
+        return "FOREIGN KEY constraint failed" in str(error.orig)
+    return code == MYSQL_NO_REFERENCED_ROW
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    True when the same statement can succeed if retried later: the database was
+    unreachable, the pool timed out, or the transaction lost a lock wait or a
+    deadlock. Anything else (bad data, constraint violations) fails again.
+    """
+    if isinstance(error, exc.TimeoutError):  # Pool checkout timed out
+        return True
+    if isinstance(error, exc.DBAPIError):
+        if error.connection_invalidated:
+            return True
+        code = mysql_error_code(error)
+        if code is None:
+            return isinstance(error, exc.OperationalError)  # SQLite: "database is locked", unreachable file
+        return code in TRANSIENT_MYSQL_ERRORS
+    return isinstance(error, (ConnectionError, asyncio.TimeoutError))
@@ -1,20 +1,87 @@
-from fastapi import Security, HTTPException, status, Depends
+from fastapi import Security, HTTPException, status, Depends, Query, Request
 from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import Optional
+from typing import NamedTuple, Optional, Dict, Tuple
 import hashlib
+import time
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.advertiser import Advertiser, APIKey
 from app.models.user import User, UserRole
 from app.core.cognito import cognito_verifier
+from app.core.config import settings
 
 
 api_key_header = APIKeyHeader(name="X-API-KEY", auto_error=False)
 oauth2_scheme = HTTPBearer(auto_error=False)
 
+# Per-process cache of verified API keys: key_hash -> (detached Advertiser snapshot, expires_at).
+# Lets event ingestion authenticate without a DB round trip (and keep accepting
+# spooled events during short DB outages). Disabled unless API_KEY_CACHE_TTL_SECONDS > 0;
+# revocations made in other processes are picked up within that TTL, not at once.
+_api_key_cache: Dict[str, Tuple[Advertiser, float]] = {}
+
+
+def invalidate_api_key_cache(advertiser_id: Optional[int] = None) -> None:
+    """Drops cached API keys (all, or only those of one advertiser)."""
+    if advertiser_id is None:
+        _api_key_cache.clear()
+        return
+    for key_hash, (advertiser, _) in list(_api_key_cache.items()):
+        if advertiser.id == advertiser_id:
+            _api_key_cache.pop(key_hash, None)
+
+
+# Per-process cache of active users: cognito_sub -> (detached User snapshot, expires_at).
+# Saves the user lookup on every authenticated request (a dashboard page makes ~8).
+# Disabled unless USER_CACHE_TTL_SECONDS > 0. Only active users are cached, so
+# approving a pending account takes effect at once; changes made outside this
+# process (other workers, the job worker, manual SQL) are picked up within the TTL.
+_user_cache: Dict[str, Tuple[User, float]] = {}
+
+
+def invalidate_user_cache(cognito_sub: Optional[str] = None, advertiser_id: Optional[int] = None) -> None:
+    """Drops cached users (all, one by cognito_sub, or those linked to one advertiser)."""
+    if cognito_sub is None and advertiser_id is None:
+        _user_cache.clear()
+        return
+    for sub, (user, _) in list(_user_cache.items()):
+        if sub == cognito_sub or (advertiser_id is not None and user.advertiser_id == advertiser_id):
+            _user_cache.pop(sub, None)
+
+
+def _cache_user(user: User) -> None:
+    if settings.USER_CACHE_TTL_SECONDS <= 0 or not user.is_active:
+        return
+    snapshot = User(
+        id=user.id,
+        cognito_sub=user.cognito_sub,
+        name=user.name,
+        email=user.email,
+        role=user.role,
+        is_active=user.is_active,
+        advertiser_id=user.advertiser_id,
+        admin_id=user.admin_id,
+        influencer_id=user.influencer_id
+    )
+    _user_cache[user.cognito_sub] = (snapshot, time.monotonic() + settings.USER_CACHE_TTL_SECONDS)
+
+
+def _cache_api_key(input_hash: str, advertiser: Advertiser) -> None:
+    if settings.API_KEY_CACHE_TTL_SECONDS <= 0:
+        return
+    snapshot = Advertiser(
+        id=advertiser.id,
+        name=advertiser.name,
+        contact_email=advertiser.contact_email,
+        is_active=advertiser.is_active,
+        currency=advertiser.currency,
+        created_at=advertiser.created_at
+    )
+    _api_key_cache[input_hash] = (snapshot, time.monotonic() + settings.API_KEY_CACHE_TTL_SECONDS)
+
 
 async def get_current_advertiser(
     api_key_str: str = Security(api_key_header),
@@ -40,6 +107,10 @@ async def get_current_advertiser(
     
     import hashlib
     input_hash = hashlib.sha256(api_key_str.encode()).hexdigest()
+
+    cached = _api_key_cache.get(input_hash)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
     
     # Check Active Keys
     result = await db.execute(
@@ -62,7 +133,8 @@ async def get_current_advertiser(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Advertiser not found"
         )
-        
+
+    _cache_api_key(input_hash, advertiser)
     return advertiser
 
 async def superroot_get_current_advertiser(
@@ -88,6 +160,10 @@ async def superroot_get_current_advertiser(
     
     import hashlib
     input_hash = hashlib.sha256(api_key_str.encode()).hexdigest()
+
+    cached = _api_key_cache.get(input_hash)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
     
     result = await db.execute(
         select(APIKey)
@@ -100,6 +176,8 @@ async def superroot_get_current_advertiser(
         return None # Invalid Key -> Return None
         
     advertiser = await db.get(Advertiser, api_key_obj.advertiser_id)
+    if advertiser:
+        _cache_api_key(input_hash, advertiser)
     return advertiser
 
 
@@ -135,6 +213,10 @@ async def get_current_user(
          raise HTTPException(status_code=401, detail="Invalid token claims")
 
     # 2. Find User
+    cached = _user_cache.get(cognito_sub)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
     result = await db.execute(select(User).where(User.cognito_sub == cognito_sub))
     user = result.scalar_one_or_none()
 
@@ -191,6 +273,7 @@ async def get_current_user(
         await db.commit()
         await db.refresh(user)
 
+    _cache_user(user)
     return user
 
 async def get_current_active_user(
@@ -202,9 +285,70 @@ async def get_current_active_user(
 
 async def get_current_advertiser_user(
     current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ) -> Advertiser:
     if current_user.role != UserRole.ADVERTISER:
          raise HTTPException(status_code=403, detail="Not authorized")
-    if not current_user.advertiser:
+    # By primary key (identity map first): current_user may be a cached, detached snapshot
+    advertiser = await db.get(Advertiser, current_user.advertiser_id) if current_user.advertiser_id else None
+    if not advertiser:
          raise HTTPException(status_code=404, detail="Advertiser profile missing")
-    return current_user.advertiser
+    return advertiser
+
+
+class Principal(NamedTuple):
+    """Who is calling: an API key's advertiser, or a dashboard (JWT) user. Exactly one is set."""
+    advertiser: Optional[Advertiser] = None
+    user: Optional[User] = None
+
+
+async def get_principal(
+    request: Request,
+    api_key_str: Optional[str] = Security(api_key_header),
+    auth: Optional[HTTPAuthorizationCredentials] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Resolves whichever credential the request carries, and only that one: an
+    X-API-KEY header is looked up (cached) without touching JWT verification,
+    and a bearer token is verified without any API key lookup. An invalid API
+    key falls through to the bearer token, as before. The result is kept on
+    `request.state.principal` for anything else handling the same request.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    advertiser = await superroot_get_current_advertiser(api_key_str, db) if api_key_str else None
+    if advertiser:
+        principal = Principal(advertiser=advertiser)
+    elif auth:
+        user = await get_current_active_user(await get_current_user(auth, db))
+        principal = Principal(user=user)
+    else:
+        raise HTTPException(status_code=401, detail="Authentication required (API Key or Admin)")
+
+    request.state.principal = principal
+    return principal
+
+
+async def get_stats_target(
+    advertiser_id: Optional[int] = Query(None, description="SuperRoot Override"),
+    principal: Principal = Depends(get_principal)
+) -> Optional[int]:
+    """
+    Advertiser the stats request is scoped to. None means global stats (SUPERROOT only).
+    API keys are pinned to their advertiser and advertisers to their own account.
+    """
+    if principal.advertiser:
+        # Safety: API Key user can't override advertiser_id
+        if advertiser_id and advertiser_id != principal.advertiser.id:
+            raise HTTPException(status_code=403, detail="Cannot override Advertiser ID with API Key")
+        return principal.advertiser.id
+
+    user = principal.user
+    if user.role == UserRole.SUPERROOT:
+        return advertiser_id
+    if user.role == UserRole.ADVERTISER and user.advertiser_id is not None:
+        return user.advertiser_id
+    raise HTTPException(status_code=401, detail="Authentication required")
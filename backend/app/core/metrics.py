@@ -0,0 +1,213 @@
+"""
+Per-request performance metrics in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and, through the SQLAlchemy hooks
+installed by `instrument_engine`, counts the statements it ran, the time spent
+in them and the time spent waiting for a pooled connection. Samples are kept
+per route template (`/api/v1/stats/overview`, not the concrete URL) so the
+series count stays bounded. Everything is per process: with gunicorn each
+worker serves its own numbers (the `pid` label tells them apart).
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+RESPONSE_SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, const_labels: str) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            labels = const_labels + "".join(f',{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{_format(bound)}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {_format(series[-2])}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self, const_labels: str) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            labels = const_labels + "".join(f',{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{labels}}} {_format(value)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+ROUTE_LABELS = ("method", "route")
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "Request latency.", ROUTE_LABELS, LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size.", ROUTE_LABELS, RESPONSE_SIZE_BUCKETS)
+DB_QUERIES = Histogram("http_request_db_queries", "SQL statements executed per request.", ROUTE_LABELS, QUERY_COUNT_BUCKETS)
+DB_TIME = Histogram("http_request_db_seconds", "Time spent executing SQL per request.", ROUTE_LABELS, DB_TIME_BUCKETS)
+POOL_WAIT = Histogram("http_request_db_pool_wait_seconds", "Time spent waiting for a pooled connection per request.", ROUTE_LABELS, POOL_WAIT_BUCKETS)
+
+METRICS = (REQUESTS, LATENCY, RESPONSE_SIZE, DB_QUERIES, DB_TIME, POOL_WAIT)
+
+
+class RequestDbStats:
+    """DB work attributed to the current request; shared by tasks it spawns (e.g. dashboard widgets)."""
+
+    __slots__ = ("queries", "db_time", "pool_wait")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+
+_request_db: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def record_pool_wait(wait: float) -> None:
+    """Called by InstrumentedPool for every checkout."""
+    stats = _request_db.get()
+    if stats is not None:
+        stats.pool_wait += wait
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count statements and their execution time against the current request."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_db.get()
+        start = getattr(context, "_metrics_start", None)
+        if stats is None or start is None:
+            return
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (BaseHTTPMiddleware would run the endpoint in another
+    task and hide the request's context variables from it). A request is measured
+    up to its last body chunk; BackgroundTasks that run after it are not counted.
+    """
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = _request_db.set(stats)
+        status = 500
+        size = 0
+        completed: Optional[Tuple[float, int, float, float]] = None  # (elapsed, queries, db_time, pool_wait)
+
+        async def send_wrapper(message):
+            nonlocal status, size, completed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and completed is None:
+                # Response is complete. BackgroundTasks (e.g. the click insert behind /r/{short_code})
+                # still run inside self.app after this point and must not be charged to the request.
+                completed = (time.perf_counter() - start, stats.queries, stats.db_time, stats.pool_wait)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_db.reset(token)
+            if completed is None:  # No complete response (app raised or client went away)
+                completed = (time.perf_counter() - start, stats.queries, stats.db_time, stats.pool_wait)
+            elapsed, queries, db_time, pool_wait = completed
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", None) or UNMATCHED_ROUTE)
+            REQUESTS.inc(labels + (str(status),))
+            LATENCY.observe(labels, elapsed)
+            RESPONSE_SIZE.observe(labels, size)
+            DB_QUERIES.observe(labels, queries)
+            DB_TIME.observe(labels, db_time)
+            POOL_WAIT.observe(labels, pool_wait)
+
+
+def pool_metrics(pools: List[dict]) -> List[str]:
+    """Lines for `database.pool_status()` entries (pool state at scrape time plus its counters)."""
+    const_labels = f'pid="{os.getpid()}"'
+    lines = []
+    for name, key, kind, help in (
+        ("db_pool_checked_out", "checked_out", "gauge", "Connections currently checked out."),
+        ("db_pool_overflow", "overflow", "gauge", "Overflow connections currently open."),
+        ("db_pool_checkouts_total", "checkouts", "counter", "Successful connection checkouts."),
+        ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that gave up after DB_POOL_TIMEOUT."),
+    ):
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{{const_labels},pool="{_escape(pool["name"])}"}} {pool[key]}' for pool in pools]
+    return lines
+
+
+def render_metrics(extra_lines: Optional[List[str]] = None) -> str:
+    const_labels = f'pid="{os.getpid()}"'
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render(const_labels))
+    if extra_lines:
+        lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,222 @@
+"""
+Opt-in slow-query profiler (QUERY_PROFILER_ENABLED).
+
+Statements are grouped by fingerprint (literals, placeholders and IN lists
+collapsed) and timed with cursor execute hooks. For each fingerprint the
+profiler keeps counts, total / max time and a window of recent durations for
+percentiles. Statements slower than QUERY_PROFILER_SLOW_MS keep a sample and
+get an EXPLAIN, run on a separate connection at most once per interval per
+fingerprint.
+
+When disabled nothing is registered on the engines, so there is no overhead.
+Numbers are per process, like the pool and request metrics.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|(?<!:):\w+")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+EXPLAINABLE = ("select", "with")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalised statement: same query shape -> same fingerprint, whatever the values."""
+    normalized = _STRING.sub("?", statement)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _VALUES_LIST.sub(r"VALUES \1, ...", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryStats:
+    def __init__(self, fingerprint: str, samples: int):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.durations: Deque[float] = deque(maxlen=samples)
+        self.slow_count = 0
+        self.slow_sample: Optional[Dict[str, Any]] = None
+        self.explain: Optional[Dict[str, Any]] = None
+        self.explained_at = 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "avg_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "slow_count": self.slow_count,
+            "slow_sample": self.slow_sample,
+            "explain": self.explain
+        }
+
+
+class QueryProfiler:
+    SORT_KEYS = {
+        "total": lambda s: s.total,
+        "p99": lambda s: s.percentile(0.99),
+        "max": lambda s: s.max,
+        "count": lambda s: s.count,
+    }
+
+    def __init__(
+        self,
+        max_fingerprints: int,
+        samples: int,
+        slow_threshold: float,
+        explain: bool,
+        explain_interval: float
+    ):
+        self.max_fingerprints = max_fingerprints
+        self.samples = samples
+        self.slow_threshold = slow_threshold
+        self.explain_enabled = explain
+        self.explain_interval = explain_interval
+        self.stats: Dict[str, QueryStats] = {}
+        self.started_at = time.time()
+        self._fingerprints: Dict[str, str] = {}  # raw statement -> fingerprint (statements repeat verbatim)
+        self._explaining: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()  # Strong refs so pending EXPLAINs are not garbage collected
+
+    def install(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None and not context.execution_options.get("profiler_skip"):
+                context._profiler_start = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = getattr(context, "_profiler_start", None)
+            if start is not None:
+                self.record(engine, statement, parameters, time.perf_counter() - start, executemany)
+
+    def _fingerprint(self, statement: str) -> str:
+        fp = self._fingerprints.get(statement)
+        if fp is None:
+            if len(self._fingerprints) >= self.max_fingerprints * 4:
+                self._fingerprints.clear()
+            fp = self._fingerprints[statement] = fingerprint(statement)
+        return fp
+
+    def record(self, engine: AsyncEngine, statement: str, parameters: Any, duration: float, executemany: bool = False) -> None:
+        fp = self._fingerprint(statement)
+        stats = self.stats.get(fp)
+        if stats is None:
+            if len(self.stats) >= self.max_fingerprints:
+                # Make room by dropping the fingerprint with the least total time
+                del self.stats[min(self.stats.values(), key=lambda s: s.total).fingerprint]
+            stats = self.stats[fp] = QueryStats(fp, self.samples)
+        stats.count += 1
+        stats.total += duration
+        stats.max = max(stats.max, duration)
+        stats.durations.append(duration)
+
+        if duration < self.slow_threshold:
+            return
+        stats.slow_count += 1
+        if stats.slow_sample is None or duration >= stats.slow_sample["duration_ms"] / 1000:
+            stats.slow_sample = {
+                "statement": statement,
+                "parameters": None if executemany else _printable(parameters),
+                "duration_ms": round(duration * 1000, 3),
+                "at": time.time()
+            }
+        if (
+            self.explain_enabled
+            and not executemany
+            and statement.lstrip().lower().startswith(EXPLAINABLE)
+            and fp not in self._explaining
+            and time.time() - stats.explained_at >= self.explain_interval
+        ):
+            self._schedule_explain(engine, stats, statement, parameters)
+
+    def _schedule_explain(self, engine: AsyncEngine, stats: QueryStats, statement: str, parameters: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Sync caller outside the event loop (scripts); nothing to schedule on
+        self._explaining.add(stats.fingerprint)
+        stats.explained_at = time.time()
+        task = loop.create_task(self._explain(engine, stats, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, stats: QueryStats, statement: str, parameters: Any) -> None:
+        # Own connection: the one that ran the statement may still be mid-transaction or mid-fetch
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(profiler_skip=True)  # Keep EXPLAINs out of the profile
+                result = await conn.exec_driver_sql(prefix + statement, parameters or ())
+                stats.explain = {
+                    "plan": [dict(row) for row in result.mappings()],
+                    "at": time.time()
+                }
+        except Exception as e:
+            logger.warning(f"EXPLAIN failed for slow query: {e}")
+            stats.explain = {"error": str(e), "at": time.time()}
+        finally:
+            self._explaining.discard(stats.fingerprint)
+
+    def top(self, sort: str = "total", limit: int = 20) -> List[Dict[str, Any]]:
+        ranked = sorted(self.stats.values(), key=self.SORT_KEYS[sort], reverse=True)
+        return [stats.to_dict() for stats in ranked[:limit]]
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self._fingerprints.clear()
+        self.started_at = time.time()
+
+
+def _printable(parameters: Any) -> Any:
+    """Parameters as JSON-safe values; long values are truncated."""
+    def clip(value):
+        if value is None or isinstance(value, (int, float, bool)):
+            return value
+        text = value.decode(errors="replace") if isinstance(value, (bytes, bytearray)) else str(value)
+        return text if len(text) <= 200 else text[:200] + "..."
+
+    if isinstance(parameters, dict):
+        return {key: clip(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [clip(value) for value in parameters]
+    return clip(parameters)
+
+
+query_profiler = QueryProfiler(
+    max_fingerprints=settings.QUERY_PROFILER_MAX_FINGERPRINTS,
+    samples=settings.QUERY_PROFILER_SAMPLES,
+    slow_threshold=settings.QUERY_PROFILER_SLOW_MS / 1000,
+    explain=settings.QUERY_PROFILER_EXPLAIN,
+    explain_interval=settings.QUERY_PROFILER_EXPLAIN_INTERVAL_SECONDS
+)
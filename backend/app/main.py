@@ -1,10 +1,35 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.core.cognito import cognito_verifier
 from app.core.config import settings
+from app.core.database import pool_status
 from app.core.exceptions import AppError, app_error_handler
+from app.core.metrics import MetricsMiddleware, pool_metrics, render_metrics
+from app.services.event_spool import event_spool
+from app.services.email_dispatch import email_dispatcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    if settings.EVENT_INGEST_MODE == "spool":
+        await event_spool.start()
+    await cognito_verifier.startup()
+    yield
+    # Shutdown
+    if event_spool.running:
+        await event_spool.stop()
+    email_dispatcher.shutdown()
+    await cognito_verifier.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -19,6 +44,10 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Added last so it wraps everything else, CORS included
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, exclude_paths=["/metrics"])
+
 # Exception Handlers
 app.add_exception_handler(AppError, app_error_handler)
 
@@ -30,6 +59,17 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def health_check():
     return {"status": "ok", "app": settings.PROJECT_NAME}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(authorization: Optional[str] = Header(None)):
+        """Prometheus scrape endpoint. Numbers are for the worker process that answers."""
+        if settings.METRICS_TOKEN and authorization != f"Bearer {settings.METRICS_TOKEN}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return PlainTextResponse(
+            render_metrics(pool_metrics(pool_status())),
+            media_type="text/plain; version=0.0.4"
+        )
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to SuperHer API"}
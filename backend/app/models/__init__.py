@@ -4,6 +4,8 @@ from .influencer import Influencer
 from .coupon import Coupon
 from .tracking_link import TrackingLink
 from .click_event import ClickEvent
-from .customer_event import CustomerEvent
+from .customer_event import CustomerEvent, CustomerEventPayload
 from .admin import Admin
 from .user import User
+from .short_code_sequence import ShortCodeSequence
+from .job import Job, JobStatus
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Enum, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 
@@ -14,6 +14,10 @@ class EventType(str, enum.Enum):
 
 class CustomerEvent(Base):
     __tablename__ = "customer_events"
+    __table_args__ = (
+        # Retries with the same key are de-duplicated per advertiser (NULL keys are not)
+        UniqueConstraint("advertiser_id", "idempotency_key", name="uq_customer_events_advertiser_idempotency_key"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -22,6 +26,7 @@ class CustomerEvent(Base):
     
     # Event Details
     event_type = Column(String(50), nullable=False, index=True) # Store as string to allow flexibility, typically purchase/signup
+    idempotency_key = Column(String(64), nullable=True) # From payload event_id or Idempotency-Key header
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Financials
@@ -41,10 +46,30 @@ class CustomerEvent(Base):
     
     # Audit
     properties = Column(JSON, nullable=True) # Mapped from payload.properties
-    raw_data = Column(JSON, nullable=True)   # Full original payload
+    # Legacy inline copy of the full payload. Deferred so aggregate scans never pull it;
+    # new events store it in `customer_event_payloads` (see EVENT_RAW_PAYLOAD_STORAGE).
+    raw_data = deferred(Column(JSON, nullable=True))
     
     # Relationships
     advertiser = relationship("Advertiser", back_populates="events")
     tracking_link = relationship("TrackingLink")
     influencer = relationship("Influencer")
     campaign = relationship("Campaign")
+    payload = relationship(
+        "CustomerEventPayload",
+        uselist=False,
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+class CustomerEventPayload(Base):
+    """
+    Side table holding the full original event payload, keyed by event id.
+    Keeps `customer_events` rows narrow; only read by the audit view.
+    """
+    __tablename__ = "customer_event_payloads"
+
+    event_id = Column(Integer, ForeignKey("customer_events.id", ondelete="CASCADE"), primary_key=True)
+    encoding = Column(String(10), nullable=False, default="json") # 'json' or 'zlib' (zlib-compressed json)
+    data = Column(LargeBinary(length=2**24 - 1), nullable=False)   # MEDIUMBLOB on MySQL
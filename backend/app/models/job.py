@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, Text, Index
+from datetime import datetime
+import enum
+from app.core.database import Base
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class Job(Base):
+    """
+    Background job (bulk import, notification emails, advertiser deletion...).
+    Enqueued by the API, claimed and executed by `python -m app.worker`.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default=JobStatus.QUEUED.value)
+
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Progress reporting: `progress` of `total` units done (total may be unknown)
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    # Scoping: who asked for it
+    created_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    advertiser_id = Column(Integer, nullable=True, index=True)
+
+    # Worker bookkeeping
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claim query: WHERE status = 'queued' AND run_after <= now ORDER BY id
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, BigInteger
+from app.core.database import Base
+
+class ShortCodeSequence(Base):
+    """
+    Counter behind the short-code allocator. Each app process reserves a block
+    of values at a time, so this row is touched once per block, not per link.
+    """
+    __tablename__ = "short_code_sequences"
+
+    name = Column(String(50), primary_key=True)
+    next_value = Column(BigInteger, nullable=False, default=0)
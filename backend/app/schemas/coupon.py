@@ -41,6 +41,22 @@ class CouponAutoGenerate(CouponCreateBase):
             }
         }
 
+class CouponBulkGenerate(CouponCreateBase):
+    count: int = Field(..., ge=1, le=50000, description="Number of unique codes to generate.")
+    prefix: str = Field("", max_length=20, description="Prefix prepended to every code (upper-cased).")
+    length: int = Field(8, ge=4, le=30, description="Length of the random part of each code.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "campaign_id": 1,
+                "count": 10000,
+                "prefix": "SUMMER",
+                "length": 8,
+                "is_active": True
+            }
+        }
+
 # Generic Create for fallback or internal use if needed (keeping original name for compat if needed, but not primarily exposed)
 class CouponCreate(CouponCreateBase):
     code: Optional[str] = None
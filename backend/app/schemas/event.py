@@ -3,6 +3,7 @@ from typing import Optional, Dict, Any, Literal
 from datetime import datetime
 
 class EventCreate(BaseModel):
+    event_id: Optional[str] = Field(None, max_length=64, description="Client-generated unique event id. Retries with the same id (or Idempotency-Key header) are de-duplicated.")
     action: Literal['purchase', 'add_to_cart', 'signup', 'custom', 'drop_off'] = Field(..., description="Type of event")
     value: Optional[float] = Field(None, description="Monetary value of the event (e.g. 19.99)")
     currency: Optional[str] = Field("USD", description="Currency code (ISO 4217, default USD)")
@@ -25,6 +26,12 @@ class EventCreate(BaseModel):
         }
 
 class EventResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # None while an event is still queued in the spool
     status: str
     attributed_influencer: Optional[str] = None
+
+class EventRawResponse(BaseModel):
+    id: int
+    event_type: str
+    timestamp: Optional[datetime] = None
+    raw_data: Optional[Dict[str, Any]] = None
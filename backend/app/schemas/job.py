@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    status: str = Field(..., description="queued | running | succeeded | failed | cancelled")
+    progress: int = Field(0, description="Units of work done so far (rows, emails, steps...).")
+    total: Optional[int] = Field(None, description="Total units of work, once known.")
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
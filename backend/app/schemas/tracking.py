@@ -24,7 +24,7 @@ from app.schemas.common import CampaignSummary, InfluencerSummary
 
 class TrackingLinkResponse(TrackingLinkBase):
     id: int = Field(..., description="Unique ID of the tracking link.")
-    short_code: str = Field(..., description="The 6-character unique code used in the short URL (e.g. 'AbC12').")
+    short_code: str = Field(..., description="The unique code used in the short URL (8 lowercase characters, e.g. 'k3x9q2ab'; older links have 6 or 7).")
     campaign_id: int
     influencer_id: Optional[int]
     
@@ -42,6 +42,34 @@ class TrackingLinkResponse(TrackingLinkBase):
     class Config:
         from_attributes = True
 
+class TrackingLinkBulkItem(TrackingLinkBase):
+    influencer_id: Optional[int] = Field(None, description="ID of the Influencer. Null creates a Generic link.")
+
+class TrackingLinkBulkCreate(BaseModel):
+    campaign_id: int = Field(..., description="ID of the Campaign all links belong to.")
+    links: List[TrackingLinkBulkItem] = Field(..., min_length=1, max_length=10000, description="One entry per link to create.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "campaign_id": 1,
+                "links": [
+                    {"influencer_id": 1, "destination_url": "https://myshop.com/summer-sale", "cpc_rate": 0.50},
+                    {"influencer_id": 2, "destination_url": "https://myshop.com/summer-sale", "cpc_rate": 0.50}
+                ]
+            }
+        }
+
+class TrackingLinkBulkResult(BaseModel):
+    influencer_id: Optional[int]
+    destination_url: str
+    short_code: str
+
+class TrackingLinkBulkResponse(BaseModel):
+    campaign_id: int
+    created: int
+    links: List[TrackingLinkBulkResult]
+
 class ClickEventResponse(BaseModel):
     id: int
     tracking_link_id: int
@@ -0,0 +1,135 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import AppError
+from app.models.advertiser import Advertiser, APIKey
+from app.models.campaign import Campaign
+from app.models.click_event import ClickEvent
+from app.models.coupon import Coupon
+from app.models.customer_event import CustomerEvent
+from app.models.influencer import CampaignInfluencer
+from app.models.tracking_link import TrackingLink
+from app.models.user import User
+
+ProgressCallback = Callable[[int, int], Awaitable[Any]]
+
+
+class AdvertiserDeletionService:
+    """
+    Deletes an advertiser and all associated data (Campaigns, Events, Keys).
+    Shared by `DELETE /advertisers/{id}` and the background job of the same name.
+
+    Everything is deleted set-based in chunks of `DELETE ... WHERE <owner> = ? LIMIT n`,
+    committing after each chunk, so memory stays constant and row locks are only held
+    for one chunk at a time. Dependents go first (events, clicks, links, coupons,
+    campaign assignments, campaigns) and the advertiser row last, so an interrupted
+    or cancelled deletion can simply be run again and picks up where it stopped.
+    Event payloads go with their events (ON DELETE CASCADE).
+    """
+
+    @staticmethod
+    async def _delete_in_batches(
+        db: AsyncSession,
+        model,
+        condition,
+        batch_size: int,
+        on_batch: Callable[[int], Awaitable[Any]]
+    ) -> int:
+        deleted = 0
+        while True:
+            result = await db.execute(delete(model).where(condition).with_dialect_options(mysql_limit=batch_size))
+            await db.commit()
+            count = result.rowcount or 0
+            deleted += count
+            if count:
+                await on_batch(count)
+            if count < batch_size:
+                return deleted
+
+    @staticmethod
+    async def delete_advertiser(
+        db: AsyncSession,
+        advertiser_id: int,
+        on_progress: Optional[ProgressCallback] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        batch_size = batch_size or settings.ADVERTISER_DELETE_BATCH_SIZE
+
+        result = await db.execute(select(Advertiser.id).where(Advertiser.id == advertiser_id))
+        if result.scalar_one_or_none() is None:
+            raise AppError("Advertiser not found", status_code=404)
+
+        result = await db.execute(select(Campaign.id).where(Campaign.advertiser_id == advertiser_id))
+        campaign_ids: List[int] = list(result.scalars().all())
+
+        # Row estimate up front, for progress only
+        total = 0
+        for stmt in (
+            select(func.count()).select_from(CustomerEvent).where(CustomerEvent.advertiser_id == advertiser_id),
+            select(func.count()).select_from(APIKey).where(APIKey.advertiser_id == advertiser_id),
+            select(func.count()).select_from(Campaign).where(Campaign.advertiser_id == advertiser_id),
+        ):
+            total += (await db.execute(stmt)).scalar_one()
+        if campaign_ids:
+            for stmt in (
+                select(func.count()).select_from(ClickEvent).join(TrackingLink).where(TrackingLink.campaign_id.in_(campaign_ids)),
+                select(func.count()).select_from(TrackingLink).where(TrackingLink.campaign_id.in_(campaign_ids)),
+                select(func.count()).select_from(Coupon).where(Coupon.campaign_id.in_(campaign_ids)),
+                select(func.count()).select_from(CampaignInfluencer).where(CampaignInfluencer.campaign_id.in_(campaign_ids)),
+            ):
+                total += (await db.execute(stmt)).scalar_one()
+        total += 1  # the advertiser row
+        await db.commit()
+
+        done = 0
+
+        async def progress(count: int):
+            nonlocal done
+            done += count
+            if on_progress:
+                await on_progress(min(done, total), total)
+
+        async def purge(model, condition) -> int:
+            return await AdvertiserDeletionService._delete_in_batches(db, model, condition, batch_size, progress)
+
+        if on_progress:
+            await on_progress(0, total)
+
+        # 1. Unlink Users
+        result = await db.execute(update(User).where(User.advertiser_id == advertiser_id).values(advertiser_id=None))
+        users_unlinked = result.rowcount or 0
+        await db.commit()
+
+        # 2. API Keys first, so no new events arrive while the rest is deleted
+        counts = {"api_keys": await purge(APIKey, APIKey.advertiser_id == advertiser_id)}
+
+        # 3. Events (payloads cascade)
+        counts["events"] = await purge(CustomerEvent, CustomerEvent.advertiser_id == advertiser_id)
+
+        # 4. Campaign dependents, one campaign at a time to keep each statement on its index
+        for key in ("clicks", "tracking_links", "coupons", "campaign_influencers"):
+            counts[key] = 0
+        for campaign_id in campaign_ids:
+            counts["clicks"] += await purge(ClickEvent, ClickEvent.tracking_link_id.in_(
+                select(TrackingLink.id).where(TrackingLink.campaign_id == campaign_id)
+            ))
+            counts["tracking_links"] += await purge(TrackingLink, TrackingLink.campaign_id == campaign_id)
+            counts["coupons"] += await purge(Coupon, Coupon.campaign_id == campaign_id)
+            counts["campaign_influencers"] += await purge(CampaignInfluencer, CampaignInfluencer.campaign_id == campaign_id)
+
+        # 5. Campaigns
+        counts["campaigns"] = await purge(Campaign, Campaign.advertiser_id == advertiser_id)
+
+        # 6. Finally Delete Advertiser
+        await db.execute(delete(Advertiser).where(Advertiser.id == advertiser_id))
+        await db.commit()
+        await progress(1)
+
+        return {
+            "advertiser_id": advertiser_id,
+            "users_unlinked": users_unlinked,
+            **counts
+        }
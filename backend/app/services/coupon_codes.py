@@ -0,0 +1,115 @@
+import random
+import string
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db_errors import is_duplicate_key
+from app.models.coupon import Coupon
+
+COUPON_CODE_CHARS = string.ascii_uppercase + string.digits
+COUPON_CODE_INDEX = "ix_coupons_code"
+CHUNK_SIZE = 1000       # Codes per IN (...) probe and per multi-row INSERT
+MAX_ROUNDS = 10         # Generate -> probe -> insert rounds before giving up on the remainder
+
+
+def generate_random_code(length: int = 8, prefix: str = "") -> str:
+    """Generates a random alphanumeric code with keys."""
+    random_part = ''.join(random.choices(COUPON_CODE_CHARS, k=length))
+    return f"{prefix}{random_part}"
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class CouponCodeService:
+    """
+    Set-based coupon code generation.
+
+    Candidates are generated in memory, checked against the table with one
+    `IN (...)` query per chunk and inserted with one multi-row INSERT per chunk.
+    Only codes that collided are regenerated, so N codes cost roughly
+    2 * N / CHUNK_SIZE round trips instead of 2 * N.
+    """
+
+    @staticmethod
+    def keyspace(length: int) -> int:
+        return len(COUPON_CODE_CHARS) ** length
+
+    @staticmethod
+    async def _existing_codes(db: AsyncSession, codes: List[str]) -> Set[str]:
+        existing = set()
+        for chunk in _chunks(codes, CHUNK_SIZE):
+            result = await db.execute(select(Coupon.code).where(Coupon.code.in_(chunk)))
+            existing.update(result.scalars().all())
+        return existing
+
+    @staticmethod
+    async def generate_bulk(
+        db: AsyncSession,
+        campaign_id: int,
+        count: int,
+        prefix: str = "",
+        length: int = 8,
+        influencer_id: Optional[int] = None,
+        is_active: bool = True
+    ) -> List[str]:
+        """
+        Creates `count` unique coupons for a campaign in a single transaction and
+        returns their codes. Raises ValueError if the keyspace is exhausted.
+        """
+        settings = {"prefix": prefix, "length": str(length), "bulk": True}
+        accepted: List[str] = []
+        accepted_set: Set[str] = set()
+
+        for _ in range(MAX_ROUNDS):
+            needed = count - len(accepted)
+            if needed <= 0:
+                break
+
+            candidates: Set[str] = set()
+            while len(candidates) < needed:
+                code = generate_random_code(length=length, prefix=prefix)
+                if code not in accepted_set:
+                    candidates.add(code)
+
+            existing = await CouponCodeService._existing_codes(db, list(candidates))
+            fresh = [code for code in candidates if code not in existing]
+
+            now = datetime.utcnow()
+            for chunk in _chunks(fresh, CHUNK_SIZE):
+                rows: List[Dict[str, Any]] = [
+                    {
+                        "code": code,
+                        "campaign_id": campaign_id,
+                        "influencer_id": influencer_id,
+                        "is_active": is_active,
+                        "settings": settings,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for code in chunk
+                ]
+                # A concurrent writer can still take a code between the probe and the
+                # INSERT: the savepoint discards just this chunk and it is retried.
+                try:
+                    async with db.begin_nested():
+                        await db.execute(insert(Coupon), rows)
+                except IntegrityError as e:
+                    if not is_duplicate_key(e, COUPON_CODE_INDEX):
+                        raise
+                    continue
+                accepted.extend(chunk)
+                accepted_set.update(chunk)
+
+        if len(accepted) < count:
+            await db.rollback()
+            raise ValueError(f"Could only find {len(accepted)} of {count} unique codes; use a longer length or a different prefix.")
+
+        await db.commit()
+        return accepted
@@ -1,9 +1,12 @@
 import boto3
-from botocore.exceptions import ClientError
-from typing import List, Dict, Any, Optional
+from botocore.exceptions import BotoCoreError, ClientError
+from typing import List, Dict, Any, NamedTuple, Optional
 import logging
 import os
+import smtplib
+import threading
 from app.core.config import settings
+from app.services.email_templates import EMAIL_SHELL, COUPON_CARD, LINK_CARD, TEXT_BODY, MimeSkeleton
 
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -12,10 +15,27 @@ from email.mime.image import MIMEImage
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# SES error codes worth retrying (quota / transient service errors)
+SES_RETRYABLE_ERRORS = {"Throttling", "ThrottlingException", "ServiceUnavailable", "InternalFailure", "RequestTimeout"}
+
+class OutgoingEmail(NamedTuple):
+    to_email: str
+    subject: str
+    html_body: str
+    text_body: str
+
+class EmailDeliveryError(Exception):
+    """Delivery failed. `retryable` is True for throttling / transient transport errors."""
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
 class EmailService:
     def __init__(self):
         self.ses_client = None
         self.logo_bytes = None
+        self._smtp = threading.local()  # One SMTP connection per sending thread
+        self._mime_skeleton: Optional[MimeSkeleton] = None
         if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
             try:
                 self.ses_client = boto3.client(
@@ -37,158 +57,176 @@ class EmailService:
     def get_email_template(self, title: str, recipient_name: str, content_html: str) -> str:
         """
         Returns a formatted HTML email template.
+        The shell (head, inline CSS, logo, footer) is precompiled in email_templates.
         """
-        # Use a public URL for the logo so it renders correctly in email clients
-        logo_url = "https://superher.in/Superher-logo.png" # Assuming it is hosted here or will be
-        logo_html = f'<img src="{logo_url}" alt="SuperHer Logo" style="height: 40px; width: auto;">'
-
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{title}</title>
-            <style>
-                body {{ font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; background-color: #F8FAFC; margin: 0; padding: 0; -webkit-font-smoothing: antialiased; }}
-                .container {{ max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1); margin-top: 20px; margin-bottom: 20px; }}
-                .header {{ background-color: #ffffff; padding: 24px 32px; border-bottom: 1px solid #e2e8f0; text-align: center; }}
-                .content {{ padding: 32px; color: #334155; line-height: 1.6; }}
-                .h1 {{ color: #1e293b; font-size: 20px; font-weight: 700; margin-top: 0; }}
-                .card {{ background-color: #f8fafc; border: 1px solid #e2e8f0; border-radius: 6px; padding: 16px; margin-bottom: 12px; }}
-                .code {{ font-family: monospace; font-size: 18px; font-weight: 700; color: #7C3AED; letter-spacing: 1px; background: #fff; padding: 8px 12px; border-radius: 4px; border: 1px dashed #7C3AED; display: inline-block; }}
-                .footer {{ background-color: #f1f5f9; padding: 24px; text-align: center; color: #64748b; font-size: 12px; }}
-                .btn {{ display: inline-block; background-color: #7C3AED; color: white; padding: 10px 20px; border-radius: 6px; text-decoration: none; font-weight: bold; margin-top: 10px; }}
-                .label {{ font-size: 12px; color: #64748b; text-transform: uppercase; font-weight: 600; letter-spacing: 0.5px; margin-bottom: 4px; display: block; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    {logo_html}
-                </div>
-                <div class="content">
-                    <h2 class="h1">Hello {recipient_name},</h2>
-                    {content_html}
-                    <p style="margin-top: 30px;">Good luck with the campaign!</p>
-                    <p style="color: #64748b;">The SuperHer Team</p>
-                </div>
-                <div class="footer">
-                    &copy; 2026 SuperHer. All rights reserved.<br>
-                    <span style="opacity: 0.7;">You received this email because you are a partner influencer.</span>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-    def send_email(self, to_email: str, subject: str, html_body: str, text_body: str) -> bool:
-        """
-        Sends an email using AWS SES raw interface to support inline images (CID).
-        """
-        if not self.ses_client:
-            logger.info(f"EMAIL SIMULATION [To: {to_email}] [Subject: {subject}]")
-            logger.info(f"HTML Body Length: {len(html_body)}")
-            return True
-
+        return EMAIL_SHELL.render(title=title, recipient_name=recipient_name, content_html=content_html)
+
+    @property
+    def transport(self) -> str:
+        """'ses', 'smtp' or 'log' (SES without credentials falls back to logging)."""
+        if settings.EMAIL_TRANSPORT == "ses" and not self.ses_client:
+            return "log"
+        return settings.EMAIL_TRANSPORT
+
+    def build_message(self, email: OutgoingEmail) -> str:
+        if settings.EMAIL_MIME_SKELETON:
+            if self._mime_skeleton is None:
+                self._mime_skeleton = MimeSkeleton(settings.SENDER_EMAIL or "noreply@superher.com")
+            return self._mime_skeleton.render(email.to_email, email.subject, email.html_body, email.text_body)
+        return self.build_mime_message(email)
+
+    def build_mime_message(self, email: OutgoingEmail) -> str:
+        """Builds the message with the `email` package (EMAIL_MIME_SKELETON=False)."""
         # Create the root message - use 'related' for inline images
         msg = MIMEMultipart('related')
-        msg['Subject'] = subject
+        msg['Subject'] = email.subject
         msg['From'] = settings.SENDER_EMAIL or "noreply@superher.com"
-        msg['To'] = to_email
+        msg['To'] = email.to_email
 
         # Create alternative part for Text vs HTML
         msg_alternative = MIMEMultipart('alternative')
         msg.attach(msg_alternative)
 
         # Attach Text Body
-        part_text = MIMEText(text_body, 'plain')
+        part_text = MIMEText(email.text_body, 'plain')
         msg_alternative.attach(part_text)
 
         # Attach HTML Body
-        part_html = MIMEText(html_body, 'html')
+        part_html = MIMEText(email.html_body, 'html')
         msg_alternative.attach(part_html)
 
+        return msg.as_string()
 
-
+    def deliver(self, email: OutgoingEmail) -> None:
+        """
+        Sends one email through the configured transport. Blocking: call it from a
+        thread (see EmailDispatcher). Raises EmailDeliveryError on failure.
+        """
+        transport = self.transport
+        if transport == "log":
+            logger.info(f"EMAIL SIMULATION [To: {email.to_email}] [Subject: {email.subject}]")
+            logger.info(f"HTML Body Length: {len(email.html_body)}")
+            return
+
+        raw_message = self.build_message(email)
+        if transport == "smtp":
+            self._deliver_smtp(email.to_email, raw_message)
+        else:
+            self._deliver_ses(email.to_email, raw_message)
+
+    def _deliver_ses(self, to_email: str, raw_message: str) -> None:
         try:
             response = self.ses_client.send_raw_email(
                 Source=settings.SENDER_EMAIL,
                 Destinations=[to_email],
                 RawMessage={
-                    'Data': msg.as_string(),
+                    'Data': raw_message,
                 }
             )
             logger.info(f"Email sent! Message ID: {response['MessageId']}")
-            return True
         except ClientError as e:
-            logger.error(f"Failed to send email via SES: {e.response['Error']['Message']}")
+            code = e.response.get('Error', {}).get('Code')
+            raise EmailDeliveryError(f"SES: {e.response['Error']['Message']}", retryable=code in SES_RETRYABLE_ERRORS)
+        except BotoCoreError as e:
+            # Connection / endpoint errors
+            raise EmailDeliveryError(f"SES: {e}", retryable=True)
+
+    def _smtp_connection(self) -> smtplib.SMTP:
+        conn = getattr(self._smtp, "conn", None)
+        if conn is None:
+            conn = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30)
+            if settings.SMTP_USE_TLS:
+                conn.starttls()
+            if settings.SMTP_USERNAME:
+                conn.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD or "")
+            self._smtp.conn = conn
+        return conn
+
+    def _deliver_smtp(self, to_email: str, raw_message: str) -> None:
+        sender = settings.SENDER_EMAIL or "noreply@superher.com"
+        try:
+            self._smtp_connection().sendmail(sender, [to_email], raw_message)
+        except smtplib.SMTPResponseException as e:
+            self._reset_smtp()
+            raise EmailDeliveryError(f"SMTP {e.smtp_code}: {e.smtp_error!r}", retryable=400 <= e.smtp_code < 500)
+        except smtplib.SMTPRecipientsRefused as e:
+            self._reset_smtp()
+            codes = [code for code, _ in e.recipients.values()]
+            raise EmailDeliveryError(f"SMTP recipient refused: {e.recipients}", retryable=all(400 <= c < 500 for c in codes))
+        except (smtplib.SMTPException, OSError) as e:
+            self._reset_smtp()
+            raise EmailDeliveryError(f"SMTP: {e}", retryable=True)
+
+    def _reset_smtp(self) -> None:
+        conn = getattr(self._smtp, "conn", None)
+        self._smtp.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def send_email(self, to_email: str, subject: str, html_body: str, text_body: str) -> bool:
+        """
+        Sends an email using AWS SES raw interface to support inline images (CID).
+        Single blocking attempt; bulk sends should go through EmailDispatcher.
+        """
+        try:
+            self.deliver(OutgoingEmail(to_email, subject, html_body, text_body))
+            return True
+        except EmailDeliveryError as e:
+            logger.error(f"Failed to send email: {e}")
             return False
 
     def send_coupons(self, influencer_name: str, influencer_email: str, campaign_name: str, coupons: List[Any]):
         """
         Sends an email with a list of coupons.
         """
+        return self.send_email(*self.build_coupons_email(influencer_name, influencer_email, campaign_name, coupons))
+
+    def build_coupons_email(self, influencer_name: str, influencer_email: str, campaign_name: str, coupons: List[Any]) -> OutgoingEmail:
+        """
+        Renders the coupons email for one influencer.
+        """
         subject = f"Your Coupons for {campaign_name} - SuperHer"
         
         # Build Coupons List HTML
-        coupons_html = f"<p>Here are your assigned coupons for the campaign <strong>{campaign_name}</strong>:</p>"
-        coupons_text = f"Here are your assigned coupons for the campaign {campaign_name}:\n\n"
+        coupons_html = [f"<p>Here are your assigned coupons for the campaign <strong>{campaign_name}</strong>:</p>"]
+        coupons_text = [f"Here are your assigned coupons for the campaign {campaign_name}:\n\n"]
         
         for coupon in coupons:
-            coupons_html += f"""
-            <div class="card">
-                <span class="label">Coupon Code</span>
-                <div class="code">{coupon.code}</div>
-            </div>
-            """
-            coupons_text += f"- {coupon.code}\n"
-        
-        html_body = self.get_email_template(subject, influencer_name, coupons_html)
-        
-        text_body = f"""
-        Hello {influencer_name},
+            coupons_html.append(COUPON_CARD.render(code=coupon.code))
+            coupons_text.append(f"- {coupon.code}\n")
         
-        {coupons_text}
+        html_body = self.get_email_template(subject, influencer_name, "".join(coupons_html))
+        text_body = TEXT_BODY.render(recipient_name=influencer_name, items_text="".join(coupons_text))
         
-        Good luck!
-        The SuperHer Team
-        """
-        
-        return self.send_email(influencer_email, subject, html_body, text_body)
+        return OutgoingEmail(influencer_email, subject, html_body, text_body)
 
     def send_links(self, influencer_name: str, influencer_email: str, campaign_name: str, links: List[Any]):
         """
         Sends an email with a list of tracking links.
         """
+        return self.send_email(*self.build_links_email(influencer_name, influencer_email, campaign_name, links))
+
+    def build_links_email(self, influencer_name: str, influencer_email: str, campaign_name: str, links: List[Any]) -> OutgoingEmail:
+        """
+        Renders the tracking links email for one influencer.
+        """
         subject = f"Your Tracking Links for {campaign_name} - SuperHer"
         
         # Build Links List HTML
-        links_html = f"<p>Here are your assigned tracking links for the campaign <strong>{campaign_name}</strong>:</p>"
-        links_text = f"Here are your assigned tracking links for the campaign {campaign_name}:\n\n"
+        links_html = [f"<p>Here are your assigned tracking links for the campaign <strong>{campaign_name}</strong>:</p>"]
+        links_text = [f"Here are your assigned tracking links for the campaign {campaign_name}:\n\n"]
         
         for link in links:
             short_url = f"https://superher.in/api/v1/r/{link.short_code}"
-            
-            links_html += f"""
-            <div class="card">
-                <span class="label">Destination: {link.destination_url}</span>
-                <a href="{short_url}" class="btn" style="width: 100%; box-sizing: border-box; text-align: center; margin-top: 8px;">{short_url}</a>
-            </div>
-            """
-            links_text += f"- {short_url} (Dest: {link.destination_url})\n"
+            links_html.append(LINK_CARD.render(destination_url=link.destination_url, short_url=short_url))
+            links_text.append(f"- {short_url} (Dest: {link.destination_url})\n")
         
-        html_body = self.get_email_template(subject, influencer_name, links_html)
-        
-        text_body = f"""
-        Hello {influencer_name},
-        
-        {links_text}
-        
-        Good luck!
-        The SuperHer Team
-        """
+        html_body = self.get_email_template(subject, influencer_name, "".join(links_html))
+        text_body = TEXT_BODY.render(recipient_name=influencer_name, items_text="".join(links_text))
         
-        return self.send_email(influencer_email, subject, html_body, text_body)
+        return OutgoingEmail(influencer_email, subject, html_body, text_body)
 
 email_service = EmailService()
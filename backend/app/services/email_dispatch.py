@@ -0,0 +1,132 @@
+"""
+Email Dispatcher — concurrent, rate-limited bulk sending.
+
+SES (and SMTP) calls are blocking, so sends run on a bounded thread pool and
+never on the event loop. A token bucket keeps the aggregate rate under
+EMAIL_SEND_RATE_PER_SECOND (the account's SES max send rate): the bucket is
+per process, so each one gets EMAIL_SEND_RATE_PER_SECOND / EMAIL_DISPATCH_PROCESSES.
+Throttling or transient transport errors are retried with exponential backoff + jitter.
+Results are aggregated into a single summary for the caller.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.email import EmailDeliveryError, OutgoingEmail, email_service
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], Awaitable[Any]]
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Serialised so waiters are served in order and the rate holds under contention
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class EmailDispatcher:
+    def __init__(self, concurrency: int, rate_per_second: float, max_retries: int, retry_base_delay: float):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.bucket = TokenBucket(rate_per_second)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="email")
+        return self._executor
+
+    async def _send_one(self, email: OutgoingEmail) -> Optional[str]:
+        """Returns None on success, or the final error message."""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                await loop.run_in_executor(self.executor, email_service.deliver, email)
+                return None
+            except EmailDeliveryError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    logger.error(f"Failed to send email to {email.to_email}: {e}")
+                    return str(e)
+                delay = self.retry_base_delay * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                logger.warning(f"Retrying email to {email.to_email} in {delay:.1f}s ({attempt}/{self.max_retries}): {e}")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Unexpected error sending email to {email.to_email}: {e}")
+                return str(e)
+
+    async def dispatch(self, emails: List[OutgoingEmail], on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Sends all `emails` with at most `concurrency` in flight.
+        Returns {"sent": int, "failed": int, "failures": [{"to", "error"}]}.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failures: List[Dict[str, str]] = []
+        done = 0
+
+        async def worker(email: OutgoingEmail):
+            nonlocal done
+            async with semaphore:
+                error = await self._send_one(email)
+            if error:
+                failures.append({"to": email.to_email, "error": error})
+            done += 1
+            if on_progress:
+                await on_progress(done, len(emails))
+
+        tasks = [asyncio.ensure_future(worker(email)) for email in emails]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # e.g. JobCancelled from the progress callback: stop the remaining sends
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return {
+            "sent": len(emails) - len(failures),
+            "failed": len(failures),
+            "failures": failures
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+email_dispatcher = EmailDispatcher(
+    concurrency=settings.EMAIL_DISPATCH_CONCURRENCY,
+    rate_per_second=settings.EMAIL_SEND_RATE_PER_SECOND / max(settings.EMAIL_DISPATCH_PROCESSES, 1),
+    max_retries=settings.EMAIL_SEND_MAX_RETRIES,
+    retry_base_delay=settings.EMAIL_RETRY_BASE_DELAY_SECONDS
+)
@@ -0,0 +1,176 @@
+"""
+Precompiled email templates.
+
+Templates are parsed once at import into alternating literal / placeholder
+segments, so rendering a recipient's email is a single list join instead of
+re-formatting the whole document (including the inline CSS block) each time.
+Static values (logo, footer) are baked into the shell at compile time.
+
+`MimeSkeleton` does the same for the MIME envelope: boundaries and part
+headers are fixed once and only the per-recipient headers and base64 bodies
+are filled in, avoiding the `email` package's generator per message.
+"""
+
+import base64
+import uuid
+from email.errors import HeaderParseError
+from email.header import Header
+from string import Formatter
+from typing import Dict, List, Tuple
+
+
+class CompiledTemplate:
+    """A `str.format`-style template split into segments once, rendered by join."""
+
+    def __init__(self, source: str, **static_values: str):
+        self.source = source
+        self.static_values = static_values
+        self._segments: List[str] = []
+        self._fields: List[Tuple[int, str]] = []  # (segment index, field name)
+        for literal, field, _spec, _conv in Formatter().parse(source):
+            if literal:
+                self._segments.append(literal)
+            if field is not None:
+                if field in static_values:
+                    self._segments.append(static_values[field])
+                else:
+                    self._fields.append((len(self._segments), field))
+                    self._segments.append("")
+        self.field_names = {name for _, name in self._fields}
+
+    def render(self, **values: str) -> str:
+        segments = self._segments.copy()
+        for index, name in self._fields:
+            segments[index] = str(values[name])
+        return "".join(segments)
+
+
+# Use a public URL for the logo so it renders correctly in email clients
+LOGO_URL = "https://superher.in/Superher-logo.png" # Assuming it is hosted here or will be
+LOGO_HTML = f'<img src="{LOGO_URL}" alt="SuperHer Logo" style="height: 40px; width: auto;">'
+
+EMAIL_SHELL = CompiledTemplate("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>{title}</title>
+            <style>
+                body {{ font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; background-color: #F8FAFC; margin: 0; padding: 0; -webkit-font-smoothing: antialiased; }}
+                .container {{ max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1); margin-top: 20px; margin-bottom: 20px; }}
+                .header {{ background-color: #ffffff; padding: 24px 32px; border-bottom: 1px solid #e2e8f0; text-align: center; }}
+                .content {{ padding: 32px; color: #334155; line-height: 1.6; }}
+                .h1 {{ color: #1e293b; font-size: 20px; font-weight: 700; margin-top: 0; }}
+                .card {{ background-color: #f8fafc; border: 1px solid #e2e8f0; border-radius: 6px; padding: 16px; margin-bottom: 12px; }}
+                .code {{ font-family: monospace; font-size: 18px; font-weight: 700; color: #7C3AED; letter-spacing: 1px; background: #fff; padding: 8px 12px; border-radius: 4px; border: 1px dashed #7C3AED; display: inline-block; }}
+                .footer {{ background-color: #f1f5f9; padding: 24px; text-align: center; color: #64748b; font-size: 12px; }}
+                .btn {{ display: inline-block; background-color: #7C3AED; color: white; padding: 10px 20px; border-radius: 6px; text-decoration: none; font-weight: bold; margin-top: 10px; }}
+                .label {{ font-size: 12px; color: #64748b; text-transform: uppercase; font-weight: 600; letter-spacing: 0.5px; margin-bottom: 4px; display: block; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    {logo_html}
+                </div>
+                <div class="content">
+                    <h2 class="h1">Hello {recipient_name},</h2>
+                    {content_html}
+                    <p style="margin-top: 30px;">Good luck with the campaign!</p>
+                    <p style="color: #64748b;">The SuperHer Team</p>
+                </div>
+                <div class="footer">
+                    &copy; 2026 SuperHer. All rights reserved.<br>
+                    <span style="opacity: 0.7;">You received this email because you are a partner influencer.</span>
+                </div>
+            </div>
+        </body>
+        </html>
+        """, logo_html=LOGO_HTML)
+
+COUPON_CARD = CompiledTemplate("""
+            <div class="card">
+                <span class="label">Coupon Code</span>
+                <div class="code">{code}</div>
+            </div>
+            """)
+
+LINK_CARD = CompiledTemplate("""
+            <div class="card">
+                <span class="label">Destination: {destination_url}</span>
+                <a href="{short_url}" class="btn" style="width: 100%; box-sizing: border-box; text-align: center; margin-top: 8px;">{short_url}</a>
+            </div>
+            """)
+
+TEXT_BODY = CompiledTemplate("""
+        Hello {recipient_name},
+        
+        {items_text}
+        
+        Good luck!
+        The SuperHer Team
+        """)
+
+
+def _base64_lines(text: str) -> str:
+    return base64.encodebytes(text.encode("utf-8")).decode("ascii")
+
+
+def _header_value(value: str) -> str:
+    if "\r" in value or "\n" in value:
+        # A line break would let the value start headers of its own (e.g. Bcc); the
+        # `email` package refuses these too, with the same error
+        raise HeaderParseError(f"header value contains a line break: {value!r}")
+    try:
+        value.encode("ascii")
+        return value
+    except UnicodeEncodeError:
+        return Header(value, "utf-8").encode()
+
+
+class MimeSkeleton:
+    """
+    multipart/related > multipart/alternative > (text/plain, text/html), with the
+    structure laid out once. Equivalent to the MIMEMultipart tree EmailService
+    used to build per recipient, with both bodies utf-8 + base64.
+    """
+
+    def __init__(self, sender: str):
+        token = uuid.uuid4().hex
+        related = f"==superher_rel_{token}"
+        alternative = f"==superher_alt_{token}"
+        self.sender = sender
+        self._head = (
+            f'Content-Type: multipart/related; boundary="{related}"\n'
+            "MIME-Version: 1.0\n"
+        )
+        self._open = (
+            f"\n--{related}\n"
+            f'Content-Type: multipart/alternative; boundary="{alternative}"\n'
+            "MIME-Version: 1.0\n"
+            f"\n--{alternative}\n"
+            'Content-Type: text/plain; charset="utf-8"\n'
+            "MIME-Version: 1.0\n"
+            "Content-Transfer-Encoding: base64\n\n"
+        )
+        self._middle = (
+            f"\n--{alternative}\n"
+            'Content-Type: text/html; charset="utf-8"\n'
+            "MIME-Version: 1.0\n"
+            "Content-Transfer-Encoding: base64\n\n"
+        )
+        self._close = f"\n--{alternative}--\n\n--{related}--\n"
+
+    def render(self, to_email: str, subject: str, html_body: str, text_body: str) -> str:
+        return "".join((
+            self._head,
+            "Subject: ", _header_value(subject), "\n",
+            "From: ", self.sender, "\n",
+            "To: ", _header_value(to_email), "\n",
+            self._open,
+            _base64_lines(text_body),
+            self._middle,
+            _base64_lines(html_body),
+            self._close,
+        ))
@@ -0,0 +1,62 @@
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.customer_event import CustomerEvent, CustomerEventPayload
+
+
+class EventPayloadService:
+    """
+    Stores and retrieves the full original payload of a CustomerEvent.
+
+    By default payloads live in the `customer_event_payloads` side table (optionally
+    zlib-compressed) so stats scans and exports only touch narrow event rows.
+    Retrieval is lazy: only the audit view reads them back.
+    """
+
+    @staticmethod
+    def encode(payload: Dict[str, Any]) -> Tuple[str, bytes]:
+        raw = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+        if settings.EVENT_RAW_PAYLOAD_COMPRESS:
+            return "zlib", zlib.compress(raw)
+        return "json", raw
+
+    @staticmethod
+    def decode(encoding: str, data: bytes) -> Dict[str, Any]:
+        if encoding == "zlib":
+            data = zlib.decompress(data)
+        return json.loads(data.decode("utf-8"))
+
+    @staticmethod
+    def attach(event: CustomerEvent, payload: Dict[str, Any]) -> None:
+        """
+        Attaches the raw payload to a pending event according to EVENT_RAW_PAYLOAD_STORAGE.
+        The side table row is flushed in the same unit of work as the event itself.
+        """
+        if settings.EVENT_RAW_PAYLOAD_STORAGE == "inline":
+            event.raw_data = payload
+            return
+
+        encoding, data = EventPayloadService.encode(payload)
+        event.payload = CustomerEventPayload(encoding=encoding, data=data)
+
+    @staticmethod
+    async def get_raw_payload(db: AsyncSession, event_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Audit view lookup. Reads the side table first, then falls back to the
+        legacy inline `raw_data` column for events ingested before the split.
+        """
+        result = await db.execute(
+            select(CustomerEventPayload.encoding, CustomerEventPayload.data)
+            .where(CustomerEventPayload.event_id == event_id)
+        )
+        row = result.first()
+        if row:
+            return EventPayloadService.decode(row.encoding, row.data)
+
+        result = await db.execute(select(CustomerEvent.raw_data).where(CustomerEvent.id == event_id))
+        return result.scalar_one_or_none()
@@ -0,0 +1,323 @@
+"""
+Event Spool — durable local write-behind queue for conversion events.
+
+In `EVENT_INGEST_MODE=spool` the `/events` endpoint validates the payload,
+appends it to an append-only segment file and returns 202 once the record is
+fsync'd. Appends are group-committed: a single fsync every
+EVENT_SPOOL_FSYNC_INTERVAL_MS acknowledges every record written since the last one.
+
+A consumer task in each worker seals segments, then attributes and inserts
+them in batches. Segments are coordinated between gunicorn workers with
+`flock`, so any worker can drain any sealed (or orphaned) segment. Delivery
+is at-least-once: a crash between a DB commit and the offset checkpoint can
+replay one batch (events carrying an idempotency key are de-duplicated on replay).
+
+Only transient database errors (lost connection, lock wait timeout, deadlock)
+are retried, with backoff. When a batch fails for any other reason, its
+records are retried one at a time. A record that still fails (invalid payload,
+advertiser deleted since the event was accepted, ...) is appended to
+`dead-letter.jsonl` in the spool directory with its error, and draining
+continues past it.
+
+Segment lifecycle:
+    active-<pid>-<ns>.log  (being written, flock held by the writer)
+ -> ready-<ns>-<pid>-<ns>.log  (sealed, waiting for a consumer)
+ -> deleted once fully persisted (progress kept in <segment>.offset)
+"""
+
+import asyncio
+import fcntl
+import glob
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.db_errors import is_transient
+from app.services.ingestion import EventIngestionService
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_BACKOFF_SECONDS = 30.0
+DEAD_LETTER_FILE = "dead-letter.jsonl"
+
+
+class EventSpool:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._file = None
+        self._active_path: Optional[str] = None
+        self._active_bytes = 0
+        self._active_opened_at = 0.0
+        self._pending: List[asyncio.Future] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return self._file is not None
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._wakeup = asyncio.Event()
+        self._open_segment()
+        self._tasks = [
+            asyncio.create_task(self._flush_loop()),
+            asyncio.create_task(self._consume_loop()),
+        ]
+        logger.info(f"Event spool started in {self.directory}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._file:
+            await self._fsync()
+            # Seal so another worker (or the next start) drains what is left
+            self._seal_segment()
+
+    # --- Producer side ---
+
+    async def append(self, record: Dict[str, Any]) -> None:
+        """Appends one record and returns once it is durable on disk."""
+        if not self._file:
+            raise RuntimeError("Event spool is not running")
+
+        line = json.dumps(record, default=str, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._file.write(line)
+        self._active_bytes += len(line)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending.append(waiter)
+        self._wakeup.set()
+        await waiter
+
+    async def _flush_loop(self) -> None:
+        interval = settings.EVENT_SPOOL_FSYNC_INTERVAL_MS / 1000
+        rotate_after = settings.EVENT_SPOOL_ROTATE_INTERVAL_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=rotate_after)
+                self._wakeup.clear()
+                # Let concurrent appends pile up so one fsync covers them all
+                await asyncio.sleep(interval)
+                await self._fsync()
+            except asyncio.TimeoutError:
+                pass
+
+            age = time.monotonic() - self._active_opened_at
+            if self._active_bytes and (age >= rotate_after or self._active_bytes >= settings.EVENT_SPOOL_SEGMENT_MAX_BYTES):
+                await self._fsync()
+                self._seal_segment()
+                self._open_segment()
+
+    async def _fsync(self) -> None:
+        waiters, self._pending = self._pending, []
+        if not waiters:
+            return
+        try:
+            self._file.flush()
+            await asyncio.get_running_loop().run_in_executor(None, os.fsync, self._file.fileno())
+        except Exception as e:
+            logger.error(f"Event spool fsync failed: {e}")
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _open_segment(self) -> None:
+        path = os.path.join(self.directory, f"active-{os.getpid()}-{time.time_ns()}.log")
+        f = open(path, "ab")
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._file = f
+        self._active_path = path
+        self._active_bytes = 0
+        self._active_opened_at = time.monotonic()
+
+    def _seal_segment(self) -> None:
+        f, path = self._file, self._active_path
+        self._file = None
+        self._active_path = None
+        f.flush()
+        os.fsync(f.fileno())
+        if self._active_bytes:
+            os.rename(path, self._ready_path_for(path))
+        else:
+            os.unlink(path)
+        f.close()  # releases the flock
+
+    def _ready_path_for(self, active_path: str) -> str:
+        suffix = os.path.basename(active_path)[len("active-"):]
+        return os.path.join(self.directory, f"ready-{time.time_ns()}-{suffix}")
+
+    # --- Consumer side ---
+
+    async def _consume_loop(self) -> None:
+        poll = settings.EVENT_SPOOL_POLL_INTERVAL_MS / 1000
+        backoff = poll
+        while True:
+            try:
+                self._recover_orphans()
+                for path in sorted(glob.glob(os.path.join(self.directory, "ready-*.log"))):
+                    await self._drain_segment(path)
+                backoff = poll
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The DB is unavailable (see _persist). Records stay on disk; retry with backoff.
+                backoff = min(backoff * 2, MAX_RETRY_BACKOFF_SECONDS)
+                logger.warning(f"Event spool consumer error, retrying in {backoff:.1f}s: {e}")
+            await asyncio.sleep(backoff)
+
+    def _recover_orphans(self) -> None:
+        """Seals active segments left behind by workers that died without shutting down."""
+        for path in glob.glob(os.path.join(self.directory, "active-*.log")):
+            if path == self._active_path:
+                continue
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # Writer is alive
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    continue
+                if os.fstat(f.fileno()).st_size == 0:
+                    os.unlink(path)
+                else:
+                    os.rename(path, self._ready_path_for(path))
+                logger.info(f"Recovered orphaned spool segment {path}")
+
+    async def _drain_segment(self, path: str) -> None:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return
+
+        with f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # Another worker is draining it
+            if os.fstat(f.fileno()).st_nlink == 0:
+                return  # Drained and deleted while we waited
+
+            offset_path = path + ".offset"
+            f.seek(self._read_offset(offset_path))
+
+            while True:
+                batch, next_offset = self._read_batch(f, settings.EVENT_SPOOL_BATCH_SIZE)
+                if next_offset is None:
+                    break
+                if batch:
+                    await self._persist(batch, offset_path)
+                self._write_offset(offset_path, next_offset)
+
+            os.unlink(path)
+            if os.path.exists(offset_path):
+                os.unlink(offset_path)
+
+    async def _persist(self, batch: List[Tuple[Dict[str, Any], int]], offset_path: str) -> None:
+        """
+        Persists (record, offset after it) pairs. Transient errors propagate so the
+        consumer retries the batch; anything else isolates the failing records.
+        """
+        try:
+            async with SessionLocal() as db:
+                count = await EventIngestionService.ingest_batch(db, [record for record, _ in batch])
+            logger.info(f"Event spool persisted {count} events")
+            return
+        except Exception as e:
+            if is_transient(e):
+                raise
+            logger.warning(f"Event spool batch failed, retrying its {len(batch)} records one by one: {e}")
+
+        # Each record commits and is checkpointed on its own, so a transient error from
+        # here on replays nothing that was already persisted.
+        for record, end_offset in batch:
+            try:
+                async with SessionLocal() as db:
+                    await EventIngestionService.ingest_batch(db, [record])
+            except Exception as e:
+                if is_transient(e):
+                    raise
+                self._dead_letter(record, e)
+            self._write_offset(offset_path, end_offset)
+
+    def _dead_letter(self, record: Dict[str, Any], error: Exception) -> None:
+        entry = {
+            "failed_at": datetime.utcnow().isoformat(),
+            "error": f"{type(error).__name__}: {error}",
+            "record": record,
+        }
+        line = json.dumps(entry, default=str, separators=(",", ":")).encode("utf-8") + b"\n"
+        # O_APPEND: workers can dead-letter concurrently without interleaving lines
+        with open(os.path.join(self.directory, DEAD_LETTER_FILE), "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())  # Durable before the offset moves past the record
+        logger.error(f"Event spool record moved to {DEAD_LETTER_FILE}: {entry['error']}")
+
+    @staticmethod
+    def _read_batch(f, batch_size: int) -> Tuple[List[Tuple[Dict[str, Any], int]], Optional[int]]:
+        """
+        Reads up to `batch_size` complete lines. Returns ([(record, offset after it)],
+        offset after the batch), or (_, None) at end of segment. A trailing line without
+        a newline is a torn write that was never acknowledged, so it is dropped.
+        """
+        records = []
+        consumed = False
+        while len(records) < batch_size:
+            start = f.tell()
+            line = f.readline()
+            if not line or not line.endswith(b"\n"):
+                f.seek(start)
+                break
+            consumed = True
+            try:
+                records.append((json.loads(line), f.tell()))
+            except ValueError:
+                logger.error(f"Skipping corrupt spool record at offset {start}")
+        return records, (f.tell() if consumed else None)
+
+    @staticmethod
+    def _read_offset(offset_path: str) -> int:
+        try:
+            with open(offset_path) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @staticmethod
+    def _write_offset(offset_path: str, offset: int) -> None:
+        tmp_path = offset_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, offset_path)
+
+
+def build_spool_record(advertiser_id: int, event: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "advertiser_id": advertiser_id,
+        "received_at": datetime.utcnow().isoformat(),
+        "idempotency_key": idempotency_key,
+        "event": event,
+    }
+
+
+event_spool = EventSpool(settings.EVENT_SPOOL_DIR)
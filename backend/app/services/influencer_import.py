@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.campaign import Campaign
+from app.models.influencer import Influencer, CampaignInfluencer
+from app.models.user import UserRole
+from app.schemas.influencer import InfluencerCreate
+
+CHUNK_SIZE = 500
+
+
+class InfluencerImportService:
+    """
+    Set-based bulk influencer import (CSV upload from the dashboard).
+
+    Rows are processed in chunks. Per chunk: one query for existing emails, one for
+    campaigns not seen yet, one multi-row INSERT for influencers and one for their
+    campaign links, all inside a savepoint. If the savepoint fails (e.g. a concurrent
+    import inserted the same email), the chunk is retried row by row so the
+    remaining rows still succeed. Each chunk is committed on its own.
+
+    Rows whose campaign is unknown or belongs to another advertiser are still created,
+    just not linked (same behaviour as the single-row loop this replaces).
+    """
+
+    @staticmethod
+    async def import_influencers(
+        db: AsyncSession,
+        rows: List[InfluencerCreate],
+        role: UserRole,
+        advertiser_id: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], Any]] = None
+    ) -> Dict[str, Any]:
+        created_count = 0
+        errors: List[Dict[str, Any]] = []
+        seen_emails = set()
+        campaigns: Dict[int, Optional[int]] = {}  # campaign_id -> advertiser_id (None = missing)
+
+        for start in range(0, len(rows), CHUNK_SIZE):
+            chunk: List[Tuple[int, InfluencerCreate]] = []
+            for index, row in enumerate(rows[start:start + CHUNK_SIZE], start=start):
+                email_key = row.email.lower()
+                if email_key in seen_emails:
+                    errors.append({"index": index, "email": row.email, "error": "Duplicate email in upload"})
+                    continue
+                seen_emails.add(email_key)
+                chunk.append((index, row))
+
+            if chunk:
+                # Existence check for the whole chunk
+                result = await db.execute(
+                    select(func.lower(Influencer.email)).where(Influencer.email.in_([row.email for _, row in chunk]))
+                )
+                existing = set(result.scalars().all())
+                pending = []
+                for index, row in chunk:
+                    if row.email.lower() in existing:
+                        errors.append({"index": index, "email": row.email, "error": "Already exists"})
+                    else:
+                        pending.append((index, row))
+
+                # Campaign lookups, cached across chunks
+                missing_ids = {row.campaign_id for _, row in pending if row.campaign_id and row.campaign_id not in campaigns}
+                if missing_ids:
+                    result = await db.execute(select(Campaign.id, Campaign.advertiser_id).where(Campaign.id.in_(missing_ids)))
+                    found = {r.id: r.advertiser_id for r in result.all()}
+                    for campaign_id in missing_ids:
+                        campaigns[campaign_id] = found.get(campaign_id)
+
+                def link_campaign(row: InfluencerCreate) -> Optional[int]:
+                    if not row.campaign_id or campaigns.get(row.campaign_id) is None:
+                        return None
+                    if role == UserRole.ADVERTISER and campaigns[row.campaign_id] != advertiser_id:
+                        return None  # Skip linking if unauthorized
+                    return row.campaign_id
+
+                if pending:
+                    try:
+                        async with db.begin_nested():
+                            await InfluencerImportService._insert_chunk(db, pending, link_campaign)
+                        created_count += len(pending)
+                    except IntegrityError:
+                        created_count += await InfluencerImportService._insert_rows(db, pending, link_campaign, errors)
+                    await db.commit()
+
+            if on_progress:
+                await on_progress(min(start + CHUNK_SIZE, len(rows)), len(rows))
+
+        errors.sort(key=lambda e: e["index"])
+        return {
+            "total_received": len(rows),
+            "created": created_count,
+            "errors": errors
+        }
+
+    @staticmethod
+    def _link_row(influencer_id: int, campaign_id: int, row: InfluencerCreate) -> Dict[str, Any]:
+        link = {"campaign_id": campaign_id, "influencer_id": influencer_id}
+        if row.revenue_share_value is not None:
+            link["revenue_share_value"] = row.revenue_share_value
+        if row.revenue_share_type is not None:
+            link["revenue_share_type"] = row.revenue_share_type
+        return link
+
+    @staticmethod
+    async def _insert_chunk(db: AsyncSession, pending: List[Tuple[int, InfluencerCreate]], link_campaign) -> None:
+        now = datetime.utcnow()
+        await db.execute(
+            insert(Influencer),
+            [{"name": row.name, "email": row.email, "social_handle": row.social_handle, "created_at": now} for _, row in pending]
+        )
+
+        to_link = [(row, link_campaign(row)) for _, row in pending]
+        to_link = [(row, campaign_id) for row, campaign_id in to_link if campaign_id]
+        if not to_link:
+            return
+
+        # Multi-row INSERT does not hand back ids on MySQL: read them back by email
+        result = await db.execute(
+            select(Influencer.id, Influencer.email).where(Influencer.email.in_([row.email for row, _ in to_link]))
+        )
+        ids = {r.email.lower(): r.id for r in result.all()}
+        await db.execute(
+            insert(CampaignInfluencer),
+            [InfluencerImportService._link_row(ids[row.email.lower()], campaign_id, row) for row, campaign_id in to_link]
+        )
+
+    @staticmethod
+    async def _insert_rows(
+        db: AsyncSession,
+        pending: List[Tuple[int, InfluencerCreate]],
+        link_campaign,
+        errors: List[Dict[str, Any]]
+    ) -> int:
+        """Slow path: one savepoint per row so a single bad row does not sink the chunk."""
+        created = 0
+        for index, row in pending:
+            try:
+                async with db.begin_nested():
+                    new_inf = Influencer(name=row.name, email=row.email, social_handle=row.social_handle)
+                    db.add(new_inf)
+                    await db.flush()
+                    campaign_id = link_campaign(row)
+                    if campaign_id:
+                        await db.execute(insert(CampaignInfluencer), [InfluencerImportService._link_row(new_inf.id, campaign_id, row)])
+                created += 1
+            except IntegrityError:
+                errors.append({"index": index, "email": row.email, "error": "Already exists"})
+            except Exception as e:
+                errors.append({"index": index, "email": row.email, "error": str(e)})
+        return created
@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db_errors import is_duplicate_key
+from app.models.customer_event import CustomerEvent
+from app.schemas.event import EventCreate
+from app.services.attribution import AttributionService
+from app.services.event_payloads import EventPayloadService
+
+IDEMPOTENCY_CONSTRAINT = "uq_customer_events_advertiser_idempotency_key"
+
+
+class EventIngestionService:
+    """
+    Turns validated EventCreate payloads into CustomerEvent rows.
+    Shared by the synchronous `/events` path and the spool consumer.
+    """
+
+    @staticmethod
+    def build_event(
+        event_in: EventCreate,
+        advertiser_id: int,
+        attribution: Tuple[Optional[int], Optional[int], Optional[int]],
+        timestamp: Optional[datetime] = None,
+        idempotency_key: Optional[str] = None
+    ) -> CustomerEvent:
+        influencer_id, campaign_id, tracking_link_id = attribution
+        new_event = CustomerEvent(
+            advertiser_id=advertiser_id,
+            event_type=event_in.action,  # mapping 'action' -> 'event_type'
+            idempotency_key=idempotency_key,
+            timestamp=timestamp or datetime.utcnow(),
+            # Financials
+            revenue=event_in.value,
+            currency=event_in.currency,
+            # Inputs
+            coupon_code=event_in.coupon_code,
+            ref_code=event_in.ref_code,
+            landing_url=event_in.landing_url,
+            referrer=event_in.referrer,
+            # Resolved Attribution
+            influencer_id=influencer_id,
+            campaign_id=campaign_id,
+            tracking_link_id=tracking_link_id,
+            # Audit
+            properties=event_in.properties
+        )
+        # Full payload goes to the side table (or inline, see EVENT_RAW_PAYLOAD_STORAGE)
+        EventPayloadService.attach(new_event, event_in.dict())
+        return new_event
+
+    @staticmethod
+    async def find_by_idempotency_key(db: AsyncSession, advertiser_id: int, idempotency_key: str) -> Optional[CustomerEvent]:
+        result = await db.execute(
+            select(CustomerEvent)
+            .where(CustomerEvent.advertiser_id == advertiser_id)
+            .where(CustomerEvent.idempotency_key == idempotency_key)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def ingest(
+        db: AsyncSession,
+        advertiser_id: int,
+        event_in: EventCreate,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[CustomerEvent, bool]:
+        """
+        Attributes and persists a single event (synchronous ingest mode).
+        Returns (event, replayed). If the idempotency key was already used by this
+        advertiser, the unique index rejects the INSERT and the original event is returned.
+        """
+        attr_service = AttributionService(db)
+        attribution = await attr_service.resolve(
+            coupon_code=event_in.coupon_code,
+            ref_code=event_in.ref_code,
+            landing_url=event_in.landing_url,
+            advertiser_id=advertiser_id
+        )
+
+        new_event = EventIngestionService.build_event(event_in, advertiser_id, attribution, idempotency_key=idempotency_key)
+        db.add(new_event)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if not idempotency_key or not is_duplicate_key(e, IDEMPOTENCY_CONSTRAINT):
+                raise
+            existing = await EventIngestionService.find_by_idempotency_key(db, advertiser_id, idempotency_key)
+            if not existing:
+                raise
+            return existing, True
+
+        # id comes back with the INSERT (lastrowid); every other field is already in hand
+        return new_event, False
+
+    @staticmethod
+    async def ingest_batch(db: AsyncSession, records: List[Dict[str, Any]]) -> int:
+        """
+        Attributes and persists a batch of spooled records in a single transaction.
+        Each record is {"advertiser_id": int, "received_at": iso str, "idempotency_key": str|None,
+        "event": EventCreate dict}. Attribution lookups are memoised per batch since spooled
+        traffic repeats codes heavily. Duplicate idempotency keys are skipped.
+        """
+        attr_service = AttributionService(db)
+        memo: Dict[tuple, Tuple[Optional[int], Optional[int], Optional[int]]] = {}
+        specs = []
+        seen_keys = set()
+
+        for record in records:
+            advertiser_id = record["advertiser_id"]
+            idempotency_key = record.get("idempotency_key")
+            if idempotency_key:
+                if (advertiser_id, idempotency_key) in seen_keys:
+                    continue
+                seen_keys.add((advertiser_id, idempotency_key))
+
+            event_in = EventCreate(**record["event"])
+
+            key = (event_in.coupon_code, event_in.ref_code, event_in.landing_url, advertiser_id)
+            if key not in memo:
+                memo[key] = await attr_service.resolve(
+                    coupon_code=event_in.coupon_code,
+                    ref_code=event_in.ref_code,
+                    landing_url=event_in.landing_url,
+                    advertiser_id=advertiser_id
+                )
+
+            received_at = datetime.fromisoformat(record["received_at"]) if record.get("received_at") else None
+            specs.append((event_in, advertiser_id, memo[key], received_at, idempotency_key))
+
+        def build(spec) -> CustomerEvent:
+            event_in, advertiser_id, attribution, received_at, idempotency_key = spec
+            return EventIngestionService.build_event(
+                event_in, advertiser_id, attribution, timestamp=received_at, idempotency_key=idempotency_key
+            )
+
+        db.add_all([build(spec) for spec in specs])
+        try:
+            await db.commit()
+            return len(specs)
+        except IntegrityError as e:
+            await db.rollback()
+            if not is_duplicate_key(e, IDEMPOTENCY_CONSTRAINT):
+                raise  # Not a replay (e.g. advertiser deleted): the spool consumer isolates the record
+
+        # Some keys were already persisted (client retry, or a replayed spool batch):
+        # fall back to one savepoint per event and skip the duplicates.
+        inserted = 0
+        for spec in specs:
+            try:
+                async with db.begin_nested():
+                    db.add(build(spec))
+            except IntegrityError as e:
+                if not spec[4] or not is_duplicate_key(e, IDEMPOTENCY_CONSTRAINT):
+                    raise
+                continue
+            inserted += 1
+        await db.commit()
+        return inserted
@@ -0,0 +1,54 @@
+"""
+Handlers for the background job types. Imported by the worker process
+(`python -m app.worker`) so that each type is registered in JOB_HANDLERS.
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import invalidate_api_key_cache, invalidate_user_cache
+from app.models.user import UserRole
+from app.schemas.coupon import CouponEmailRequest
+from app.schemas.influencer import InfluencerCreate
+from app.services.advertiser_deletion import AdvertiserDeletionService
+from app.services.influencer_import import InfluencerImportService
+from app.services.jobs import (
+    JobContext, job_handler,
+    JOB_INFLUENCER_IMPORT, JOB_COUPON_NOTIFY, JOB_ADVERTISER_DELETE
+)
+from app.services.notifications import NotificationService
+
+
+@job_handler(JOB_INFLUENCER_IMPORT)
+async def run_influencer_import(db: AsyncSession, ctx: JobContext) -> Dict[str, Any]:
+    rows = [InfluencerCreate(**row) for row in ctx.payload["rows"]]
+    return await InfluencerImportService.import_influencers(
+        db,
+        rows,
+        role=UserRole(ctx.payload["role"]),
+        advertiser_id=ctx.payload.get("advertiser_id"),
+        on_progress=ctx.set_progress
+    )
+
+
+@job_handler(JOB_COUPON_NOTIFY)
+async def run_coupon_notify(db: AsyncSession, ctx: JobContext) -> Dict[str, Any]:
+    return await NotificationService.notify_coupons(
+        db,
+        CouponEmailRequest(**ctx.payload["request"]),
+        role=UserRole(ctx.payload["role"]),
+        advertiser_id=ctx.payload.get("advertiser_id"),
+        on_progress=ctx.set_progress
+    )
+
+
+@job_handler(JOB_ADVERTISER_DELETE)
+async def run_advertiser_delete(db: AsyncSession, ctx: JobContext) -> Dict[str, Any]:
+    advertiser_id = ctx.payload["advertiser_id"]
+    result = await AdvertiserDeletionService.delete_advertiser(db, advertiser_id, on_progress=ctx.set_progress)
+    # Only clears this (worker) process; API processes drop the entries within
+    # API_KEY_CACHE_TTL_SECONDS / USER_CACHE_TTL_SECONDS (both off by default)
+    invalidate_api_key_cache(advertiser_id)
+    invalidate_user_cache(advertiser_id=advertiser_id)
+    return result
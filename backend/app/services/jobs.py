@@ -0,0 +1,263 @@
+"""
+Background Jobs — MySQL-backed job queue for long-running bulk operations.
+
+The API enqueues a row in `jobs` and returns 202 with the job id; the worker
+process (`python -m app.worker`) claims queued jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, runs the registered handler and records
+progress, result or error. Failed jobs are retried with backoff up to
+`max_attempts` (job types in SINGLE_ATTEMPT_JOB_TYPES run at most once);
+running jobs can be cancelled cooperatively (the handler sees it at its next
+progress report).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job, JobStatus
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Job types
+JOB_INFLUENCER_IMPORT = "influencer_import"
+JOB_COUPON_NOTIFY = "coupon_notify"
+JOB_ADVERTISER_DELETE = "advertiser_delete"
+
+# Not safe to run again after a partial attempt: a retried coupon_notify would
+# re-send every email the failed attempt had already delivered.
+SINGLE_ATTEMPT_JOB_TYPES = {JOB_COUPON_NOTIFY}
+
+PROGRESS_FLUSH_INTERVAL_SECONDS = 0.5
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when cancellation was requested for its job."""
+
+
+class JobContext:
+    """
+    Handed to job handlers. Progress updates are written through their own session,
+    so they are visible while the handler's own transaction is still open.
+    """
+
+    def __init__(self, job_id: int, payload: Dict[str, Any]):
+        self.job_id = job_id
+        self.payload = payload or {}
+        self._last_flush = 0.0
+
+    async def set_progress(self, done: int, total: Optional[int] = None, force: bool = False) -> None:
+        """Records progress (throttled) and raises JobCancelled if a cancel was requested."""
+        now = time.monotonic()
+        if not force and total != done and now - self._last_flush < PROGRESS_FLUSH_INTERVAL_SECONDS:
+            return
+        self._last_flush = now
+
+        values = {"progress": done, "heartbeat_at": datetime.utcnow()}
+        if total is not None:
+            values["total"] = total
+        async with SessionLocal() as session:
+            await session.execute(update(Job).where(Job.id == self.job_id).values(**values))
+            result = await session.execute(select(Job.cancel_requested).where(Job.id == self.job_id))
+            cancel_requested = result.scalar_one_or_none()
+            await session.commit()
+        if cancel_requested:
+            raise JobCancelled()
+
+    async def check_cancelled(self) -> None:
+        async with SessionLocal() as session:
+            result = await session.execute(select(Job.cancel_requested).where(Job.id == self.job_id))
+            if result.scalar_one_or_none():
+                raise JobCancelled()
+
+
+JobHandler = Callable[[AsyncSession, JobContext], Awaitable[Optional[Dict[str, Any]]]]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str):
+    """Registers `async def handler(db, ctx) -> result dict` for a job type."""
+    def decorator(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = fn
+        return fn
+    return decorator
+
+
+class JobService:
+
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        job_type: str,
+        payload: Dict[str, Any],
+        user: Optional[User] = None,
+        advertiser_id: Optional[int] = None,
+        max_attempts: Optional[int] = None
+    ) -> Job:
+        if job_type in SINGLE_ATTEMPT_JOB_TYPES:
+            max_attempts = 1
+        job = Job(
+            type=job_type,
+            status=JobStatus.QUEUED.value,
+            payload=payload,
+            progress=0,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            cancel_requested=False,
+            created_by_user_id=user.id if user else None,
+            advertiser_id=advertiser_id if advertiser_id is not None else (user.advertiser_id if user else None),
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+        await db.commit()
+        return job
+
+    @staticmethod
+    def scoped_query(user: User):
+        stmt = select(Job)
+        if user.role != UserRole.SUPERROOT:
+            conditions = [Job.created_by_user_id == user.id]
+            if user.advertiser_id:
+                conditions.append(Job.advertiser_id == user.advertiser_id)
+            stmt = stmt.where(or_(*conditions))
+        return stmt
+
+    @staticmethod
+    async def request_cancel(db: AsyncSession, job: Job) -> bool:
+        """
+        Cancels a queued job or flags a running one. Conditional UPDATEs, so a worker
+        claiming or finishing the job concurrently cannot be overwritten. Returns False
+        if the job had already finished; `job` is refreshed either way.
+        """
+        by_id = update(Job).where(Job.id == job.id)
+        result = await db.execute(
+            by_id.where(Job.status == JobStatus.QUEUED.value)
+            .values(status=JobStatus.CANCELLED.value, finished_at=datetime.utcnow())
+        )
+        if not result.rowcount:
+            result = await db.execute(
+                by_id.where(Job.status == JobStatus.RUNNING.value).values(cancel_requested=True)
+            )
+        await db.commit()
+        await db.refresh(job)
+        return bool(result.rowcount)
+
+    # --- Worker side ---
+
+    @staticmethod
+    async def claim(worker_id: str) -> Optional[Job]:
+        """Atomically takes the oldest runnable job, or returns None."""
+        async with SessionLocal() as session:
+            result = await session.execute(
+                select(Job)
+                .where(Job.status == JobStatus.QUEUED.value)
+                .where(Job.run_after <= datetime.utcnow())
+                .order_by(Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.scalar_one_or_none()
+            if not job:
+                await session.commit()
+                return None
+            now = datetime.utcnow()
+            job.status = JobStatus.RUNNING.value
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.started_at = now
+            job.heartbeat_at = now
+            job.error = None
+            await session.commit()
+            return job
+
+    @staticmethod
+    async def requeue_stale() -> int:
+        """
+        Jobs whose worker stopped heartbeating (crash, OOM kill) go back to the queue,
+        or fail if that was their last attempt.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS)
+        stale = update(Job).where(Job.status == JobStatus.RUNNING.value).where(Job.heartbeat_at < cutoff)
+        async with SessionLocal() as session:
+            await session.execute(
+                stale.where(Job.attempts >= Job.max_attempts)
+                .values(status=JobStatus.FAILED.value, locked_by=None, error="Worker stopped while running the job", finished_at=now)
+            )
+            result = await session.execute(
+                stale.where(Job.attempts < Job.max_attempts)
+                .values(status=JobStatus.QUEUED.value, locked_by=None, run_after=now)
+            )
+            await session.commit()
+            return result.rowcount or 0
+
+    @staticmethod
+    async def _heartbeat(job_id: int) -> None:
+        """Keeps heartbeat_at fresh while a handler runs, even if it reports no progress."""
+        interval = max(settings.JOB_STALE_AFTER_SECONDS / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with SessionLocal() as session:
+                    await session.execute(update(Job).where(Job.id == job_id).values(heartbeat_at=datetime.utcnow()))
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Job {job_id} heartbeat failed: {e}")
+
+    @staticmethod
+    async def run(job: Job) -> None:
+        handler = JOB_HANDLERS.get(job.type)
+        ctx = JobContext(job.id, job.payload)
+        values: Dict[str, Any] = {}
+        heartbeat = asyncio.create_task(JobService._heartbeat(job.id))
+        try:
+            if not handler:
+                raise RuntimeError(f"No handler registered for job type '{job.type}'")
+            async with SessionLocal() as db:
+                result = await handler(db, ctx)
+            values = {"status": JobStatus.SUCCEEDED.value, "result": result}
+        except JobCancelled:
+            logger.info(f"Job {job.id} ({job.type}) cancelled")
+            values = {"status": JobStatus.CANCELLED.value}
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.type}) failed on attempt {job.attempts}")
+            if job.attempts < job.max_attempts and handler:
+                backoff = settings.JOB_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1))
+                values = {
+                    "status": JobStatus.QUEUED.value,
+                    "error": str(e),
+                    "run_after": datetime.utcnow() + timedelta(seconds=backoff)
+                }
+            else:
+                values = {"status": JobStatus.FAILED.value, "error": str(e)}
+        finally:
+            heartbeat.cancel()
+
+        if values["status"] != JobStatus.QUEUED.value:
+            values["finished_at"] = datetime.utcnow()
+        values["locked_by"] = None
+        # Only while this worker still owns the run (the reaper may have requeued it meanwhile)
+        owned = (
+            update(Job)
+            .where(Job.id == job.id)
+            .where(Job.status == JobStatus.RUNNING.value)
+            .where(Job.locked_by == job.locked_by)
+        )
+        async with SessionLocal() as session:
+            if values["status"] == JobStatus.QUEUED.value:
+                # A cancel requested during the failed attempt wins over the retry
+                result = await session.execute(owned.where(Job.cancel_requested == False).values(**values))
+                if not result.rowcount:
+                    values.update(status=JobStatus.CANCELLED.value, finished_at=datetime.utcnow())
+                    del values["run_after"]
+                    await session.execute(owned.values(**values))
+            else:
+                await session.execute(owned.values(**values))
+            await session.commit()
@@ -0,0 +1,143 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.campaign import Campaign
+from app.models.coupon import Coupon
+from app.models.influencer import Influencer
+from app.models.tracking_link import TrackingLink
+from app.models.user import UserRole
+from app.schemas.coupon import CouponEmailRequest
+from app.schemas.tracking import TrackingLinkEmailRequest
+from app.services.email import OutgoingEmail, email_service
+from app.services.email_dispatch import email_dispatcher
+
+ProgressCallback = Callable[[int, int], Awaitable[Any]]
+
+
+class NotificationService:
+    """
+    Influencer notification emails, shared by the `/notify` endpoints and their
+    background jobs. Emails are rendered up front, then handed to the
+    EmailDispatcher (thread pool + SES rate limit + retries).
+    """
+
+    @staticmethod
+    def _group(items: List[Any]) -> Dict[tuple, List[Any]]:
+        # Key: (influencer_id, campaign_id) -> list of coupons / links
+        grouped: Dict[tuple, List[Any]] = {}
+        for entry in items:
+            key = (entry.influencer_id, entry.campaign_id)
+            if key not in grouped:
+                grouped[key] = []
+            grouped[key].append(entry)
+        return grouped
+
+    @staticmethod
+    async def _send(emails: List[OutgoingEmail], total_items: int, noun: str, targeted: int, on_progress: Optional[ProgressCallback]) -> Dict[str, Any]:
+        result = await email_dispatcher.dispatch(emails, on_progress=on_progress)
+        return {
+            "message": f"Processed {total_items} {noun}.",
+            "emails_sent": result["sent"],
+            "emails_failed": result["failed"],
+            "influencers_targeted": targeted,
+            "failures": result["failures"]
+        }
+
+    @staticmethod
+    async def notify_coupons(
+        db: AsyncSession,
+        item: CouponEmailRequest,
+        role: UserRole,
+        advertiser_id: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Send emails to influencers with their assigned coupons.
+        """
+        stmt = select(Coupon).join(Campaign).join(Influencer).options(
+            selectinload(Coupon.campaign),
+            selectinload(Coupon.influencer)
+        ).where(Influencer.email.isnot(None))
+
+        # Scoping
+        if role == UserRole.ADVERTISER:
+            stmt = stmt.where(Campaign.advertiser_id == advertiser_id)
+
+        # Filter Logic
+        if item.send_all:
+            if item.campaign_id_filter:
+                stmt = stmt.where(Coupon.campaign_id == item.campaign_id_filter)
+        else:
+            if not item.ids:
+                return {"message": "No coupons selected", "sent_count": 0}
+            stmt = stmt.where(Coupon.id.in_(item.ids))
+
+        result = await db.execute(stmt)
+        coupons = result.scalars().all()
+        grouped = NotificationService._group(coupons)
+
+        emails = []
+        for coupon_list in grouped.values():
+            # All coupons in this list belong to same influencer and campaign
+            # So we can pick the first one's relations
+            influencer = coupon_list[0].influencer
+            campaign = coupon_list[0].campaign
+            if influencer and influencer.email:
+                emails.append(email_service.build_coupons_email(
+                    influencer_name=influencer.name,
+                    influencer_email=influencer.email,
+                    campaign_name=campaign.name,
+                    coupons=coupon_list
+                ))
+
+        return await NotificationService._send(emails, len(coupons), "coupons", len(grouped), on_progress)
+
+    @staticmethod
+    async def notify_links(
+        db: AsyncSession,
+        item: TrackingLinkEmailRequest,
+        role: UserRole,
+        advertiser_id: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Send emails to influencers with their assigned tracking links.
+        """
+        stmt = select(TrackingLink).join(Campaign).join(Influencer).options(
+            selectinload(TrackingLink.campaign),
+            selectinload(TrackingLink.influencer)
+        ).where(Influencer.email.isnot(None))
+
+        # Scoping
+        if role == UserRole.ADVERTISER:
+            stmt = stmt.where(Campaign.advertiser_id == advertiser_id)
+
+        # Filter Logic
+        if item.send_all:
+            if item.campaign_id_filter:
+                stmt = stmt.where(TrackingLink.campaign_id == item.campaign_id_filter)
+        else:
+            if not item.ids:
+                return {"message": "No links selected", "sent_count": 0}
+            stmt = stmt.where(TrackingLink.id.in_(item.ids))
+
+        result = await db.execute(stmt)
+        links = result.scalars().all()
+        grouped = NotificationService._group(links)
+
+        emails = []
+        for link_list in grouped.values():
+            influencer = link_list[0].influencer
+            campaign = link_list[0].campaign
+            if influencer and influencer.email:
+                emails.append(email_service.build_links_email(
+                    influencer_name=influencer.name,
+                    influencer_email=influencer.email,
+                    campaign_name=campaign.name,
+                    links=link_list
+                ))
+
+        return await NotificationService._send(emails, len(links), "links", len(grouped), on_progress)
@@ -0,0 +1,131 @@
+"""
+Short Code Allocator — collision-free codes for tracking links.
+
+Codes come from a monotonically increasing counter, so they are unique by
+construction and link creation needs no uniqueness probe:
+
+1. Each process reserves a block of SHORT_CODE_BLOCK_SIZE counter values from
+   the `short_code_sequences` row (SELECT ... FOR UPDATE, own transaction) and
+   hands them out from memory. One DB round trip per block, not per link.
+2. Each value is passed through a bijective scramble of [0, 36^8) (a small
+   Feistel network with cycle-walking), so consecutive links do not get
+   consecutive-looking codes. This is obfuscation, not secrecy.
+3. The result is base36-encoded (digits + lowercase) to exactly 8 characters.
+   Legacy random codes are 6 characters long, so the two spaces can never
+   overlap.
+
+The alphabet is single-case on purpose: the short_code column uses MySQL's
+case-insensitive default collation, so 'aB3xK9q' and 'ab3xk9q' would be the
+same key to the unique index. 36^8 ≈ 2.8 trillion codes. Values left in a
+block when a process exits are simply skipped (codes need to be unique, not
+dense).
+"""
+
+import asyncio
+import string
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.short_code_sequence import ShortCodeSequence
+
+BASE36_ALPHABET = string.digits + string.ascii_lowercase
+CODE_LENGTH = 8
+CODE_SPACE = len(BASE36_ALPHABET) ** CODE_LENGTH
+
+# Feistel network over 42 bits (2^42 > 36^8); any round function keeps it a permutation
+HALF_BITS = 21
+HALF_MASK = (1 << HALF_BITS) - 1
+ROUND_KEYS = (0x5BD1E995, 0x1B873593, 0x85EBCA6B, 0xC2B2AE35)
+
+SEQUENCE_NAME = "tracking_links"
+
+
+def _feistel(value: int) -> int:
+    left, right = value >> HALF_BITS, value & HALF_MASK
+    for key in ROUND_KEYS:
+        mixed = ((right * key) ^ (right >> 7) ^ key) & HALF_MASK
+        left, right = right, left ^ mixed
+    return (left << HALF_BITS) | right
+
+
+def scramble(value: int) -> int:
+    """Bijection on [0, 36^8): permute 42-bit space, walk the cycle until back in range."""
+    value = _feistel(value)
+    while value >= CODE_SPACE:
+        value = _feistel(value)
+    return value
+
+
+def encode_base36(value: int, length: int = CODE_LENGTH) -> str:
+    chars = []
+    for _ in range(length):
+        value, remainder = divmod(value, 36)
+        chars.append(BASE36_ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def encode_short_code(value: int) -> str:
+    if not 0 <= value < CODE_SPACE:
+        raise ValueError("Short code space exhausted")
+    return encode_base36(scramble(value))
+
+
+class ShortCodeAllocator:
+    def __init__(self, sequence_name: str = SEQUENCE_NAME):
+        self.sequence_name = sequence_name
+        self._next = 0
+        self._end = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _reserve(self, size: int) -> Tuple[int, int]:
+        """Reserves [start, start + size) from the shared counter in its own transaction."""
+        for _ in range(2):
+            async with SessionLocal() as session:
+                try:
+                    async with session.begin():
+                        result = await session.execute(
+                            select(ShortCodeSequence.next_value)
+                            .where(ShortCodeSequence.name == self.sequence_name)
+                            .with_for_update()
+                        )
+                        start = result.scalar_one_or_none()
+                        if start is None:
+                            # First use on a database created without the migration seed
+                            start = 0
+                            session.add(ShortCodeSequence(name=self.sequence_name, next_value=size))
+                        else:
+                            await session.execute(
+                                update(ShortCodeSequence)
+                                .where(ShortCodeSequence.name == self.sequence_name)
+                                .values(next_value=start + size)
+                            )
+                    return start, start + size
+                except IntegrityError:
+                    # Another process seeded the row first: retry against it
+                    continue
+        raise RuntimeError(f"Could not reserve short codes from sequence '{self.sequence_name}'")
+
+    async def allocate(self) -> str:
+        return (await self.allocate_many(1))[0]
+
+    async def allocate_many(self, count: int) -> List[str]:
+        """Returns `count` unique short codes, reserving a new block when the current one runs out."""
+        if self._lock is None:
+            # Created on first use so it binds to the serving event loop (Python 3.9)
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            values: List[int] = []
+            while len(values) < count:
+                if self._next >= self._end:
+                    self._next, self._end = await self._reserve(max(settings.SHORT_CODE_BLOCK_SIZE, count - len(values)))
+                take = min(count - len(values), self._end - self._next)
+                values.extend(range(self._next, self._next + take))
+                self._next += take
+        return [encode_short_code(value) for value in values]
+
+
+short_code_allocator = ShortCodeAllocator()
@@ -0,0 +1,85 @@
+"""
+Background job worker.
+
+    python -m app.worker
+
+Claims queued jobs from the `jobs` table and runs them, JOB_WORKER_CONCURRENCY
+at a time. Safe to run several worker processes: jobs are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.email_dispatch import email_dispatcher
+from app.services.jobs import JobService
+import app.services.job_handlers  # noqa: F401  (registers handlers)
+
+logger = logging.getLogger("app.worker")
+
+
+class Worker:
+    def __init__(self, concurrency: int):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        logger.info("Worker stopping after current jobs...")
+        self._stopping.set()
+
+    async def _slot(self, slot: int) -> None:
+        poll = settings.JOB_POLL_INTERVAL_MS / 1000
+        while not self._stopping.is_set():
+            try:
+                job = await JobService.claim(self.worker_id)
+            except Exception as e:
+                logger.warning(f"Job claim failed (slot {slot}): {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=poll)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            logger.info(f"Running job {job.id} ({job.type}), attempt {job.attempts}/{job.max_attempts}")
+            await JobService.run(job)
+
+    async def _reaper(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                requeued = await JobService.requeue_stale()
+                if requeued:
+                    logger.warning(f"Requeued {requeued} stale job(s)")
+            except Exception as e:
+                logger.warning(f"Stale job check failed: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.JOB_STALE_AFTER_SECONDS / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} started with {self.concurrency} slot(s)")
+        await asyncio.gather(self._reaper(), *[self._slot(i) for i in range(self.concurrency)])
+        email_dispatcher.shutdown()
+        await engine.dispose()
+
+
+async def main() -> None:
+    worker = Worker(settings.JOB_WORKER_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+"""Add customer_event_payloads side table
+
+Revision ID: 3f9c1e7a2b64
+Revises: 27cce23e7b84
+Create Date: 2026-10-18 10:12:41.220817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1e7a2b64'
+down_revision: Union[str, Sequence[str], None] = '27cce23e7b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_event_payloads',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('encoding', sa.String(length=10), nullable=False),
+    sa.Column('data', sa.LargeBinary(length=16777215), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['customer_events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    # Existing rows keep their inline raw_data; the audit view falls back to it.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('customer_event_payloads')
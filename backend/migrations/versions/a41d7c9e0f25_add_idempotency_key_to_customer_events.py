@@ -0,0 +1,34 @@
+"""Add idempotency_key to customer_events
+
+Revision ID: a41d7c9e0f25
+Revises: 3f9c1e7a2b64
+Create Date: 2026-10-18 11:02:17.584306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d7c9e0f25'
+down_revision: Union[str, Sequence[str], None] = '3f9c1e7a2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('customer_events', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_unique_constraint(
+        'uq_customer_events_advertiser_idempotency_key',
+        'customer_events',
+        ['advertiser_id', 'idempotency_key']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_customer_events_advertiser_idempotency_key', 'customer_events', type_='unique')
+    op.drop_column('customer_events', 'idempotency_key')
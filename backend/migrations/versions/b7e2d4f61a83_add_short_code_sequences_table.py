@@ -0,0 +1,33 @@
+"""Add short_code_sequences table
+
+Revision ID: b7e2d4f61a83
+Revises: a41d7c9e0f25
+Create Date: 2026-10-18 13:40:05.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4f61a83'
+down_revision: Union[str, Sequence[str], None] = 'a41d7c9e0f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    short_code_sequences = op.create_table('short_code_sequences',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('next_value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(short_code_sequences, [{'name': 'tracking_links', 'next_value': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('short_code_sequences')
@@ -0,0 +1,123 @@
+"""
+Email rendering benchmark: 10k campaign notification emails.
+
+Compares the per-recipient cost of
+  - legacy: full-document str.format of the shell (inline CSS included),
+    `+=` body concatenation and a MIMEMultipart tree serialised per email
+  - current: precompiled shell / cards joined from lists (email_templates)
+    and the reusable MIME skeleton
+
+Before timing, both builders get hostile headers (CR/LF injection); the
+skeleton must refuse every value the `email` package refuses.
+
+Usage:
+    uv run python scripts/bench_email_render.py
+    uv run python scripts/bench_email_render.py --emails 10000 --coupons 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+# Add parent directory to path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email.errors import HeaderParseError, MessageError
+
+from app.services.email import OutgoingEmail, email_service
+from app.services.email_templates import EMAIL_SHELL, COUPON_CARD, TEXT_BODY, MimeSkeleton
+
+
+def legacy_render(name: str, email: str, campaign: str, coupons) -> OutgoingEmail:
+    subject = f"Your Coupons for {campaign} - SuperHer"
+    coupons_html = f"<p>Here are your assigned coupons for the campaign <strong>{campaign}</strong>:</p>"
+    coupons_text = f"Here are your assigned coupons for the campaign {campaign}:\n\n"
+    for coupon in coupons:
+        coupons_html += COUPON_CARD.source.format(code=coupon.code)
+        coupons_text += f"- {coupon.code}\n"
+    html_body = EMAIL_SHELL.source.format(title=subject, recipient_name=name, content_html=coupons_html, **EMAIL_SHELL.static_values)
+    text_body = TEXT_BODY.source.format(recipient_name=name, items_text=coupons_text)
+    return OutgoingEmail(email, subject, html_body, text_body)
+
+
+HOSTILE_HEADERS = [
+    ("subject", "Your Coupons\r\nBcc: attacker@example.com"),
+    ("subject", "Your Coupons\nBcc: attacker@example.com"),
+    ("subject", "Your Coupons\rBcc: attacker@example.com"),
+    ("subject", "Sommer-Rabatt für dich\r\nBcc: attacker@example.com"),
+    ("to_email", "influencer@example.com\r\nBcc: attacker@example.com"),
+    ("to_email", "influencer@example.com\nX-Injected: 1"),
+]
+
+
+def check_hostile_headers(skeleton: MimeSkeleton) -> bool:
+    """Every hostile value must be refused by the skeleton whenever the legacy builder refuses it."""
+    ok = True
+    for field, value in HOSTILE_HEADERS:
+        email = OutgoingEmail("influencer@example.com", "Your Coupons", "<p>Hi</p>", "Hi")._replace(**{field: value})
+        try:
+            email_service.build_mime_message(email)
+            legacy = "accepted"
+        except MessageError:
+            legacy = "refused"
+        try:
+            skeleton.render(email.to_email, email.subject, email.html_body, email.text_body)
+            current = "accepted"
+        except HeaderParseError:
+            current = "refused"
+        if legacy == "refused" and current != "refused":
+            ok = False
+        print(f"{'✅' if current == 'refused' else '❌'} {field} {value!r}: legacy {legacy}, current {current}")
+    return ok
+
+
+def run(label: str, n: int, render, build):
+    recipients = [(f"Influencer {i}", f"influencer{i}@example.com") for i in range(n)]
+
+    start = time.perf_counter()
+    emails = [render(name, email) for name, email in recipients]
+    render_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    total_bytes = sum(len(build(e)) for e in emails)
+    mime_s = time.perf_counter() - start
+
+    print(f"{label:<10}{render_s * 1000:>12.1f}{mime_s * 1000:>12.1f}{(render_s + mime_s) * 1e6 / n:>14.1f}{total_bytes / n / 1024:>12.1f}")
+    return render_s + mime_s
+
+
+def main(n: int, coupons_per_email: int):
+    coupons = [SimpleNamespace(code=f"SUMMER{i:04d}") for i in range(coupons_per_email)]
+    campaign = "Summer Sale"
+    skeleton = MimeSkeleton("noreply@superher.in")
+
+    print("🛡️  Hostile header check")
+    if not check_hostile_headers(skeleton):
+        print("❌ MIME skeleton accepts header values the email package refuses")
+        sys.exit(1)
+    print()
+    print(f"🚀 Rendering {n} emails with {coupons_per_email} coupons each")
+    print("------------------------------------------------------------")
+    print(f"{'':<10}{'render ms':>12}{'mime ms':>12}{'us / email':>14}{'KB / email':>12}")
+    legacy = run(
+        "legacy", n,
+        lambda name, email: legacy_render(name, email, campaign, coupons),
+        email_service.build_mime_message
+    )
+    current = run(
+        "current", n,
+        lambda name, email: email_service.build_coupons_email(name, email, campaign, coupons),
+        lambda e: skeleton.render(e.to_email, e.subject, e.html_body, e.text_body)
+    )
+    print("------------------------------------------------------------")
+    print(f"⚡ {legacy / current:.1f}x faster end to end")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark email rendering.")
+    parser.add_argument("--emails", type=int, default=10000)
+    parser.add_argument("--coupons", type=int, default=5, help="Coupons per email")
+    args = parser.parse_args()
+    main(args.emails, args.coupons)
@@ -0,0 +1,178 @@
+"""
+Write-path latency benchmark.
+
+Calls the create handlers (campaign, coupon generate/manual, tracking link, event
+ingest) directly against the configured database and reports, per path:
+p50 / p95 latency and the number of SQL statements issued per call.
+
+Each create should issue its validation SELECTs plus a single INSERT; there is no
+post-commit refresh or re-select. Run before/after a change to compare.
+
+Usage:
+    uv run python scripts/bench_write_paths.py --iterations 200
+    uv run python scripts/bench_write_paths.py --iterations 50 --keep   # keep the generated rows
+
+All rows are created under a throwaway advertiser which is removed at the end.
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import delete, event, select
+
+# Add parent directory to path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine
+from app.api.v1.endpoints.campaigns import create_campaign
+from app.api.v1.endpoints.coupons import generate_coupon, create_manual_coupon
+from app.api.v1.endpoints.tracking_links import create_tracking_link
+from app.models.advertiser import Advertiser
+from app.models.campaign import Campaign
+from app.models.coupon import Coupon
+from app.models.customer_event import CustomerEvent, CustomerEventPayload
+from app.models.tracking_link import TrackingLink
+from app.models.user import User, UserRole
+from app.schemas.campaign import CampaignCreate
+from app.schemas.coupon import CouponAutoGenerate, CouponManualCreate
+from app.schemas.event import EventCreate
+from app.schemas.tracking import TrackingLinkCreate
+from app.services.ingestion import EventIngestionService
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def bench(name: str, iterations: int, counter: StatementCounter, call: Callable[[int], Awaitable[None]]) -> Dict:
+    latencies = []
+    statements = []
+    for i in range(iterations):
+        counter.count = 0
+        start = time.perf_counter()
+        await call(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+        statements.append(counter.count)
+
+    return {
+        "path": name,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "mean_ms": statistics.mean(latencies),
+        "statements": statistics.mean(statements),
+    }
+
+
+async def run(iterations: int, keep: bool):
+    run_id = secrets.token_hex(4)
+    print(f"🚀 Write-path benchmark ({iterations} iterations per path, run {run_id})")
+
+    async with SessionLocal() as db:
+        advertiser = Advertiser(name=f"Bench_{run_id}", contact_email=f"bench_{run_id}@example.com")
+        db.add(advertiser)
+        await db.commit()
+        advertiser_id = advertiser.id
+
+        campaign = Campaign(name=f"Bench Campaign {run_id}", advertiser_id=advertiser_id, status="active")
+        db.add(campaign)
+        await db.commit()
+        campaign_id = campaign.id
+
+    # Transient principal: the handlers only read role / advertiser_id from it
+    superroot = User(email=f"bench_{run_id}@example.com", role=UserRole.SUPERROOT, is_active=True)
+
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+
+    async def with_session(fn):
+        async with SessionLocal() as db:
+            await fn(db)
+
+    async def campaign_call(i):
+        await with_session(lambda db: create_campaign(
+            CampaignCreate(name=f"Bench {run_id} {i}", advertiser_id=advertiser_id), db=db, current_user=superroot
+        ))
+
+    async def coupon_generate_call(i):
+        await with_session(lambda db: generate_coupon(
+            CouponAutoGenerate(campaign_id=campaign_id, generation_params={"prefix": "BN", "length": "10"}),
+            db=db, current_user=superroot
+        ))
+
+    async def coupon_manual_call(i):
+        await with_session(lambda db: create_manual_coupon(
+            CouponManualCreate(campaign_id=campaign_id, code=f"BM{run_id}{i}"), db=db, current_user=superroot
+        ))
+
+    async def tracking_link_call(i):
+        await with_session(lambda db: create_tracking_link(
+            TrackingLinkCreate(campaign_id=campaign_id, destination_url="https://example.com/bench"),
+            db=db, current_user=superroot
+        ))
+
+    async def event_call(i):
+        await with_session(lambda db: EventIngestionService.ingest(
+            db, advertiser_id, EventCreate(action="purchase", value=10.0)
+        ))
+
+    results = []
+    try:
+        for name, call in [
+            ("POST /campaigns", campaign_call),
+            ("POST /coupons/generate", coupon_generate_call),
+            ("POST /coupons", coupon_manual_call),
+            ("POST /tracking-links", tracking_link_call),
+            ("POST /events (sync)", event_call),
+        ]:
+            results.append(await bench(name, iterations, counter, call))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+        if not keep:
+            await cleanup(advertiser_id)
+
+    await engine.dispose()
+
+    print("--------------------------------------------------------------------------")
+    print(f"{'Path':<26}{'p50 (ms)':>10}{'p95 (ms)':>10}{'mean (ms)':>11}{'stmts/call':>12}")
+    for r in results:
+        print(f"{r['path']:<26}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['mean_ms']:>11.2f}{r['statements']:>12.1f}")
+    print("--------------------------------------------------------------------------")
+
+
+async def cleanup(advertiser_id: int):
+    async with SessionLocal() as db:
+        campaign_ids = select(Campaign.id).where(Campaign.advertiser_id == advertiser_id)
+        event_ids = select(CustomerEvent.id).where(CustomerEvent.advertiser_id == advertiser_id)
+        await db.execute(delete(CustomerEventPayload).where(CustomerEventPayload.event_id.in_(event_ids)))
+        await db.execute(delete(CustomerEvent).where(CustomerEvent.advertiser_id == advertiser_id))
+        await db.execute(delete(TrackingLink).where(TrackingLink.campaign_id.in_(campaign_ids)))
+        await db.execute(delete(Coupon).where(Coupon.campaign_id.in_(campaign_ids)))
+        await db.execute(delete(Campaign).where(Campaign.advertiser_id == advertiser_id))
+        await db.execute(delete(Advertiser).where(Advertiser.id == advertiser_id))
+        await db.commit()
+    print("🧹 Benchmark data removed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark create/ingest write paths.")
+    parser.add_argument("--iterations", type=int, default=100, help="Calls per write path (default: 100)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated rows instead of deleting them")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations, args.keep))
@@ -1,12 +1,19 @@
 """
 # Data Cleanup Script Walkthrough
 
-I have created a comprehensive cleanup script to remove test data generated by the verification scripts (`verify_phase4.py`, `verify_phase5_stats.py`).
+Removes test data generated by the verification scripts (`verify_phase4.py`, `verify_phase5_stats.py`),
+and is safe to run against a live database.
 
 ## Features
 - **Time-Based Deletion**: Deletes data created within the last N hours (default: 24) to preserve older, manual data.
 - **Dependency Handling**: Deletes data in the correct order (`Events` -> `Links/Coupons` -> `Associations` -> `Campaigns` -> `Advertisers`) to respect foreign key constraints.
-- **Dry Run Mode**: Preview what will be deleted without changing the database.
+- **Chunked Deletes**: Every table is purged with `DELETE ... WHERE <window> LIMIT <batch-size>`, one short transaction
+  per batch, with an optional pause between batches so replication and live traffic keep up.
+- **Parallel Tables**: Tables within the same dependency stage (e.g. `click_events` and `customer_events`) are purged
+  concurrently, each on its own connection (`--workers`).
+- **Resumable**: Progress and the cutoff time are written to a checkpoint file after every batch. Re-running after an
+  interruption resumes the same time window and skips finished tables. The file is removed on success.
+- **Dry Run Mode**: Counts what would be deleted, without deleting (or locking) anything.
 
 ## Usage
 
@@ -28,26 +35,37 @@ Delete data from the last 48 hours:
 uv run python scripts/cleanup_data.py --hours 48
 ```
 
+### 4. Gentle Purge on Production
+Small batches, a pause between them, one table at a time:
+```bash
+uv run python scripts/cleanup_data.py --batch-size 500 --sleep 0.5 --workers 1
+```
+
+### 5. Resume / Restart
+After an interruption just run the same command again. To discard the checkpoint and start a new window:
+```bash
+uv run python scripts/cleanup_data.py --restart
+```
+
 ## Deleted Entities
-The script targets the following tables, filtering by `created_at` or `timestamp`:
-1. `click_events`
-2. `customer_events`
-3. `tracking_links`
-4. `coupons`
-5. `campaign_influencers` (associated with new campaigns)
-6. `campaigns`
-7. `api_keys`
-8. `influencers`
-9. `advertisers`
+The script targets the following tables, filtering by `created_at` or `timestamp`
+(tables in the same stage run in parallel):
+1. `click_events`, `customer_events` (payloads cascade)
+2. `tracking_links`, `coupons`, `campaign_influencers` (associated with new campaigns or influencers)
+3. `campaigns`, `api_keys`, `users` (associated with new advertisers or influencers)
+4. `influencers`, `advertisers`
 """
 
 import asyncio
 import argparse
+import json
 import sys
 import os
+import time
 from datetime import datetime, timedelta
-from sqlalchemy import delete, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, func, select
 
 # Add parent directory to path to allow imports from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -55,112 +73,174 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal, engine
 from app.models.advertiser import Advertiser, APIKey
 from app.models.campaign import Campaign
-from app.models.influencer import Influencer, campaign_influencer
+from app.models.influencer import Influencer, CampaignInfluencer
 from app.models.coupon import Coupon
 from app.models.tracking_link import TrackingLink
 from app.models.customer_event import CustomerEvent
 from app.models.click_event import ClickEvent
 from app.models.user import User
 
-async def cleanup_data(hours: int, dry_run: bool):
-    cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+DEFAULT_CHECKPOINT = "cleanup_checkpoint.json"
+PROGRESS_INTERVAL_SECONDS = 5
+
+
+def build_stages(cutoff_time: datetime) -> List[List[Tuple[str, Any, Any]]]:
+    """(label, model, condition) per table, grouped into stages that must run in order."""
+    new_campaigns = select(Campaign.id).where(Campaign.created_at > cutoff_time)
+    new_influencers = select(Influencer.id).where(Influencer.created_at > cutoff_time)
+    new_advertisers = select(Advertiser.id).where(Advertiser.created_at > cutoff_time)
+    return [
+        [
+            ("ClickEvents", ClickEvent, ClickEvent.timestamp > cutoff_time),
+            ("CustomerEvents", CustomerEvent, CustomerEvent.timestamp > cutoff_time),
+        ],
+        [
+            ("TrackingLinks", TrackingLink, TrackingLink.created_at > cutoff_time),
+            ("Coupons", Coupon, Coupon.created_at > cutoff_time),
+            # Rows linked to campaigns or influencers created after cutoff
+            ("CampaignInfluencers", CampaignInfluencer,
+             CampaignInfluencer.campaign_id.in_(new_campaigns) | CampaignInfluencer.influencer_id.in_(new_influencers)),
+        ],
+        [
+            ("Campaigns", Campaign, Campaign.created_at > cutoff_time),
+            # Explicitly delete to avoid orphans if cascade misses or for clarity
+            ("APIKeys", APIKey, APIKey.created_at > cutoff_time),
+            ("Users", User, User.advertiser_id.in_(new_advertisers) | User.influencer_id.in_(new_influencers)),
+        ],
+        [
+            ("Influencers", Influencer, Influencer.created_at > cutoff_time),
+            ("Advertisers", Advertiser, Advertiser.created_at > cutoff_time),
+        ],
+    ]
+
+
+class Checkpoint:
+    """JSON file holding the cutoff time and per-table progress, rewritten atomically."""
+
+    def __init__(self, path: str, hours: int, restart: bool):
+        self.path = path
+        self.state: Dict[str, Any] = {}
+        if os.path.exists(path) and not restart:
+            with open(path) as f:
+                self.state = json.load(f)
+            print(f"♻️  Resuming from checkpoint {path} (started {self.state['started_at']})")
+            if self.state.get("hours") != hours:
+                print(f"   ⚠️  Checkpoint window is {self.state.get('hours')}h; keeping it (use --restart for a new window)")
+        else:
+            now = datetime.utcnow()
+            self.state = {
+                "started_at": now.isoformat(),
+                "hours": hours,
+                "cutoff": (now - timedelta(hours=hours)).isoformat(),
+                "tables": {}
+            }
+
+    @property
+    def cutoff(self) -> datetime:
+        return datetime.fromisoformat(self.state["cutoff"])
+
+    def table(self, label: str) -> Dict[str, Any]:
+        return self.state["tables"].setdefault(label, {"deleted": 0, "done": False})
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+async def count_table(label: str, model, condition) -> None:
+    async with SessionLocal() as session:
+        result = await session.execute(select(func.count()).select_from(model).where(condition))
+        print(f"   - {label}: {result.scalar_one()} rows would be deleted")
+
+
+async def purge_table(label: str, model, condition, checkpoint: Checkpoint, batch_size: int, sleep: float) -> None:
+    progress = checkpoint.table(label)
+    if progress["done"]:
+        print(f"   - {label}: already done ({progress['deleted']} rows)")
+        return
+
+    last_report = time.monotonic()
+    async with SessionLocal() as session:
+        while True:
+            # Short transaction per batch: row locks are held for one batch only
+            result = await session.execute(delete(model).where(condition).with_dialect_options(mysql_limit=batch_size))
+            await session.commit()
+            count = result.rowcount or 0
+            progress["deleted"] += count
+            progress["done"] = count < batch_size
+            checkpoint.save()
+
+            if progress["done"]:
+                break
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL_SECONDS:
+                last_report = time.monotonic()
+                print(f"     … {label}: {progress['deleted']} rows deleted so far")
+            if sleep:
+                await asyncio.sleep(sleep)
+
+    print(f"   - {label}: {progress['deleted']} rows deleted")
+
+
+async def cleanup_data(hours: int, dry_run: bool, batch_size: int, sleep: float, workers: int, checkpoint_path: str, restart: bool):
+    checkpoint = None
+    if dry_run:
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+    else:
+        checkpoint = Checkpoint(checkpoint_path, hours, restart)
+        cutoff_time = checkpoint.cutoff
+
     print(f"🧹 Cleanup Configuration:")
     print(f"   - Time Window: Past {hours} hours")
     print(f"   - Cutoff Time: {cutoff_time} (UTC)")
     print(f"   - Dry Run: {dry_run}")
+    if not dry_run:
+        print(f"   - Batch Size: {batch_size} rows, {sleep}s pause, {workers} parallel table(s)")
+        print(f"   - Checkpoint: {checkpoint_path}")
     print("--------------------------------------------------")
 
-    async with SessionLocal() as session:
-        async with session.begin():
-            # 1. Click Events (timestamp)
-            stmt = delete(ClickEvent).where(ClickEvent.timestamp > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - ClickEvents: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 2. Customer Events (timestamp)
-            stmt = delete(CustomerEvent).where(CustomerEvent.timestamp > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - CustomerEvents: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 3. Tracking Links (created_at)
-            stmt = delete(TrackingLink).where(TrackingLink.created_at > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - TrackingLinks: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 4. Coupons (created_at)
-            stmt = delete(Coupon).where(Coupon.created_at > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - Coupons: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 5. Campaign Influencers (Associative Table)
-            # Delete if the campaign is created after cutoff OR influencer created after cutoff
-            # For simplicity and safety in this script, we will target rows linked to campaigns created after cutoff
-            # as that's the primary driver of new relationships in our test scripts.
-            
-            # Find campaigns to be deleted
-            campaigns_query = select(Campaign.id).where(Campaign.created_at > cutoff_time)
-            # Find influencers to be deleted
-            influencers_query = select(Influencer.id).where(Influencer.created_at > cutoff_time)
-            
-            stmt = delete(campaign_influencer).where(
-                (campaign_influencer.c.campaign_id.in_(campaigns_query)) |
-                (campaign_influencer.c.influencer_id.in_(influencers_query))
-            )
-            result = await session.execute(stmt)
-            print(f"   - CampaignInfluencers: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 6. Campaigns (created_at)
-            stmt = delete(Campaign).where(Campaign.created_at > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - Campaigns: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 7. API Keys (created_at) - explicitly delete to avoid orphans if cascade misses or for clarity
-            stmt = delete(APIKey).where(APIKey.created_at > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - APIKeys: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 7.5. Users (associated with new Advertisers or Influencers)
-            # Find advertisers to be deleted
-            advertisers_query = select(Advertiser.id).where(Advertiser.created_at > cutoff_time)
-            # Find influencers to be deleted
-            influencers_query = select(Influencer.id).where(Influencer.created_at > cutoff_time)
-            
-            stmt = delete(User).where(
-                (User.advertiser_id.in_(advertisers_query)) |
-                (User.influencer_id.in_(influencers_query))
-            )
-            result = await session.execute(stmt)
-            print(f"   - Users: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 8. Influencers (created_at)
-            stmt = delete(Influencer).where(Influencer.created_at > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - Influencers: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
-
-            # 9. Advertisers (created_at)
-            stmt = delete(Advertiser).where(Advertiser.created_at > cutoff_time)
-            result = await session.execute(stmt)
-            print(f"   - Advertisers: {result.rowcount} rows {'would be ' if dry_run else ''}deleted")
+    semaphore = asyncio.Semaphore(max(workers, 1))
 
+    async def run(label: str, model, condition):
+        async with semaphore:
             if dry_run:
-                # Rollback everything in dry run
-                await session.rollback()
-                print("\n🚫 Dry run complete. No changes committed.")
+                await count_table(label, model, condition)
             else:
-                # Commit is automatic with session.begin context, assuming no exception
-                print("\n✅ Cleanup successful. Changes committed.")
+                await purge_table(label, model, condition, checkpoint, batch_size, sleep)
+
+    for stage in build_stages(cutoff_time):
+        # Tables within a stage do not reference each other; the next stage waits for all of them
+        await asyncio.gather(*(run(label, model, condition) for label, model, condition in stage))
+
+    if dry_run:
+        print("\n🚫 Dry run complete. Nothing was deleted.")
+    else:
+        checkpoint.remove()
+        print("\n✅ Cleanup successful. Checkpoint removed.")
 
 async def main():
     parser = argparse.ArgumentParser(description="Cleanup test data from database.")
     parser.add_argument("--hours", type=int, default=24, help="Delete data created in the last N hours (default: 24)")
-    parser.add_argument("--dry-run", action="store_true", help="Simulate deletion without committing")
-    
+    parser.add_argument("--dry-run", action="store_true", help="Count rows that would be deleted, without deleting")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per DELETE statement / transaction (default: 1000)")
+    parser.add_argument("--sleep", type=float, default=0.1, help="Seconds to pause between batches (default: 0.1)")
+    parser.add_argument("--workers", type=int, default=2, help="Tables purged in parallel within a stage (default: 2)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help=f"Progress file for resuming (default: {DEFAULT_CHECKPOINT})")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start a new time window")
+
     args = parser.parse_args()
-    
+
     try:
-        await cleanup_data(args.hours, args.dry_run)
+        await cleanup_data(args.hours, args.dry_run, args.batch_size, args.sleep, args.workers, args.checkpoint, args.restart)
     except Exception as e:
         print(f"\n❌ Error during cleanup: {e}")
+        if not args.dry_run:
+            print(f"   Progress is saved in {args.checkpoint}; re-run to resume.")
     finally:
         await engine.dispose()
 
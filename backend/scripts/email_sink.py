@@ -0,0 +1,151 @@
+"""
+Local SMTP sink for offline email throughput testing.
+
+Accepts (and discards) every message, printing throughput once per second.
+Can inject latency and transient failures to exercise the dispatcher's
+rate limiting and retries.
+
+Usage:
+    uv run python scripts/email_sink.py --port 1025
+    uv run python scripts/email_sink.py --latency-ms 80 --fail-rate 0.05
+
+Then point the API / worker at it:
+    EMAIL_TRANSPORT=smtp SMTP_HOST=localhost SMTP_PORT=1025
+
+and trigger a send (e.g. POST /coupons/notify with send_all), or drive the
+dispatcher directly (exits 1 if any message failed):
+    uv run python scripts/email_sink.py --selftest 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SinkStats:
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = 0
+        self.connections = 0
+        self._last_accepted = 0
+
+    async def report(self):
+        while True:
+            await asyncio.sleep(1)
+            rate = self.accepted - self._last_accepted
+            self._last_accepted = self.accepted
+            if rate or self.rejected:
+                print(f"📨 {rate:>5} msg/s | accepted {self.accepted} | rejected (451) {self.rejected} | connections {self.connections}")
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, stats: SinkStats, latency: float, fail_rate: float):
+    """Minimal SMTP: enough of RFC 5321 for smtplib.sendmail()."""
+    stats.connections += 1
+
+    async def reply(line: str):
+        writer.write((line + "\r\n").encode())
+        await writer.drain()
+
+    try:
+        await reply("220 superher-sink ESMTP ready")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip().upper()
+
+            if command.startswith("EHLO"):
+                writer.write(b"250-superher-sink\r\n250-PIPELINING\r\n250 8BITMIME\r\n")
+                await writer.drain()
+            elif command.startswith("HELO"):
+                await reply("250 superher-sink")
+            elif command.startswith(("MAIL FROM", "RCPT TO", "RSET", "NOOP")):
+                await reply("250 OK")
+            elif command == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    data_line = await reader.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                if latency:
+                    await asyncio.sleep(latency)
+                if fail_rate and random.random() < fail_rate:
+                    stats.rejected += 1
+                    await reply("451 4.3.0 Temporary failure, try again")
+                else:
+                    stats.accepted += 1
+                    await reply("250 OK queued")
+            elif command == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+    except ConnectionError:
+        pass
+    finally:
+        stats.connections -= 1
+        writer.close()
+
+
+async def selftest(count: int) -> bool:
+    """Returns True only if every email was accepted."""
+    from app.services.email import OutgoingEmail
+    from app.services.email_dispatch import email_dispatcher
+
+    emails = [
+        OutgoingEmail(f"influencer{i}@example.com", "Your Coupons - SuperHer", f"<p>Coupon SINK{i:06d}</p>", f"Coupon SINK{i:06d}")
+        for i in range(count)
+    ]
+    print(f"🚀 Dispatching {count} emails (rate limit {email_dispatcher.bucket.rate}/s, {email_dispatcher.concurrency} threads)")
+    start = time.perf_counter()
+    result = await email_dispatcher.dispatch(emails)
+    elapsed = time.perf_counter() - start
+    email_dispatcher.shutdown()
+    marker = "❌" if result["failed"] else "✅"
+    print(f"{marker} sent {result['sent']} failed {result['failed']} in {elapsed:.2f}s ({result['sent'] / elapsed:.1f} msg/s)")
+    for failure in result["failures"][:5]:
+        print(f"   {failure['to']}: {failure['error']}")
+    return not result["failed"]
+
+
+async def main(args) -> int:
+    stats = SinkStats()
+    server = await asyncio.start_server(
+        lambda r, w: handle_client(r, w, stats, args.latency_ms / 1000, args.fail_rate),
+        args.host, args.port
+    )
+    print(f"📭 SMTP sink listening on {args.host}:{args.port} (latency {args.latency_ms}ms, fail rate {args.fail_rate})")
+    reporter = asyncio.create_task(stats.report())
+
+    if args.selftest:
+        os.environ.setdefault("EMAIL_TRANSPORT", "smtp")
+        os.environ.setdefault("SMTP_HOST", args.host)
+        os.environ.setdefault("SMTP_PORT", str(args.port))
+        ok = await selftest(args.selftest)
+        reporter.cancel()
+        server.close()
+        return 0 if ok else 1
+
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SMTP sink for email throughput tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay before acknowledging each message")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of messages answered with 451 (transient)")
+    parser.add_argument("--selftest", type=int, default=0, help="Send N synthetic emails through EmailDispatcher, then exit")
+    args = parser.parse_args()
+
+    try:
+        sys.exit(asyncio.run(main(args)))
+    except KeyboardInterrupt:
+        pass
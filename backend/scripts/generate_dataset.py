@@ -0,0 +1,455 @@
+"""
+Synthetic dataset generator for scale testing StatsService and exports.
+
+Writes advertisers, campaigns, influencers, tracking links, coupons and then
+customer_events / click_events straight into the database. The columns are
+generated with NumPy and loaded with multi-row INSERTs or, on MySQL,
+LOAD DATA LOCAL INFILE. Nothing goes through the API.
+
+Shape of the data:
+  - influencer popularity is Zipf-like (rank ** -zipf_a). A handful of
+    influencers drive most clicks and conversions. Links and coupons inherit
+    their influencer's weight with some lognormal noise.
+  - traffic follows a diurnal curve (trough ~04:00, peak ~20:00 UTC), is a
+    little higher on weekends, and grows linearly over the --days window.
+  - conversions are attributed by coupon (--coupon-share), by ref code
+    (--ref-share) or not at all (organic). Purchases carry lognormal revenue.
+
+Scale factor 1 = 1M customer events and 4M clicks across 10 advertisers,
+1,000 influencers, 5,000 links and 5,000 coupons. Counts scale linearly and
+can be overridden one by one. Output is deterministic for a given --seed and
+set of counts. Rows are generated in fixed blocks of BLOCK_ROWS, each block
+with its own seeded generator, so batch size and worker count do not change
+the data. Generated entities get fresh ids after the current maxima, so
+existing rows are left alone. Remove a generated tenant with the usual
+advertiser deletion.
+
+Usage:
+    # Preview counts and skew without writing anything
+    uv run python scripts/generate_dataset.py --scale 10 --dry-run
+
+    # 10M events / 40M clicks into the configured database, 4 loader connections
+    uv run python scripts/generate_dataset.py --scale 10 --workers 4
+
+    # MySQL LOAD DATA (server needs local_infile=ON)
+    uv run python scripts/generate_dataset.py --scale 10 --method load-data
+
+    # Small local SQLite file
+    uv run python scripts/generate_dataset.py --scale 0.01 --db-url sqlite+aiosqlite:///var/scale.db --create-tables
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+# Add parent directory to path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+BLOCK_ROWS = 100_000
+
+# Per scale factor
+EVENTS_PER_SCALE = 1_000_000
+CLICKS_PER_SCALE = 4_000_000
+ADVERTISERS_PER_SCALE = 10
+INFLUENCERS_PER_SCALE = 1_000
+LINKS_PER_SCALE = 5_000
+COUPONS_PER_SCALE = 5_000
+CAMPAIGNS_PER_ADVERTISER = 5
+
+# Relative traffic per UTC hour: trough around 04:00, evening peak around 20:00
+DIURNAL = np.array([
+    0.55, 0.40, 0.30, 0.25, 0.22, 0.25, 0.35, 0.50, 0.65, 0.75, 0.82, 0.88,
+    0.92, 0.90, 0.88, 0.90, 0.95, 1.00, 1.10, 1.25, 1.35, 1.30, 1.05, 0.80
+])
+WEEKEND_BOOST = 1.15
+
+ACTIONS = np.array(["purchase", "add_to_cart", "signup", "custom", "drop_off"])
+ACTION_WEIGHTS = np.array([0.30, 0.40, 0.15, 0.05, 0.10])
+
+# Stable per-table stream ids for the block generators
+EVENTS_STREAM = 1
+CLICKS_STREAM = 2
+
+EVENT_COLUMNS = (
+    "advertiser_id", "event_type", "timestamp", "revenue", "currency",
+    "coupon_code", "ref_code", "tracking_link_id", "influencer_id", "campaign_id"
+)
+CLICK_COLUMNS = ("tracking_link_id", "timestamp", "ip_address", "user_agent", "referer")
+
+USER_AGENTS = np.array([
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 Instagram 330.0",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 Chrome/124.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36",
+])
+REFERERS = np.array(["https://instagram.com/", "https://www.youtube.com/", "https://t.co/", "https://www.tiktok.com/", None], dtype=object)
+
+
+def zipf_weights(n: int, a: float, rng: np.random.Generator) -> np.ndarray:
+    """Power-law weights over n items, in random order so ids do not encode rank."""
+    weights = np.arange(1, n + 1, dtype=float) ** -a
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+class Plan:
+    """Entity layout and sampling weights; everything derived from the seed."""
+
+    def __init__(self, args, ids: Dict[str, int]):
+        scale = args.scale
+        self.events = args.events if args.events is not None else int(EVENTS_PER_SCALE * scale)
+        self.clicks = args.clicks if args.clicks is not None else int(CLICKS_PER_SCALE * scale)
+        self.advertisers = args.advertisers or max(1, round(ADVERTISERS_PER_SCALE * scale))
+        self.influencers = args.influencers or max(1, round(INFLUENCERS_PER_SCALE * scale))
+        self.links = args.links or max(1, round(LINKS_PER_SCALE * scale))
+        self.coupons = args.coupons or max(1, round(COUPONS_PER_SCALE * scale))
+        self.campaigns = self.advertisers * CAMPAIGNS_PER_ADVERTISER
+        self.days = args.days
+        self.coupon_share = args.coupon_share
+        self.ref_share = args.ref_share
+        self.seed = args.seed
+        self.end = (args.end_date or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.start = self.end - timedelta(days=self.days)
+
+        rng = np.random.default_rng([args.seed, 0])
+        self.ids = ids  # first new id per table
+        self.run_tag = f"{args.seed:x}{ids['advertisers']:x}"
+
+        # Advertisers: Zipf too (a few large tenants), campaigns spread over them
+        self.advertiser_weights = zipf_weights(self.advertisers, 1.0, rng)
+        self.campaign_advertiser = np.arange(self.campaigns) % self.advertisers
+        self.influencer_weights = zipf_weights(self.influencers, args.zipf_a, rng)
+
+        # Links / coupons: influencer chosen by popularity, campaign uniformly
+        self.link_influencer = rng.choice(self.influencers, self.links, p=self.influencer_weights)
+        self.link_campaign = rng.integers(0, self.campaigns, self.links)
+        link_weights = self.influencer_weights[self.link_influencer] * rng.lognormal(0, 0.5, self.links)
+        self.link_weights = link_weights / link_weights.sum()
+
+        self.coupon_influencer = rng.choice(self.influencers, self.coupons, p=self.influencer_weights)
+        self.coupon_campaign = rng.integers(0, self.campaigns, self.coupons)
+        coupon_weights = self.influencer_weights[self.coupon_influencer] * rng.lognormal(0, 0.5, self.coupons)
+        self.coupon_weights = coupon_weights / coupon_weights.sum()
+
+        # Day weights: linear growth x weekend boost; hour weights: diurnal curve
+        day_index = np.arange(self.days)
+        weekdays = np.array([(self.start + timedelta(days=int(d))).weekday() for d in day_index])
+        day_weights = (1 + args.growth * day_index / max(self.days - 1, 1)) * np.where(weekdays >= 5, WEEKEND_BOOST, 1.0)
+        self.day_weights = day_weights / day_weights.sum()
+        self.hour_weights = DIURNAL / DIURNAL.sum()
+
+        self.short_codes = np.array([f"sd{self.run_tag}{i:07d}" for i in range(self.links)])
+        self.coupon_codes = np.array([f"SD{self.run_tag}{i:07d}".upper() for i in range(self.coupons)])
+
+    def timestamps(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        days = rng.choice(self.days, n, p=self.day_weights)
+        hours = rng.choice(24, n, p=self.hour_weights)
+        seconds = days * 86400 + hours * 3600 + rng.integers(0, 3600, n)
+        return np.datetime64(self.start, "s") + seconds.astype("timedelta64[s]")
+
+    def event_block(self, block: int, n: int) -> Dict[str, np.ndarray]:
+        rng = np.random.default_rng([self.seed, EVENTS_STREAM, block])
+        kind = rng.choice(3, n, p=[self.coupon_share, self.ref_share, 1 - self.coupon_share - self.ref_share])
+        is_coupon, is_ref, is_organic = kind == 0, kind == 1, kind == 2
+
+        coupon = rng.choice(self.coupons, n, p=self.coupon_weights)
+        link = rng.choice(self.links, n, p=self.link_weights)
+        organic_advertiser = rng.choice(self.advertisers, n, p=self.advertiser_weights)
+
+        campaign = np.where(is_coupon, self.coupon_campaign[coupon], self.link_campaign[link])
+        influencer = np.where(is_coupon, self.coupon_influencer[coupon], self.link_influencer[link])
+        advertiser = np.where(is_organic, organic_advertiser, self.campaign_advertiser[campaign])
+
+        action = rng.choice(len(ACTIONS), n, p=ACTION_WEIGHTS)
+        revenue = np.round(rng.lognormal(math.log(60), 0.8, n), 2)
+
+        return {
+            "advertiser_id": advertiser + self.ids["advertisers"],
+            "event_type": ACTIONS[action],
+            "timestamp": self.timestamps(rng, n),
+            "revenue": np.where(action == 0, revenue, np.nan),
+            "currency": np.full(n, "USD"),
+            "coupon_code": np.where(is_coupon, self.coupon_codes[coupon], None),
+            "ref_code": np.where(is_ref, self.short_codes[link], None),
+            "tracking_link_id": np.where(is_ref, link + self.ids["tracking_links"], -1),
+            "influencer_id": np.where(is_organic, -1, influencer + self.ids["influencers"]),
+            "campaign_id": np.where(is_organic, -1, campaign + self.ids["campaigns"]),
+        }
+
+    def click_block(self, block: int, n: int) -> Dict[str, np.ndarray]:
+        rng = np.random.default_rng([self.seed, CLICKS_STREAM, block])
+        octets = rng.integers(0, 256, (3, n)).astype(str)
+        return {
+            "tracking_link_id": rng.choice(self.links, n, p=self.link_weights) + self.ids["tracking_links"],
+            "timestamp": self.timestamps(rng, n),
+            "ip_address": np.char.add(np.char.add(np.char.add("10.", octets[0]), np.char.add(".", octets[1])), np.char.add(".", octets[2])),
+            "user_agent": USER_AGENTS[rng.integers(0, len(USER_AGENTS), n)],
+            "referer": REFERERS[rng.integers(0, len(REFERERS), n)],
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        top = max(1, self.influencers // 100)
+        return {
+            "customer_events": self.events,
+            "click_events": self.clicks,
+            "advertisers": self.advertisers,
+            "campaigns": self.campaigns,
+            "influencers": self.influencers,
+            "tracking_links": self.links,
+            "coupons": self.coupons,
+            "window": f"{self.start:%Y-%m-%d} .. {self.end - timedelta(days=1):%Y-%m-%d}",
+            "top_1pct_influencer_share": round(float(np.sort(self.influencer_weights)[-top:].sum()), 3),
+            "peak_hour_utc": int(np.argmax(self.hour_weights)),
+        }
+
+
+def to_rows(columns: Dict[str, np.ndarray], names: Sequence[str], dialect: str) -> List[tuple]:
+    """NumPy columns -> DB-API row tuples (-1 / NaN / None -> NULL)."""
+    # SQLAlchemy's SQLite DateTime stores microseconds; keep string comparisons consistent with it
+    suffix = ".000000" if dialect == "sqlite" else ""
+    values = []
+    for name in names:
+        column = columns[name]
+        if name == "timestamp":
+            strings = np.datetime_as_string(column, unit="s")
+            values.append([s.replace("T", " ") + suffix for s in strings.tolist()])
+        elif column.dtype.kind == "f":
+            values.append([None if v != v else v for v in column.tolist()])
+        elif column.dtype.kind == "i" and name.endswith("_id"):
+            values.append([None if v < 0 else v for v in column.tolist()])
+        else:
+            values.append(column.tolist())
+    return list(zip(*values))
+
+
+async def next_ids(engine: AsyncEngine) -> Dict[str, int]:
+    from app.models.advertiser import Advertiser
+    from app.models.campaign import Campaign
+    from app.models.coupon import Coupon
+    from app.models.influencer import Influencer
+    from app.models.tracking_link import TrackingLink
+
+    ids = {}
+    async with engine.connect() as conn:
+        for table, model in (
+            ("advertisers", Advertiser), ("campaigns", Campaign), ("influencers", Influencer),
+            ("tracking_links", TrackingLink), ("coupons", Coupon)
+        ):
+            ids[table] = ((await conn.execute(select(func.max(model.id)))).scalar() or 0) + 1
+    return ids
+
+
+async def insert_entities(engine: AsyncEngine, plan: Plan):
+    from app.models.advertiser import Advertiser
+    from app.models.campaign import Campaign
+    from app.models.coupon import Coupon
+    from app.models.influencer import CampaignInfluencer, Influencer
+    from app.models.tracking_link import TrackingLink
+
+    ids, tag = plan.ids, plan.run_tag
+    campaign_influencers = sorted(
+        set(zip(plan.link_campaign.tolist(), plan.link_influencer.tolist()))
+        | set(zip(plan.coupon_campaign.tolist(), plan.coupon_influencer.tolist()))
+    )
+    async with engine.begin() as conn:
+        await conn.execute(insert(Advertiser), [
+            {"id": ids["advertisers"] + a, "name": f"Scale {tag} #{a}", "contact_email": f"scale+{tag}.{a}@example.com", "is_active": True}
+            for a in range(plan.advertisers)
+        ])
+        await conn.execute(insert(Campaign), [
+            {"id": ids["campaigns"] + c, "name": f"Scale Campaign {c}", "status": "active", "budget": 50_000.0,
+             "advertiser_id": ids["advertisers"] + int(plan.campaign_advertiser[c]), "start_date": plan.start.date()}
+            for c in range(plan.campaigns)
+        ])
+        for start in range(0, plan.influencers, 10_000):
+            await conn.execute(insert(Influencer), [
+                {"id": ids["influencers"] + i, "name": f"Scale Influencer {i}", "email": f"scale+{tag}.inf{i}@example.com",
+                 "social_handle": f"@scale_{tag}_{i}"}
+                for i in range(start, min(plan.influencers, start + 10_000))
+            ])
+        for start in range(0, len(campaign_influencers), 10_000):
+            await conn.execute(insert(CampaignInfluencer), [
+                {"campaign_id": ids["campaigns"] + c, "influencer_id": ids["influencers"] + i, "revenue_share_value": 10.0}
+                for c, i in campaign_influencers[start:start + 10_000]
+            ])
+        for start in range(0, plan.links, 10_000):
+            await conn.execute(insert(TrackingLink), [
+                {"id": ids["tracking_links"] + l, "short_code": str(plan.short_codes[l]),
+                 "destination_url": f"https://shop.example.com/p/{l}?utm_source=influencer",
+                 "campaign_id": ids["campaigns"] + int(plan.link_campaign[l]),
+                 "influencer_id": ids["influencers"] + int(plan.link_influencer[l])}
+                for l in range(start, min(plan.links, start + 10_000))
+            ])
+        for start in range(0, plan.coupons, 10_000):
+            await conn.execute(insert(Coupon), [
+                {"id": ids["coupons"] + k, "code": str(plan.coupon_codes[k]), "is_active": True,
+                 "campaign_id": ids["campaigns"] + int(plan.coupon_campaign[k]),
+                 "influencer_id": ids["influencers"] + int(plan.coupon_influencer[k])}
+                for k in range(start, min(plan.coupons, start + 10_000))
+            ])
+
+
+class Loader:
+    def __init__(self, engine: AsyncEngine, method: str, batch_size: int):
+        self.engine = engine
+        self.method = method
+        self.batch_size = batch_size
+        self.dialect = engine.dialect.name
+        self.placeholder = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+
+    async def prepare(self, conn):
+        if self.dialect == "mysql":
+            # Rows are generated consistent; skip per-row FK / unique checks during the load
+            await conn.exec_driver_sql("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+
+    async def load(self, conn, table: str, names: Sequence[str], columns: Dict[str, np.ndarray]) -> int:
+        rows = to_rows(columns, names, self.dialect)
+        if self.method == "load-data":
+            return await self._load_data(conn, table, names, rows)
+        sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join([self.placeholder] * len(names))})"
+        for start in range(0, len(rows), self.batch_size):
+            # aiomysql rewrites executemany INSERT ... VALUES into multi-row statements
+            await conn.exec_driver_sql(sql, rows[start:start + self.batch_size])
+        return len(rows)
+
+    async def _load_data(self, conn, table: str, names: Sequence[str], rows: List[tuple]) -> int:
+        def escape(value) -> str:
+            if value is None:
+                return "\\N"
+            return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+        fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=".tsv")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.writelines("\t".join(escape(v) for v in row) + "\n" for row in rows)
+            await conn.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(names)})"
+            )
+        finally:
+            os.remove(path)
+        return len(rows)
+
+
+async def load_table(loader: Loader, table: str, names: Sequence[str], total: int, make_block, workers: int):
+    blocks = [(b, min(BLOCK_ROWS, total - b * BLOCK_ROWS)) for b in range(math.ceil(total / BLOCK_ROWS))]
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    done = 0
+    start = time.perf_counter()
+
+    async def consume():
+        nonlocal done
+        async with loader.engine.connect() as conn:
+            await loader.prepare(conn)
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                done += await loader.load(conn, table, names, item)
+                await conn.commit()
+                elapsed = time.perf_counter() - start
+                print(f"\r   {table}: {done:,}/{total:,} ({done / elapsed:,.0f} rows/s)", end="", flush=True)
+
+    consumers = [asyncio.ensure_future(consume()) for _ in range(workers)]
+    try:
+        for block, n in blocks:
+            columns = make_block(block, n)
+            await queue.put(columns)
+        for _ in consumers:
+            await queue.put(None)
+        await asyncio.gather(*consumers)
+    except BaseException:
+        for consumer in consumers:
+            consumer.cancel()
+        raise
+    elapsed = time.perf_counter() - start
+    print(f"\r✅ {table}: {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)      ")
+
+
+async def main(args):
+    if args.coupon_share + args.ref_share > 1:
+        raise SystemExit("--coupon-share + --ref-share must be <= 1")
+
+    url = args.db_url or settings.SQLALCHEMY_DATABASE_URI
+    connect_args = {"local_infile": True} if args.method == "load-data" else {}
+    engine = create_async_engine(url, connect_args=connect_args)
+    if args.method == "load-data" and engine.dialect.name != "mysql":
+        raise SystemExit("--method load-data needs MySQL")
+
+    if args.create_tables:
+        from app.core.database import Base
+        import app.models  # noqa: F401 (register all tables on Base)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    ids = await next_ids(engine) if not args.dry_run else {t: 1 for t in ("advertisers", "campaigns", "influencers", "tracking_links", "coupons")}
+    plan = Plan(args, ids)
+    print("🧪 Synthetic dataset")
+    for key, value in plan.summary().items():
+        print(f"   {key:<28}{value:,}" if isinstance(value, int) else f"   {key:<28}{value}")
+    if args.dry_run:
+        sample = plan.event_block(0, min(BLOCK_ROWS, max(plan.events, 1)))
+        kinds = {"coupon": int((sample["coupon_code"] != None).sum()), "ref": int((sample["ref_code"] != None).sum())}  # noqa: E711
+        hours = np.bincount(sample["timestamp"].astype("datetime64[h]").astype(int) % 24, minlength=24)
+        print(f"   sample attribution          {kinds} of {len(sample['event_type']):,}")
+        print(f"   sample events per hour      {hours.tolist()}")
+        await engine.dispose()
+        return
+
+    loader = Loader(engine, args.method, args.batch_size)
+    start = time.perf_counter()
+    await insert_entities(engine, plan)
+    print(f"✅ entities: advertisers {ids['advertisers']}..{ids['advertisers'] + plan.advertisers - 1}")
+    if plan.clicks:
+        await load_table(loader, "click_events", CLICK_COLUMNS, plan.clicks, plan.click_block, args.workers)
+    if plan.events:
+        await load_table(loader, "customer_events", EVENT_COLUMNS, plan.events, plan.event_block, args.workers)
+
+    if engine.dialect.name == "mysql" and not args.no_analyze:
+        async with engine.connect() as conn:
+            # Fresh index statistics so the optimizer plans the stats queries against the new volume
+            await conn.execute(text("ANALYZE TABLE customer_events, click_events, tracking_links, coupons"))
+    await engine.dispose()
+    print(f"🏁 Done in {time.perf_counter() - start:.1f}s (seed {args.seed})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-generate realistic customer / click events for scale tests.")
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = 1M events, 4M clicks")
+    parser.add_argument("--events", type=int, help="Override customer event count")
+    parser.add_argument("--clicks", type=int, help="Override click event count")
+    parser.add_argument("--advertisers", type=int)
+    parser.add_argument("--influencers", type=int)
+    parser.add_argument("--links", type=int)
+    parser.add_argument("--coupons", type=int)
+    parser.add_argument("--days", type=int, default=180, help="Length of the event window, ending today")
+    parser.add_argument("--end-date", type=datetime.fromisoformat, help="Last day of the window (default today)")
+    parser.add_argument("--growth", type=float, default=0.5, help="Traffic growth over the window (0.5 = +50%%)")
+    parser.add_argument("--zipf-a", type=float, default=1.1, help="Influencer popularity exponent")
+    parser.add_argument("--coupon-share", type=float, default=0.35, help="Share of events attributed by coupon")
+    parser.add_argument("--ref-share", type=float, default=0.45, help="Share attributed by ref code; the rest is organic")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-url", help="Target DSN (default: the configured database)")
+    parser.add_argument("--method", choices=["insert", "load-data"], default="insert")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per multi-row INSERT")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent loader connections")
+    parser.add_argument("--create-tables", action="store_true", help="Create missing tables first (scratch databases)")
+    parser.add_argument("--no-analyze", action="store_true", help="Skip ANALYZE TABLE afterwards (MySQL)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan and a sample's skew, write nothing")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("\nAborted.")
@@ -0,0 +1,235 @@
+"""
+Local JWKS stub for offline testing of Cognito token verification.
+
+Serves a Cognito-style JWKS from freshly generated RSA keys and mints ID
+tokens signed with them, so CognitoVerifier can be exercised without AWS.
+
+Endpoints:
+    GET  /.well-known/jwks.json     JWKS (counts requests, optional latency)
+    GET  /token?sub=...&ttl=3600    ID token signed with the current key
+    POST /rotate                    Adds a new signing key (old ones stay published)
+    GET  /stats                     {"jwks_requests": n, "kids": [...]}
+
+Usage:
+    uv run python scripts/jwks_stub_server.py --port 8099 --latency-ms 200
+
+Then point the API at it:
+    COGNITO_JWKS_URL=http://127.0.0.1:8099/.well-known/jwks.json
+    COGNITO_USER_POOL_ID=us-east-1_stub COGNITO_APP_CLIENT_ID=stub-client
+
+Or run the built-in checks (single-flight, stale-while-revalidate, unknown kid):
+    uv run python scripts/jwks_stub_server.py --selftest
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+# Add parent directory to path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_REGION = "us-east-1"
+DEFAULT_POOL_ID = "us-east-1_stub"
+DEFAULT_CLIENT_ID = "stub-client"
+
+
+class KeyStore:
+    def __init__(self, region: str, pool_id: str, client_id: str):
+        self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{pool_id}"
+        self.client_id = client_id
+        self.keys = []  # (kid, private_pem, public_jwk)
+        self.jwks_requests = 0
+        self.lock = threading.Lock()
+        self.rotate()
+
+    def rotate(self) -> str:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        kid = uuid.uuid4().hex[:16]
+        public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+        public_jwk.update({"kid": kid, "use": "sig"})
+        with self.lock:
+            self.keys.append((kid, private_pem, public_jwk))
+        return kid
+
+    def jwks(self) -> dict:
+        with self.lock:
+            self.jwks_requests += 1
+            return {"keys": [public_jwk for _, _, public_jwk in self.keys]}
+
+    def mint(self, sub: str, ttl: int = 3600, kid: str = None) -> str:
+        with self.lock:
+            current_kid, private_pem, _ = self.keys[-1]
+        now = int(time.time())
+        claims = {
+            "sub": sub,
+            "aud": self.client_id,
+            "iss": self.issuer,
+            "token_use": "id",
+            "email": f"{sub}@example.com",
+            "iat": now,
+            "exp": now + ttl
+        }
+        return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid or current_kid})
+
+
+def make_handler(store: KeyStore, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: dict):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path.endswith("jwks.json"):
+                if latency:
+                    time.sleep(latency)
+                self._send(200, store.jwks())
+            elif url.path == "/token":
+                self._send(200, {"id_token": store.mint(query.get("sub", "stub-user"), int(query.get("ttl", 3600)))})
+            elif url.path == "/stats":
+                self._send(200, {"jwks_requests": store.jwks_requests, "kids": [kid for kid, _, _ in store.keys]})
+            else:
+                self._send(404, {"detail": "Not found"})
+
+        def do_POST(self):
+            if urlparse(self.path).path == "/rotate":
+                self._send(200, {"kid": store.rotate()})
+            else:
+                self._send(404, {"detail": "Not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(store: KeyStore, host: str, port: int, latency: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(store, latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def selftest(store: KeyStore, concurrency: int):
+    from app.core.cognito import CognitoVerifier
+
+    failures = 0
+
+    def check(label: str, ok: bool, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label:<44} {detail}")
+
+    async def verify_all(verifier, tokens):
+        start = time.perf_counter()
+        results = await asyncio.gather(*(verifier.verify_token(t) for t in tokens), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        return errors, (time.perf_counter() - start) * 1000
+
+    verifier = CognitoVerifier()
+    await verifier.startup()
+
+    # 1. Cold start: one fetch shared by every concurrent request
+    before = store.jwks_requests
+    verifier.jwks, verifier.keys = None, {}
+    errors, ms = await verify_all(verifier, [store.mint(f"user{i}") for i in range(concurrency)])
+    check("Cold start: single-flight fetch", not errors and store.jwks_requests - before == 1,
+          f"{store.jwks_requests - before} fetch(es), {len(errors)} error(s), {ms:.0f}ms")
+
+    # 2. TTL expired: requests keep verifying with the stale keys, one background refresh
+    before = store.jwks_requests
+    verifier.last_fetch = 0
+    errors, ms = await verify_all(verifier, [store.mint(f"stale{i}") for i in range(concurrency)])
+    if verifier._refresh_task:
+        await verifier._refresh_task
+    check("Stale keys: served while revalidating", not errors and store.jwks_requests - before == 1,
+          f"{store.jwks_requests - before} fetch(es), {len(errors)} error(s), {ms:.0f}ms")
+
+    # 3. Key rotation: unknown kid triggers one refresh
+    before = store.jwks_requests
+    store.rotate()
+    verifier.last_attempt = 0  # pretend the last refresh was long ago
+    errors, ms = await verify_all(verifier, [store.mint(f"rotated{i}") for i in range(concurrency)])
+    check("Rotated key: refresh on unknown kid", not errors and store.jwks_requests - before == 1,
+          f"{store.jwks_requests - before} fetch(es), {len(errors)} error(s), {ms:.0f}ms")
+
+    # 4. Made-up kids right after a refresh: rate limited, no extra fetches
+    before = store.jwks_requests
+    errors, ms = await verify_all(verifier, [store.mint(f"forged{i}", kid="not-a-real-kid") for i in range(concurrency)])
+    check("Unknown kid flood: rate limited", len(errors) == concurrency and store.jwks_requests == before,
+          f"{store.jwks_requests - before} fetch(es), {len(errors)} rejected")
+
+    # 5. Repeated token: served from the verified-token cache
+    token = store.mint("repeat")
+    await verifier.verify_token(token)
+    hits = verifier.token_cache.hits
+    errors, ms = await verify_all(verifier, [token] * concurrency)
+    check("Repeated token: cache hits", not errors and verifier.token_cache.hits - hits == concurrency,
+          f"{verifier.token_cache.hits - hits} hit(s), {ms:.1f}ms")
+
+    await verifier.shutdown()
+    print("--------------------------------------------------")
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All JWKS checks passed")
+
+
+def main(args):
+    store = KeyStore(args.region, args.pool_id, args.client_id)
+    server = start_server(store, args.host, args.port, args.latency_ms / 1000)
+    url = f"http://{args.host}:{server.server_port}/.well-known/jwks.json"
+    print(f"🔑 JWKS stub serving {url} (latency {args.latency_ms}ms)")
+
+    if args.selftest:
+        os.environ["COGNITO_JWKS_URL"] = url
+        os.environ["COGNITO_REGION"] = args.region
+        os.environ["COGNITO_USER_POOL_ID"] = args.pool_id
+        os.environ["COGNITO_APP_CLIENT_ID"] = args.client_id
+        asyncio.run(selftest(store, args.concurrency))
+        server.shutdown()
+        return
+
+    print(f"   COGNITO_JWKS_URL={url} COGNITO_USER_POOL_ID={args.pool_id} COGNITO_APP_CLIENT_ID={args.client_id}")
+    print(f"   Token: curl http://{args.host}:{server.server_port}/token?sub=test-user")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JWKS stub for Cognito verification tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=int, default=100, help="Delay before answering JWKS requests")
+    parser.add_argument("--region", default=DEFAULT_REGION)
+    parser.add_argument("--pool-id", default=DEFAULT_POOL_ID)
+    parser.add_argument("--client-id", default=DEFAULT_CLIENT_ID)
+    parser.add_argument("--selftest", action="store_true", help="Run verifier checks against the stub, then exit")
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent verifications per selftest scenario")
+    main(parser.parse_args())
@@ -0,0 +1,432 @@
+"""
+End-to-end load generator for the redirect, event ingest and dashboard paths.
+
+Two steps:
+
+1. seed: creates N advertisers, each with an API key, campaigns, influencers,
+   tracking links and coupons, and writes a manifest (API keys, short codes,
+   coupon codes) for the run step.
+
+       uv run python scripts/load_test.py seed --advertisers 20 --manifest var/loadtest.json
+
+2. run: replays a weighted mix of requests against the API and prints a JSON
+   report (throughput, latency percentiles, status codes per scenario).
+
+       # Open loop: Poisson arrivals at 500 req/s for 60s, at most 200 in flight
+       uv run python scripts/load_test.py run --manifest var/loadtest.json \\
+           --target http://localhost:8000 --rate 500 --duration 60 --concurrency 200 \\
+           --mix redirect=70,ingest=25,dashboard=5
+
+       # Closed loop (--rate 0): 50 workers back to back, app served in-process
+       uv run python scripts/load_test.py run --manifest var/loadtest.json --in-process \\
+           --rate 0 --concurrency 50 --duration 30 --output var/loadtest_report.json
+
+In open-loop mode, latency is measured from each request's scheduled send
+time. Time spent waiting for a free concurrency slot therefore counts, and
+an overloaded server shows up as latency, not as a lower request rate
+(no coordinated omission). `service_ms` is measured from the moment the
+request is actually sent.
+
+`cleanup --manifest ...` deletes the seeded advertisers (AdvertiserDeletionService)
+and influencers again.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import secrets
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+from sqlalchemy import insert
+
+# Add parent directory to path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+
+SCENARIOS = ("redirect", "ingest", "dashboard")
+DEFAULT_MIX = "redirect=70,ingest=25,dashboard=5"
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+# ---------------------------------------------------------------------------
+# Seed
+# ---------------------------------------------------------------------------
+
+async def seed(args):
+    from app.core.database import SessionLocal, engine
+    from app.models.advertiser import Advertiser, APIKey
+    from app.models.campaign import Campaign
+    from app.models.coupon import Coupon
+    from app.models.influencer import CampaignInfluencer, Influencer
+    from app.models.tracking_link import TrackingLink
+
+    run_id = secrets.token_hex(3)
+    manifest = {"run_id": run_id, "created_at": datetime.utcnow().isoformat(), "advertisers": []}
+    start = time.perf_counter()
+    print(f"🌱 Seeding {args.advertisers} advertisers (run {run_id})...")
+
+    async with SessionLocal() as session:
+        for a in range(args.advertisers):
+            advertiser_id = (await session.execute(
+                insert(Advertiser).values(
+                    name=f"Load Test {run_id} #{a}",
+                    contact_email=f"loadtest+{run_id}.{a}@example.com",
+                    is_active=True
+                )
+            )).inserted_primary_key[0]
+
+            raw_key = f"sk_live_{secrets.token_urlsafe(32)}"
+            await session.execute(insert(APIKey).values(
+                name="Load test key",
+                key_prefix=raw_key[:7],
+                key_hash=hashlib.sha256(raw_key.encode()).hexdigest(),
+                advertiser_id=advertiser_id,
+                is_active=True
+            ))
+
+            influencer_ids = []
+            for i in range(args.influencers):
+                influencer_ids.append((await session.execute(
+                    insert(Influencer).values(
+                        name=f"LT Influencer {a}.{i}",
+                        email=f"loadtest+{run_id}.{a}.{i}@example.com",
+                        social_handle=f"@lt_{run_id}_{a}_{i}"
+                    )
+                )).inserted_primary_key[0])
+
+            links, coupons = [], []
+            for c in range(args.campaigns):
+                campaign_id = (await session.execute(
+                    insert(Campaign).values(
+                        name=f"LT Campaign {a}.{c}",
+                        status="active",
+                        budget=10_000.0,
+                        advertiser_id=advertiser_id,
+                        start_date=(datetime.utcnow() - timedelta(days=30)).date()
+                    )
+                )).inserted_primary_key[0]
+                if influencer_ids:
+                    await session.execute(insert(CampaignInfluencer), [
+                        {"campaign_id": campaign_id, "influencer_id": inf_id, "revenue_share_value": 10.0}
+                        for inf_id in influencer_ids
+                    ])
+
+                link_rows = [{
+                    "short_code": f"lt{run_id}{secrets.token_hex(4)}",
+                    "destination_url": f"https://example.com/landing/{c}?utm_source=loadtest",
+                    "campaign_id": campaign_id,
+                    "influencer_id": random.choice(influencer_ids) if influencer_ids else None,
+                } for _ in range(args.links)]
+                coupon_rows = [{
+                    "code": f"LT{run_id}{secrets.token_hex(4)}".upper(),
+                    "campaign_id": campaign_id,
+                    "influencer_id": random.choice(influencer_ids) if influencer_ids else None,
+                    "is_active": True,
+                } for _ in range(args.coupons)]
+                if link_rows:
+                    await session.execute(insert(TrackingLink), link_rows)
+                if coupon_rows:
+                    await session.execute(insert(Coupon), coupon_rows)
+                links += [row["short_code"] for row in link_rows]
+                coupons += [row["code"] for row in coupon_rows]
+
+            await session.commit()
+            manifest["advertisers"].append({
+                "id": advertiser_id,
+                "api_key": raw_key,
+                "influencer_ids": influencer_ids,
+                "short_codes": links,
+                "coupon_codes": coupons
+            })
+
+    await engine.dispose()
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    totals = {
+        "links": sum(len(a["short_codes"]) for a in manifest["advertisers"]),
+        "coupons": sum(len(a["coupon_codes"]) for a in manifest["advertisers"]),
+    }
+    print(f"✅ Seeded {args.advertisers} advertisers, {totals['links']} links, {totals['coupons']} coupons "
+          f"in {time.perf_counter() - start:.1f}s -> {args.manifest}")
+    print("⚠️  The manifest contains live API keys; delete it (and run `cleanup`) when done.")
+
+
+async def cleanup(args):
+    from sqlalchemy import delete
+
+    from app.core.database import SessionLocal, engine
+    from app.models.influencer import Influencer
+    from app.services.advertiser_deletion import AdvertiserDeletionService
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    async with SessionLocal() as session:
+        for advertiser in manifest["advertisers"]:
+            await AdvertiserDeletionService.delete_advertiser(session, advertiser["id"])
+            print(f"🗑️  Deleted advertiser {advertiser['id']}")
+        # Influencers are not owned by an advertiser; remove the ones this run created
+        influencer_ids = [i for advertiser in manifest["advertisers"] for i in advertiser.get("influencer_ids", [])]
+        if influencer_ids:
+            await session.execute(delete(Influencer).where(Influencer.id.in_(influencer_ids)))
+            await session.commit()
+            print(f"🗑️  Deleted {len(influencer_ids)} influencers")
+    await engine.dispose()
+    print("✅ Cleanup complete")
+
+
+# ---------------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------------
+
+class ScenarioStats:
+    def __init__(self):
+        self.latencies: List[float] = []   # from scheduled time (ms)
+        self.service: List[float] = []     # from actual send (ms)
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.bytes = 0
+
+    def report(self, elapsed: float) -> Dict:
+        ok = sum(count for status, count in self.statuses.items() if 200 <= status < 400)
+        total = len(self.latencies)
+        return {
+            "requests": total,
+            "ok": ok,
+            "error_rate": round(1 - ok / total, 4) if total else 0.0,
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": summarize(self.latencies),
+            "service_ms": summarize(self.service),
+            "status_codes": {str(status): count for status, count in sorted(self.statuses.items())},
+            "exceptions": dict(self.errors),
+            "response_bytes": self.bytes
+        }
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    summary = {f"p{p:g}": round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2) for p in PERCENTILES}
+    summary["mean"] = round(sum(ordered) / len(ordered), 2)
+    summary["max"] = round(ordered[-1], 2)
+    return summary
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Valid: {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def make_requests(manifest: Dict) -> Dict[str, Callable[[], Tuple[str, str, Dict]]]:
+    """Scenario name -> factory returning (method, path, httpx request kwargs)."""
+    advertisers = manifest["advertisers"]
+    prefix = settings.API_V1_STR
+    actions = ["purchase"] * 6 + ["add_to_cart"] * 3 + ["signup"]
+
+    def redirect():
+        advertiser = random.choice(advertisers)
+        return "GET", f"{prefix}/r/{random.choice(advertiser['short_codes'])}", {
+            "headers": {"User-Agent": "superher-loadtest", "Referer": "https://instagram.com/"}
+        }
+
+    def ingest():
+        advertiser = random.choice(advertisers)
+        payload = {
+            "event_id": secrets.token_hex(12),
+            "action": random.choice(actions),
+            "value": round(random.uniform(5, 250), 2),
+            "properties": {"items": random.randint(1, 5), "source": "loadtest"}
+        }
+        attribution = random.random()
+        if attribution < 0.45 and advertiser["coupon_codes"]:
+            payload["coupon_code"] = random.choice(advertiser["coupon_codes"])
+        elif attribution < 0.9 and advertiser["short_codes"]:
+            payload["ref_code"] = random.choice(advertiser["short_codes"])
+        return "POST", f"{prefix}/events/", {"json": payload, "headers": {"X-API-KEY": advertiser["api_key"]}}
+
+    def dashboard():
+        advertiser = random.choice(advertisers)
+        now = datetime.utcnow()
+        return "GET", f"{prefix}/stats/dashboard", {
+            "params": {
+                "widgets": "overview,chart,breakdown,campaigns,influencers,coupons,tracking-links,journey",
+                "from": (now - timedelta(days=30)).isoformat(),
+                "to": now.isoformat()
+            },
+            "headers": {"X-API-KEY": advertiser["api_key"]}
+        }
+
+    return {"redirect": redirect, "ingest": ingest, "dashboard": dashboard}
+
+
+async def send(client: httpx.AsyncClient, stats: ScenarioStats, request: Tuple[str, str, Dict], scheduled: float):
+    method, path, kwargs = request
+    sent = time.perf_counter()
+    try:
+        response = await client.request(method, path, **kwargs)
+        stats.statuses[response.status_code] += 1
+        stats.bytes += len(response.content)
+    except Exception as e:
+        stats.errors[type(e).__name__] += 1
+    done = time.perf_counter()
+    stats.latencies.append((done - scheduled) * 1000)
+    stats.service.append((done - sent) * 1000)
+
+
+async def open_loop(client, factories, weights, stats, rate: float, duration: float, concurrency: int):
+    """Poisson arrivals at `rate`/s, independent of how fast responses come back."""
+    slots = asyncio.Semaphore(concurrency)
+    names, cum_weights = list(weights), list(weights.values())
+    tasks = set()
+    start = time.perf_counter()
+    next_at = start
+
+    async def fire(name: str, scheduled: float):
+        async with slots:
+            await send(client, stats[name], factories[name](), scheduled)
+
+    while next_at - start < duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = random.choices(names, cum_weights)[0]
+        task = asyncio.ensure_future(fire(name, next_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_at += random.expovariate(rate)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def closed_loop(client, factories, weights, stats, duration: float, concurrency: int):
+    """`concurrency` workers, each sending its next request as soon as the previous one returns."""
+    names, cum_weights = list(weights), list(weights.values())
+    start = time.perf_counter()
+
+    async def worker():
+        while time.perf_counter() - start < duration:
+            name = random.choices(names, cum_weights)[0]
+            await send(client, stats[name], factories[name](), time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run(args):
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    if not manifest["advertisers"]:
+        raise SystemExit("Manifest has no advertisers; run `seed` first")
+
+    weights = parse_mix(args.mix)
+    factories = make_requests(manifest)
+    stats = defaultdict(ScenarioStats)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+
+    lifespan = None
+    if args.in_process:
+        from app.main import app
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=timeout)
+        target = "in-process"
+    else:
+        client = httpx.AsyncClient(base_url=args.target, limits=limits, timeout=timeout)
+        target = args.target
+
+    mode = f"open loop, {args.rate:g} req/s" if args.rate > 0 else f"closed loop, {args.concurrency} workers"
+    print(f"🚀 {target}: {mode}, {args.duration:g}s, mix {weights}", file=sys.stderr)
+
+    started_at = datetime.utcnow().isoformat()
+    try:
+        if args.warmup:
+            warm = defaultdict(ScenarioStats)
+            await closed_loop(client, factories, weights, warm, args.warmup, min(args.concurrency, 10))
+        if args.rate > 0:
+            elapsed = await open_loop(client, factories, weights, stats, args.rate, args.duration, args.concurrency)
+        else:
+            elapsed = await closed_loop(client, factories, weights, stats, args.duration, args.concurrency)
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    overall = ScenarioStats()
+    for scenario in stats.values():
+        overall.latencies += scenario.latencies
+        overall.service += scenario.service
+        overall.statuses.update(scenario.statuses)
+        overall.errors.update(scenario.errors)
+        overall.bytes += scenario.bytes
+
+    report = {
+        "target": target,
+        "mode": "open" if args.rate > 0 else "closed",
+        "rate": args.rate,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "mix": weights,
+        "started_at": started_at,
+        "overall": overall.report(elapsed),
+        "scenarios": {name: stats[name].report(elapsed) for name in weights if name in stats}
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"📄 Report written to {args.output}", file=sys.stderr)
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed and load test the redirect, ingest and dashboard paths.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = subparsers.add_parser("seed", help="Create advertisers, campaigns, links and coupons")
+    seed_parser.add_argument("--advertisers", type=int, default=10)
+    seed_parser.add_argument("--campaigns", type=int, default=3, help="Per advertiser")
+    seed_parser.add_argument("--influencers", type=int, default=5, help="Per advertiser")
+    seed_parser.add_argument("--links", type=int, default=10, help="Tracking links per campaign")
+    seed_parser.add_argument("--coupons", type=int, default=10, help="Coupons per campaign")
+    seed_parser.add_argument("--manifest", default="var/loadtest.json")
+
+    run_parser = subparsers.add_parser("run", help="Generate load and report latency / throughput as JSON")
+    run_parser.add_argument("--manifest", default="var/loadtest.json")
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument("--target", default="http://localhost:8000", help="Base URL of a running API")
+    target.add_argument("--in-process", action="store_true", help="Drive app.main:app through ASGITransport")
+    run_parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted scenarios (default {DEFAULT_MIX})")
+    run_parser.add_argument("--rate", type=float, default=100.0, help="Arrivals per second; 0 = closed loop")
+    run_parser.add_argument("--concurrency", type=int, default=100, help="Max requests in flight (closed loop: workers)")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    run_parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of unreported traffic first")
+    run_parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    run_parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    cleanup_parser = subparsers.add_parser("cleanup", help="Delete the advertisers listed in a manifest")
+    cleanup_parser.add_argument("--manifest", default="var/loadtest.json")
+
+    args = parser.parse_args()
+    try:
+        asyncio.run({"seed": seed, "run": run, "cleanup": cleanup}[args.command](args))
+    except KeyboardInterrupt:
+        print("\nAborted.")
@@ -0,0 +1,10 @@
+import client from './client';
+
+export const jobsApi = {
+    list: (params) => client.get('/jobs/', { params }),
+
+    // Poll for status / progress / result of a background job
+    get: (id) => client.get(`/jobs/${id}`),
+
+    cancel: (id) => client.post(`/jobs/${id}/cancel`),
+};
@@ -123,5 +123,17 @@ export const statsApi = {
     getForecast: (apiKey, params) => client.get('/stats/forecast', {
         headers: apiKey ? { 'X-API-KEY': apiKey } : {},
         params
+    }),
+
+    /**
+     * Get several dashboard widgets in one request
+     * @param {string|null} apiKey
+     * @param {string[]} widgets - e.g. ['overview', 'chart', 'tracking-links'] (all if empty)
+     * @param {object} params - { from, to, advertiser_id, campaign_id, influencer_id, days_ahead }
+     * @returns {Promise} data: { widgets: { [name]: data }, errors: { [name]: { status_code, detail } } }
+     */
+    getDashboard: (apiKey, widgets, params) => client.get('/stats/dashboard', {
+        headers: apiKey ? { 'X-API-KEY': apiKey } : {},
+        params: { ...params, widgets: widgets && widgets.length ? widgets.join(',') : undefined }
     })
 };
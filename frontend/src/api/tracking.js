@@ -5,6 +5,9 @@ export const trackingApi = {
 
     create: (data) => client.post('/tracking-links/', data),
 
+    // Many links for one campaign: { campaign_id, links: [{ influencer_id, destination_url, cpc_rate }] }
+    bulkCreate: (data) => client.post('/tracking-links/bulk', data),
+
     notify: (data) => client.post('/tracking-links/notify', data),
 
     // Helper to extract clean data or error
@@ -714,27 +714,26 @@ const Dashboard = () => {
                 influencer_id: selectedInfluencer || null
             };
 
-            const [ovRes, chRes, bkRes, infRes, campRes, journeyRes, couponRes, linkRes] = await Promise.all([
-                statsApi.getOverview(null, params),
-                statsApi.getChartData(null, params),
-                statsApi.getBreakdown(null, params),
-                statsApi.getInfluencers(null, params),
-                statsApi.getCampaigns(null, params),
-                statsApi.getJourneyStats(null, params),
-                statsApi.getCoupons(null, params),
-                statsApi.getTrackingLinks(null, params)
-            ]);
-
-            setOverview(ovRes.data);
-            setChartData(chRes.data);
-            setBreakdownData(bkRes.data);
-            setJourneyData(journeyRes.data);
+            // One request for all widgets (authenticated once, queried concurrently server-side)
+            const dashRes = await statsApi.getDashboard(null, [
+                'overview', 'chart', 'breakdown', 'influencers', 'campaigns', 'journey', 'coupons', 'tracking-links'
+            ], params);
+            const { widgets, errors } = dashRes.data;
+            if (errors && Object.keys(errors).length > 0) {
+                console.error("Some dashboard widgets failed:", errors);
+            }
+            const infRes = { data: widgets.influencers };
+
+            setOverview(widgets.overview || null);
+            setChartData(widgets.chart || []);
+            setBreakdownData(widgets.breakdown || []);
+            setJourneyData(widgets.journey || []);
 
             // Set Stacked Data
-            setInfluencersData(infRes.data || []);
-            setCampaignsData(campRes.data || []);
-            setCouponsData(couponRes.data || []);
-            setLinksData(linkRes.data || []);
+            setInfluencersData(widgets.influencers || []);
+            setCampaignsData(widgets.campaigns || []);
+            setCouponsData(widgets.coupons || []);
+            setLinksData(widgets['tracking-links'] || []);
 
             // Fetch Forecast (separate call, non-blocking)
             setForecastLoading(true);